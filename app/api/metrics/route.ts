@@ -0,0 +1,30 @@
+import { NextResponse } from "next/server"
+import { getPythonWorkers } from "@/lib/python-worker"
+
+// Prometheus scrape endpoint: stage duration histograms from every running Python worker.
+// Workers that are not running are skipped rather than started.
+export async function GET() {
+  const results = await Promise.allSettled(getPythonWorkers().map((worker) => worker.metrics()))
+
+  // Each worker renders the same metric family; keep its HELP/TYPE header only once
+  const seen = new Set<string>()
+  const lines: string[] = []
+  for (const result of results) {
+    if (result.status === "rejected") {
+      console.error("Metrics scrape error:", result.reason)
+      continue
+    }
+    for (const line of result.value.split("\n")) {
+      if (!line) continue
+      if (line.startsWith("#")) {
+        if (seen.has(line)) continue
+        seen.add(line)
+      }
+      lines.push(line)
+    }
+  }
+
+  return new NextResponse(lines.join("\n") + "\n", {
+    headers: { "Content-Type": "text/plain; version=0.0.4; charset=utf-8" },
+  })
+}
@@ -0,0 +1,56 @@
+import { type NextRequest, NextResponse } from "next/server"
+import { getPythonWorker } from "@/lib/python-worker"
+
+// Warm detect-then-read pipeline: YOLO and OCR share one decoded frame in one Python process
+const pipelineWorker = () => getPythonWorker("Pipeline", "plate_pipeline.py")
+
+// Health/readiness probe. `?warm=1` starts the worker (and loads the model) if it is not running yet.
+export async function GET(request: NextRequest) {
+  try {
+    const warm = request.nextUrl.searchParams.get("warm") === "1"
+    const health = await pipelineWorker().health(warm)
+    return NextResponse.json(health, { status: health.ready ? 200 : 503 })
+  } catch (error) {
+    console.error("Pipeline health check error:", error)
+    return NextResponse.json(
+      { status: "error", ready: false, error: error instanceof Error ? error.message : "Unknown error" },
+      { status: 503 },
+    )
+  }
+}
+
+export async function POST(request: NextRequest) {
+  try {
+    const { image } = await request.json()
+
+    if (!image) {
+      return NextResponse.json({ error: "No image provided" }, { status: 400 })
+    }
+
+    console.log("Starting license plate pipeline (YOLO + OCR)...")
+
+    const results = await pipelineWorker().request("process", { image })
+
+    if (results.error) {
+      throw new Error(`Pipeline error: ${results.error}`)
+    }
+
+    console.log("License plate pipeline completed:", results.timings)
+
+    return NextResponse.json({
+      success: true,
+      detections: results.detections || [],
+      plates: results.plates || [],
+      processing_time: results.processing_time || 0,
+      model_version: results.model_version || "yolo_license_plate_detector",
+      timings: results.timings || {},
+      detector_stage_ms: results.detector_stage_ms || {},
+    })
+  } catch (error) {
+    console.error("License plate pipeline error:", error)
+    return NextResponse.json(
+      { error: `License plate pipeline failed: ${error instanceof Error ? error.message : "Unknown error"}` },
+      { status: 500 },
+    )
+  }
+}
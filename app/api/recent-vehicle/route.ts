@@ -1,37 +1,23 @@
 // app/api/recent-vehicle/route.ts
 
 import { NextResponse } from 'next/server'
-import clientPromise from '@/lib/mongodb' // Adjust path based on where your mongodb.ts file is located
-
-const DATABASE_NAME = 'tollplaza'
-const COLLECTION_NAME = 'license-plate'
+import { findMostRecentVehicle } from '@/lib/vehicles'
 
 export async function GET() {
   try {
-    // Connect to database using your existing connection
-    const client = await clientPromise
-    const db = client.db(DATABASE_NAME)
-    const collection = db.collection(COLLECTION_NAME)
-
-    // Find the most recent vehicle based on createdAt field
-    const recentVehicle = await collection
-      .find({})
-      .sort({ createdAt: -1 }) // Sort by createdAt in descending order (most recent first)
-      .limit(1) // Get only the most recent one
-      .toArray()
+    // Most recent vehicle by createdAt, read from the end of the createdAt index
+    const vehicle = await findMostRecentVehicle()
 
-    if (!recentVehicle || recentVehicle.length === 0) {
+    if (!vehicle) {
       return NextResponse.json(
         { error: 'No vehicles found' },
         { status: 404 }
       )
     }
 
-    const vehicle = recentVehicle[0]
-
     // Return vehicle information
     return NextResponse.json({
-      _id: vehicle._id.toString(),
+      _id: vehicle._id,
       license: vehicle.license,
       owner: vehicle.owner,
       phone: vehicle.phone,
@@ -0,0 +1,38 @@
+// app/api/vehicle-info/bulk/route.ts
+
+import { NextRequest, NextResponse } from 'next/server'
+import { findVehiclesByLicenses, MAX_BULK_LICENSES } from '@/lib/vehicles'
+
+// Look up many plates (e.g. every plate of a pipeline response, or a batch of lanes) in one query
+export async function POST(request: NextRequest) {
+  try {
+    const body = await request.json()
+    const { licenses } = body
+
+    if (!Array.isArray(licenses) || licenses.some((license) => !license || typeof license !== 'string')) {
+      return NextResponse.json(
+        { error: 'licenses must be an array of license plate numbers' },
+        { status: 400 }
+      )
+    }
+
+    if (licenses.length > MAX_BULK_LICENSES) {
+      return NextResponse.json(
+        { error: `At most ${MAX_BULK_LICENSES} licenses can be looked up at once` },
+        { status: 400 }
+      )
+    }
+
+    // One indexed $in query; vehicles are keyed by license, plates not registered are listed in missing
+    const { vehicles, missing } = await findVehiclesByLicenses(licenses)
+
+    return NextResponse.json({ vehicles, missing })
+
+  } catch (error) {
+    console.error('Database error:', error)
+    return NextResponse.json(
+      { error: 'Internal server error' },
+      { status: 500 }
+    )
+  }
+}
@@ -1,30 +1,22 @@
 // app/api/vehicle-info/route.ts (App Router format for Next.js 13+)
 
 import { NextRequest, NextResponse } from 'next/server'
-import clientPromise from '@/lib/mongodb' // Adjust path based on where your mongodb.ts file is located
-
-const DATABASE_NAME = 'tollplaza'
-const COLLECTION_NAME = 'license-plate'
+import { findVehicleByLicense } from '@/lib/vehicles'
 
 export async function POST(request: NextRequest) {
   try {
     const body = await request.json()
     const { license } = body
 
-    if (!license) {
+    if (!license || typeof license !== 'string') {
       return NextResponse.json(
         { error: 'License plate number is required' },
         { status: 400 }
       )
     }
 
-    // Connect to database using your existing connection
-    const client = await clientPromise
-    const db = client.db(DATABASE_NAME)
-    const collection = db.collection(COLLECTION_NAME)
-
-    // Search for vehicle by license plate
-    const vehicle = await collection.findOne({ license: license })
+    // Indexed lookup on license, fetching only the returned fields
+    const vehicle = await findVehicleByLicense(license)
 
     if (!vehicle) {
       return NextResponse.json(
@@ -35,7 +27,7 @@ export async function POST(request: NextRequest) {
 
     // Return vehicle information
     return NextResponse.json({
-      _id: vehicle._id.toString(),
+      _id: vehicle._id,
       license: vehicle.license,
       owner: vehicle.owner,
       phone: vehicle.phone,
@@ -1,12 +1,25 @@
 import { type NextRequest, NextResponse } from "next/server"
-import { spawn } from "child_process"
-import path from "path"
-import fs from "fs"
-import { randomUUID } from "crypto"
+import { getPythonWorker } from "@/lib/python-worker"
 
-export async function POST(request: NextRequest) {
-  let tempImagePath: string | null = null
+// Warm detector process: the model is loaded once and reused across requests
+const yoloWorker = () => getPythonWorker("YOLO", "yolo_detector.py")
+
+// Health/readiness probe. `?warm=1` starts the worker (and loads the model) if it is not running yet.
+export async function GET(request: NextRequest) {
+  try {
+    const warm = request.nextUrl.searchParams.get("warm") === "1"
+    const health = await yoloWorker().health(warm)
+    return NextResponse.json(health, { status: health.ready ? 200 : 503 })
+  } catch (error) {
+    console.error("YOLO health check error:", error)
+    return NextResponse.json(
+      { status: "error", ready: false, error: error instanceof Error ? error.message : "Unknown error" },
+      { status: 503 },
+    )
+  }
+}
 
+export async function POST(request: NextRequest) {
   try {
     const { image } = await request.json()
 
@@ -16,64 +29,8 @@ export async function POST(request: NextRequest) {
 
     console.log("Starting YOLO license plate detection...")
 
-    // Create temp directory if it doesn't exist
-    const tempDir = path.join(process.cwd(), "temp")
-    if (!fs.existsSync(tempDir)) {
-      fs.mkdirSync(tempDir, { recursive: true })
-    }
-
-    // Save base64 image to temporary file
-    const tempFileName = `temp_image_${randomUUID()}.jpg`
-    tempImagePath = path.join(tempDir, tempFileName)
-
-    // Convert base64 to buffer and save to file
-    const imageBuffer = Buffer.from(image, "base64")
-    fs.writeFileSync(tempImagePath, imageBuffer)
-
-    // Path to Python script
-    const pythonScriptPath = path.join(process.cwd(), "python", "yolo_detector.py")
-
-    // Check if Python script exists
-    if (!fs.existsSync(pythonScriptPath)) {
-      throw new Error(`Python script not found at: ${pythonScriptPath}`)
-    }
-
-    // Run Python YOLO detection script with file path instead of base64
-    const python = spawn("python", [pythonScriptPath, tempImagePath])
-
-    let stdout = ""
-    let stderr = ""
-
-    // Collect stdout
-    python.stdout.on("data", (data) => {
-      stdout += data.toString()
-    })
-
-    // Collect stderr
-    python.stderr.on("data", (data) => {
-      stderr += data.toString()
-      console.error("YOLO Python stderr:", data.toString())
-    })
-
-    // Wait for process to complete
-    const exitCode = await new Promise((resolve) => {
-      python.on("close", (code) => {
-        resolve(code)
-      })
-    })
-
-    if (exitCode !== 0) {
-      throw new Error(`Python script exited with code ${exitCode}. Error: ${stderr}`)
-    }
-
-    // Parse results
-    let yoloResults
-    try {
-      yoloResults = JSON.parse(stdout.trim())
-    } catch (parseError) {
-      console.error("Failed to parse Python output:", stdout)
-      throw new Error(`Failed to parse YOLO results: ${parseError}`)
-    }
+    // Hand the base64 image straight to the warm Python worker; it is decoded in memory there
+    const yoloResults = await yoloWorker().request("detect", { image })
 
     // Check for errors in results
     if (yoloResults.error) {
@@ -87,6 +44,7 @@ export async function POST(request: NextRequest) {
       detections: yoloResults.detections || [],
       processing_time: yoloResults.processing_time || 0,
       model_version: yoloResults.model_version || "yolo_license_plate_detector",
+      stage_ms: yoloResults.stage_ms || {},
     })
   } catch (error) {
     console.error("YOLO detection error:", error)
@@ -94,14 +52,5 @@ export async function POST(request: NextRequest) {
       { error: `YOLO detection failed: ${error instanceof Error ? error.message : "Unknown error"}` },
       { status: 500 },
     )
-  } finally {
-    // Clean up temporary file
-    if (tempImagePath && fs.existsSync(tempImagePath)) {
-      try {
-        fs.unlinkSync(tempImagePath)
-      } catch (cleanupError) {
-        console.error("Failed to cleanup temp file:", cleanupError)
-      }
-    }
   }
 }
@@ -28,12 +28,37 @@ interface YoloResults {
 
 interface OcrResults {
   success: boolean
+  error?: string
   extracted_text: string
   license_plate: string
   confidence: number
   processing_time: number
 }
 
+interface PipelinePlate extends OcrResults {
+  bbox: number[]
+  detection_confidence: number
+}
+
+interface PipelineResults {
+  success: boolean
+  detections: YoloDetection[]
+  plates: PipelinePlate[]
+  processing_time: number
+  model_version: string
+  timings: {
+    decode?: number
+    detect?: number
+    ocr?: number[]
+    total?: number
+  }
+}
+
+// Plate reader: "vision" (default) detects with /api/yolo-detect and reads the best plate with
+// Google Cloud Vision through /api/ocr-extract; "tesseract" runs detection and the local Tesseract
+// OCR in one /api/plate-pipeline call, uploading and decoding the image once.
+const OCR_ENGINE = process.env.NEXT_PUBLIC_OCR_ENGINE === "tesseract" ? "tesseract" : "vision"
+
 interface VehicleInfo {
   _id: string
   license: string
@@ -183,57 +208,108 @@ export default function DetectionPage() {
       setProcessingSteps([...steps])
       setProgress(30)
 
-      // Step 1: YOLO Detection
-      const yoloResponse = await fetch("/api/yolo-detect", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({
-          image: base64Image,
-        }),
-      })
+      // Step 1: YOLO detection, and with the Tesseract engine the OCR too in the same call
+      let yoloData: YoloResults
+      let ocrData: OcrResults | undefined
+      if (OCR_ENGINE === "tesseract") {
+        const pipelineResponse = await fetch("/api/plate-pipeline", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify({
+            image: base64Image,
+          }),
+        })
 
-      if (!yoloResponse.ok) {
-        const errorData = await yoloResponse.json()
-        throw new Error(errorData.error || `YOLO detection failed: ${yoloResponse.status}`)
-      }
+        if (!pipelineResponse.ok) {
+          const errorData = await pipelineResponse.json()
+          throw new Error(errorData.error || `License plate pipeline failed: ${pipelineResponse.status}`)
+        }
+
+        const pipelineData: PipelineResults = await pipelineResponse.json()
+        yoloData = {
+          success: pipelineData.success,
+          detections: pipelineData.detections || [],
+          processing_time: pipelineData.timings?.detect ?? pipelineData.processing_time,
+          model_version: pipelineData.model_version,
+        }
+        // The pipeline reads plates in confidence order; the first is the best detection
+        ocrData = pipelineData.plates?.[0]
+      } else {
+        const yoloResponse = await fetch("/api/yolo-detect", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify({
+            image: base64Image,
+          }),
+        })
+
+        if (!yoloResponse.ok) {
+          const errorData = await yoloResponse.json()
+          throw new Error(errorData.error || `YOLO detection failed: ${yoloResponse.status}`)
+        }
 
-      const yoloData: YoloResults = await yoloResponse.json()
+        yoloData = await yoloResponse.json()
+        yoloData.detections = yoloData.detections || []
+      }
       setYoloResults(yoloData)
 
       steps.push(`✅ YOLO detection completed in ${yoloData.processing_time}s`)
-      steps.push(
-        `📍 Found ${yoloData.detections.length} license plate(s) with confidence ${(yoloData.detections[0]?.confidence * 100).toFixed(1)}%`,
-      )
+      if (yoloData.detections.length > 0) {
+        steps.push(
+          `📍 Found ${yoloData.detections.length} license plate(s) with confidence ${(yoloData.detections[0].confidence * 100).toFixed(1)}%`,
+        )
+      }
       setProcessingSteps([...steps])
       setProgress(60)
 
-      if (yoloData.detections && yoloData.detections.length > 0) {
-        const bestDetection = yoloData.detections[0] // Use the first/best detection
-
-        steps.push("🔤 Starting OCR text extraction from detected region...")
+      if (yoloData.detections.length > 0) {
+        steps.push(
+          OCR_ENGINE === "tesseract"
+            ? "🔤 Reading text from the detected region..."
+            : "🔤 Starting OCR text extraction from detected region...",
+        )
         setProcessingSteps([...steps])
         setProgress(70)
 
-        // Step 2: OCR Extraction
-        const ocrResponse = await fetch("/api/ocr-extract", {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify({
-            image: base64Image,
-            bbox: bestDetection.bbox,
-          }),
-        })
+        // Step 2: OCR of the best detection
+        if (OCR_ENGINE === "vision") {
+          const ocrResponse = await fetch("/api/ocr-extract", {
+            method: "POST",
+            headers: {
+              "Content-Type": "application/json",
+            },
+            body: JSON.stringify({
+              image: base64Image,
+              bbox: yoloData.detections[0].bbox,
+            }),
+          })
+
+          if (!ocrResponse.ok) {
+            const errorData = await ocrResponse.json()
+            throw new Error(errorData.error || `OCR extraction failed: ${ocrResponse.status}`)
+          }
 
-        if (!ocrResponse.ok) {
-          const errorData = await ocrResponse.json()
-          throw new Error(errorData.error || `OCR extraction failed: ${ocrResponse.status}`)
+          ocrData = await ocrResponse.json()
         }
+      }
 
-        const ocrData: OcrResults = await ocrResponse.json()
+      if (yoloData.detections.length === 0) {
+        setStatus("⚠️ No license plates detected in the image")
+        steps.push("❌ YOLO model did not detect any license plates")
+        steps.push("💡 Try uploading a clearer image with a visible license plate")
+      } else if (!ocrData || !ocrData.success) {
+        // A plate was found but could not be read; nothing to show or look up
+        if (ocrData) {
+          setOcrResults(ocrData)
+        }
+        setStatus("⚠️ License plate detected but its text could not be read")
+        steps.push(`❌ OCR failed: ${ocrData?.error || "no reading for the detected plate"}`)
+        steps.push("💡 Try uploading a clearer image with a visible license plate")
+      } else {
         setOcrResults(ocrData)
 
         steps.push(`✅ OCR extraction completed in ${ocrData.processing_time}s`)
@@ -277,10 +353,6 @@ export default function DetectionPage() {
           setStatus("⚠️ Text extracted but no complete license plate pattern found")
           steps.push("❌ Could not construct complete license plate from OCR text")
         }
-      } else {
-        setStatus("⚠️ No license plates detected in the image")
-        steps.push("❌ YOLO model did not detect any license plates")
-        steps.push("💡 Try uploading a clearer image with a visible license plate")
       }
 
       setProcessingSteps([...steps])
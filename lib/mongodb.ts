@@ -1,11 +1,26 @@
-import { MongoClient } from "mongodb"
+import { MongoClient, type MongoClientOptions } from "mongodb"
 
 if (!process.env.MONGODB_URI) {
   throw new Error('Invalid/Missing environment variable: "MONGODB_URI"')
 }
 
+const intFromEnv = (name: string, fallback: number) => {
+  const value = Number.parseInt(process.env[name] ?? "", 10)
+  return Number.isFinite(value) ? value : fallback
+}
+
 const uri = process.env.MONGODB_URI
-const options = {}
+// Bounded pool and timeouts: an unreachable or overloaded server fails a lookup within
+// seconds instead of holding the request open, and lanes share a fixed number of sockets.
+const options: MongoClientOptions = {
+  maxPoolSize: intFromEnv("MONGODB_MAX_POOL_SIZE", 20),
+  minPoolSize: intFromEnv("MONGODB_MIN_POOL_SIZE", 2),
+  maxIdleTimeMS: intFromEnv("MONGODB_MAX_IDLE_MS", 60_000),
+  waitQueueTimeoutMS: intFromEnv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", 2_000),
+  serverSelectionTimeoutMS: intFromEnv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 5_000),
+  connectTimeoutMS: intFromEnv("MONGODB_CONNECT_TIMEOUT_MS", 5_000),
+  socketTimeoutMS: intFromEnv("MONGODB_SOCKET_TIMEOUT_MS", 10_000),
+}
 
 let client
 let clientPromise: Promise<MongoClient>
@@ -0,0 +1,194 @@
+import { spawn, type ChildProcessWithoutNullStreams } from "child_process"
+import path from "path"
+import fs from "fs"
+import readline from "readline"
+
+// Long-lived Python worker speaking the JSON-lines protocol from python/worker.py.
+// The model (or OCR engine) is loaded once when the worker starts and every
+// request afterwards reuses the warm process.
+
+export type WorkerMessage = {
+  id?: number | null
+  event?: string
+  error?: string
+  [key: string]: any
+}
+
+type PendingRequest = {
+  resolve: (message: WorkerMessage) => void
+  reject: (error: Error) => void
+  timer: NodeJS.Timeout
+}
+
+const STARTUP_TIMEOUT_MS = 120_000
+const REQUEST_TIMEOUT_MS = 60_000
+
+export class PythonWorker {
+  private python: ChildProcessWithoutNullStreams | null = null
+  private readyPromise: Promise<WorkerMessage> | null = null
+  private pending = new Map<number, PendingRequest>()
+  private nextId = 1
+  private lastReady: WorkerMessage | null = null
+
+  constructor(
+    private readonly name: string,
+    private readonly scriptPath: string,
+    private readonly args: string[] = ["--serve"],
+  ) {}
+
+  get isRunning() {
+    return this.python !== null
+  }
+
+  get isReady() {
+    return this.python !== null && this.lastReady !== null
+  }
+
+  // Spawn the worker if needed and resolve once it reports readiness
+  start(): Promise<WorkerMessage> {
+    if (this.readyPromise) {
+      return this.readyPromise
+    }
+
+    if (!fs.existsSync(this.scriptPath)) {
+      return Promise.reject(new Error(`Python script not found at: ${this.scriptPath}`))
+    }
+
+    console.log(`Starting ${this.name} Python worker...`)
+    const python = spawn("python", [this.scriptPath, ...this.args])
+    this.python = python
+
+    this.readyPromise = new Promise<WorkerMessage>((resolve, reject) => {
+      const startupTimer = setTimeout(() => {
+        reject(new Error(`${this.name} worker did not become ready within ${STARTUP_TIMEOUT_MS}ms`))
+        python.kill()
+      }, STARTUP_TIMEOUT_MS)
+
+      const lines = readline.createInterface({ input: python.stdout })
+      lines.on("line", (line) => {
+        let message: WorkerMessage
+        try {
+          message = JSON.parse(line)
+        } catch {
+          console.error(`${this.name} worker sent non-JSON output:`, line)
+          return
+        }
+
+        if (message.event === "ready") {
+          clearTimeout(startupTimer)
+          this.lastReady = message
+          console.log(`${this.name} worker ready`)
+          resolve(message)
+          return
+        }
+
+        const entry = typeof message.id === "number" ? this.pending.get(message.id) : undefined
+        if (!entry) {
+          console.error(`${this.name} worker sent an unexpected response:`, message)
+          return
+        }
+        clearTimeout(entry.timer)
+        this.pending.delete(message.id as number)
+        entry.resolve(message)
+      })
+
+      python.stderr.on("data", (data) => {
+        console.error(`${this.name} Python stderr:`, data.toString())
+      })
+
+      // Writes racing a dying worker surface here; the close handler fails the requests
+      python.stdin.on("error", (error) => {
+        console.error(`${this.name} worker stdin error:`, error)
+      })
+
+      const onExit = (reason: string) => {
+        if (this.python !== python) {
+          return
+        }
+        clearTimeout(startupTimer)
+        const error = new Error(`${this.name} worker ${reason}`)
+        reject(error)
+        for (const entry of this.pending.values()) {
+          clearTimeout(entry.timer)
+          entry.reject(error)
+        }
+        this.pending.clear()
+        this.python = null
+        this.readyPromise = null
+        this.lastReady = null
+      }
+
+      python.on("error", (error) => onExit(`failed to start: ${error.message}`))
+      python.on("close", (code) => onExit(`exited with code ${code}`))
+    })
+
+    return this.readyPromise
+  }
+
+  // Send one command and wait for its response
+  async request(cmd: string, payload: Record<string, unknown> = {}, timeoutMs = REQUEST_TIMEOUT_MS) {
+    await this.start()
+
+    const python = this.python
+    if (!python) {
+      throw new Error(`${this.name} worker is not running`)
+    }
+
+    const id = this.nextId++
+    return new Promise<WorkerMessage>((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id)
+        reject(new Error(`${this.name} worker timed out after ${timeoutMs}ms`))
+        // A stuck worker blocks every request queued behind it, so recycle it
+        python.kill()
+      }, timeoutMs)
+
+      this.pending.set(id, { resolve, reject, timer })
+      python.stdin.write(JSON.stringify({ id, cmd, ...payload }) + "\n")
+    })
+  }
+
+  // Liveness/readiness probe; does not spawn the worker unless asked to
+  async health(warm = false): Promise<WorkerMessage> {
+    if (!this.isRunning && !warm) {
+      return { status: "stopped", worker: this.name, ready: false }
+    }
+    if (this.isRunning && !this.isReady && !warm) {
+      return { status: "starting", worker: this.name, ready: false }
+    }
+    return this.request("health")
+  }
+
+  // Stage histograms in Prometheus text format; empty while the worker is not ready (never spawns it)
+  async metrics(): Promise<string> {
+    if (!this.isReady) {
+      return ""
+    }
+    const response = await this.request("metrics")
+    return response.metrics || ""
+  }
+}
+
+// Keep one worker per script for the whole server process. As in lib/mongodb.ts,
+// a global is used so that HMR module reloads do not spawn duplicate workers.
+const globalWithWorkers = global as typeof globalThis & {
+  _pythonWorkers?: Map<string, PythonWorker>
+}
+
+export function getPythonWorkers(): PythonWorker[] {
+  return Array.from(globalWithWorkers._pythonWorkers?.values() ?? [])
+}
+
+export function getPythonWorker(name: string, scriptName: string, args?: string[]) {
+  if (!globalWithWorkers._pythonWorkers) {
+    globalWithWorkers._pythonWorkers = new Map()
+  }
+
+  const key = [scriptName, ...(args || [])].join(" ")
+  let worker = globalWithWorkers._pythonWorkers.get(key)
+  if (!worker) {
+    worker = new PythonWorker(name, path.join(process.cwd(), "python", scriptName), args)
+    globalWithWorkers._pythonWorkers.set(key, worker)
+  }
+  return worker
+}
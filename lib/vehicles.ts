@@ -0,0 +1,110 @@
+import type { Collection, Document, WithId } from "mongodb"
+import clientPromise from "@/lib/mongodb"
+
+// Data access for the registered vehicles in tollplaza.license-plate. Every query here is
+// served by one of the indexes ensured below and only fetches the fields the API returns.
+
+export const DATABASE_NAME = "tollplaza"
+export const COLLECTION_NAME = "license-plate"
+
+// Largest number of plates one bulk lookup may ask for
+export const MAX_BULK_LICENSES = 500
+
+// Server-side time limit per query, so a slow query does not outlive the request
+const QUERY_MAX_TIME_MS = 2_000
+
+const VEHICLE_PROJECTION = {
+  license: 1,
+  owner: 1,
+  phone: 1,
+  vehicleType: 1,
+  tollAmount: 1,
+  createdAt: 1,
+} as const
+
+export type VehicleInfo = {
+  _id: string
+  license: string
+  owner: string
+  phone: string
+  vehicleType: string
+  tollAmount: number
+  createdAt?: Date
+}
+
+let collectionPromise: Promise<Collection> | null = null
+
+// Collection handle with the lookup indexes in place. createIndexes is a no-op for indexes
+// that already exist, and runs once per process; a failure is retried on the next call.
+export function getVehicleCollection(): Promise<Collection> {
+  if (!collectionPromise) {
+    collectionPromise = (async () => {
+      const client = await clientPromise
+      const collection = client.db(DATABASE_NAME).collection(COLLECTION_NAME)
+      await collection.createIndexes([
+        { key: { license: 1 }, name: "license_1" },
+        { key: { createdAt: -1 }, name: "createdAt_-1" },
+      ])
+      return collection
+    })().catch((error) => {
+      collectionPromise = null
+      throw error
+    })
+  }
+  return collectionPromise
+}
+
+export function toVehicleInfo(vehicle: WithId<Document>): VehicleInfo {
+  return {
+    _id: vehicle._id.toString(),
+    license: vehicle.license,
+    owner: vehicle.owner,
+    phone: vehicle.phone,
+    vehicleType: vehicle.vehicleType,
+    tollAmount: vehicle.tollAmount,
+    createdAt: vehicle.createdAt,
+  }
+}
+
+export async function findVehicleByLicense(license: string): Promise<VehicleInfo | null> {
+  const collection = await getVehicleCollection()
+  const vehicle = await collection.findOne(
+    { license },
+    { projection: VEHICLE_PROJECTION, maxTimeMS: QUERY_MAX_TIME_MS },
+  )
+  return vehicle ? toVehicleInfo(vehicle) : null
+}
+
+export async function findMostRecentVehicle(): Promise<VehicleInfo | null> {
+  const collection = await getVehicleCollection()
+  const vehicle = await collection.findOne(
+    {},
+    { sort: { createdAt: -1 }, projection: VEHICLE_PROJECTION, maxTimeMS: QUERY_MAX_TIME_MS },
+  )
+  return vehicle ? toVehicleInfo(vehicle) : null
+}
+
+// One indexed $in query for many plates. Returns a vehicle per requested license (one of them,
+// like findOne, if a license is registered more than once) and the licenses not found.
+export async function findVehiclesByLicenses(
+  licenses: string[],
+): Promise<{ vehicles: Record<string, VehicleInfo>; missing: string[] }> {
+  const unique = Array.from(new Set(licenses))
+  const vehicles: Record<string, VehicleInfo> = {}
+  if (unique.length === 0) {
+    return { vehicles, missing: [] }
+  }
+
+  const collection = await getVehicleCollection()
+  const cursor = collection.find(
+    { license: { $in: unique } },
+    { projection: VEHICLE_PROJECTION, maxTimeMS: QUERY_MAX_TIME_MS },
+  )
+  for await (const vehicle of cursor) {
+    if (!(vehicle.license in vehicles)) {
+      vehicles[vehicle.license] = toVehicleInfo(vehicle)
+    }
+  }
+
+  return { vehicles, missing: unique.filter((license) => !(license in vehicles)) }
+}
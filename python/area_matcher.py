@@ -0,0 +1,112 @@
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+# Canonical (Bangla) area name -> spellings OCR may produce for it.
+# Add districts here; lookups go through the character index, not a scan of this table.
+AREA_ALIASES = {
+    # Major cities
+    'ঢাকা': ['dhaka'],
+    'চট্টগ্রাম': ['chittagong', 'ctg'],
+    'সিলেট': ['sylhet'],
+    'রাজশাহী': ['rajshahi'],
+    'বরিশাল': ['barisal'],
+    'খুলনা': ['khulna'],
+    'রংপুর': ['rangpur'],
+    'ময়মনসিংহ': ['mymensingh'],
+    'কুমিল্লা': ['comilla'],
+    'নোয়াখালী': ['noakhali'],
+    'ফেনী': ['feni'],
+    'লক্ষ্মীপুর': ['lakshmipur'],
+    'ব্রাহ্মণবাড়িয়া': ['brahmanbaria'],
+    'চাঁদপুর': ['chandpur'],
+
+    # Metro areas
+    'মেট্রো': ['metro'],
+}
+
+# Vehicle class letters are matched like area names and map to themselves
+VEHICLE_CLASS_LETTERS = [
+    'ক', 'খ', 'গ', 'ঘ', 'ঙ', 'চ', 'ছ', 'জ', 'ঝ', 'ঞ', 'ট', 'ঠ', 'ড', 'ঢ', 'ণ',
+    'ত', 'থ', 'দ', 'ধ', 'ন', 'প', 'ফ', 'ব', 'ভ', 'ম', 'য', 'র', 'ল', 'শ', 'ষ', 'স', 'হ'
+]
+
+class AreaNameMatcher:
+    def __init__(self, aliases=None, extra_names=None, cutoff=0.6):
+        """
+        Fuzzy matcher from OCR words to canonical area names, built once
+
+        Gives the same best match as difflib.get_close_matches over the full spelling
+        list, but only scores candidates that share enough characters with the word:
+        a character index finds them and an exact upper bound on SequenceMatcher's
+        ratio (the same bound difflib's quick_ratio uses) discards the rest.
+
+        Args:
+            aliases: Mapping of canonical name to alternative spellings (default AREA_ALIASES)
+            extra_names: Names that are their own canonical form (default VEHICLE_CLASS_LETTERS)
+            cutoff: Minimum similarity ratio for a match
+        """
+        aliases = AREA_ALIASES if aliases is None else aliases
+        extra_names = VEHICLE_CLASS_LETTERS if extra_names is None else extra_names
+        self.cutoff = cutoff
+
+        # Normalized, deduplicated spelling table with a direct spelling -> canonical mapping
+        self.canonical = {}
+        for canonical, spellings in aliases.items():
+            for spelling in [canonical, *spellings]:
+                self.canonical.setdefault(self.normalize(spelling), canonical)
+        for name in extra_names:
+            self.canonical.setdefault(self.normalize(name), name)
+
+        self.names = list(self.canonical)
+        self.lengths = [len(name) for name in self.names]
+
+        # Character -> [(name index, count)] postings
+        self.postings = defaultdict(list)
+        for index, name in enumerate(self.names):
+            for char, count in Counter(name).items():
+                self.postings[char].append((index, count))
+
+        self.match = lru_cache(maxsize=4096)(self._match)
+
+    @staticmethod
+    def normalize(text):
+        return text.strip().lower()
+
+    def _candidates(self, word):
+        """Indices of names whose ratio with word can reach the cutoff"""
+        overlap = defaultdict(int)
+        for char, count in Counter(word).items():
+            for index, name_count in self.postings.get(char, ()):
+                overlap[index] += min(count, name_count)
+
+        word_length = len(word)
+        return [
+            index for index, common in overlap.items()
+            if 2.0 * common / (word_length + self.lengths[index]) >= self.cutoff
+        ]
+
+    def _match(self, word):
+        """
+        Best canonical match for a single word
+
+        Returns:
+            Tuple of (canonical name, similarity ratio), or ('', 0.0) when nothing reaches the cutoff
+        """
+        word = self.normalize(word)
+        if not word:
+            return '', 0.0
+
+        best = None
+        for index in self._candidates(word):
+            name = self.names[index]
+            score = SequenceMatcher(None, name, word).ratio()
+            # Same ordering as get_close_matches: highest score, ties to the larger string
+            if score >= self.cutoff and (best is None or (score, name) > best):
+                best = (score, name)
+
+        if best is None:
+            return '', 0.0
+
+        name = best[1]
+        return self.canonical[name], SequenceMatcher(None, word, name).ratio()
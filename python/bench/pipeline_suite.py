@@ -0,0 +1,322 @@
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Benchmarks run from python/bench; the modules under test live one level up
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from evaluate_profiles import match_detections, peak_rss_mb
+from plate_parser import TO_ENGLISH_DIGITS
+from synthetic_plates import SyntheticPlateGenerator, find_bangla_font
+
+BENCHMARKS = ('preprocess', 'parse', 'ocr_sweep', 'detector')
+ACCURACY_FIELDS = ('license_plate', 'area_name', 'vehicle_class', 'number')
+
+def latency_stats(latencies, elapsed):
+    """Throughput and latency percentiles (ms) of the timed calls"""
+    values = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'throughput_per_s': round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        'latency_ms': {
+            'mean': round(float(values.mean()), 3),
+            'p50': round(float(np.percentile(values, 50)), 3),
+            'p95': round(float(np.percentile(values, 95)), 3),
+            'p99': round(float(np.percentile(values, 99)), 3),
+        },
+    }
+
+def time_calls(func, inputs, warmup):
+    """
+    Call func on every input, after warmup untimed calls on the first inputs
+
+    Returns:
+        Tuple of (results, per-call latencies in seconds, total seconds of the timed calls)
+    """
+    for item in inputs[:warmup]:
+        func(item)
+
+    results = []
+    latencies = []
+    for item in inputs:
+        start = time.perf_counter()
+        results.append(func(item))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies, sum(latencies)
+
+def field_accuracy(results, truths):
+    """Fraction of results whose license_plate and each of its components match the truth"""
+    return {
+        field: round(sum(result.get(field) == truth[field] for result, truth in zip(results, truths)) / len(truths), 4)
+        for field in ACCURACY_FIELDS
+    } if truths else {}
+
+def ocr_like_text(truth, rng):
+    """Plate text as Tesseract tends to return it: mixed digit scripts, varied separators, sometimes one line"""
+    area_line, number = truth['lines']
+    if rng.random() < 0.3:
+        number = number.translate(TO_ENGLISH_DIGITS)
+    number = number.replace('-', ['-', ' - ', ' ', ''][rng.integers(4)])
+    if rng.random() < 0.2:
+        area_line = area_line.replace('-', ' ')
+    if rng.random() < 0.2:
+        return f"{area_line} {number}"
+    return f"{area_line}\n{number}"
+
+def build_stand_in_model(path, input_size=320, seed=0):
+    """
+    Write a tiny random-weight ONNX model with the YOLOv8 output layout (1, 5, anchors)
+
+    Stands in for the plate model when none is available, so the detector path
+    (letterbox, ONNX Runtime forward pass, decode and NMS) can still be timed.
+    Its detections are meaningless, so its accuracy says nothing.
+    """
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(seed)
+    nodes = []
+    initializers = []
+    previous, channels = 'images', 3
+    # Four stride-2 convolutions and a final stride-2 head: 32x downsampling like YOLO's P5 grid
+    for index, out_channels in enumerate([8, 16, 32, 32, 5]):
+        weight = rng.normal(0, 0.1, (out_channels, channels, 3, 3)).astype(np.float32)
+        bias = np.zeros(out_channels, dtype=np.float32)
+        if out_channels == 5:
+            bias[4] = -0.25  # Keep most anchors below the confidence threshold, as a trained model would
+        initializers += [numpy_helper.from_array(weight, f'w{index}'), numpy_helper.from_array(bias, f'b{index}')]
+        output = f'conv{index}'
+        nodes.append(helper.make_node('Conv', [previous, f'w{index}', f'b{index}'], [output], strides=[2, 2], pads=[1, 1, 1, 1]))
+        if out_channels != 5:
+            nodes.append(helper.make_node('Relu', [output], [f'relu{index}']))
+            output = f'relu{index}'
+        previous, channels = output, out_channels
+
+    # Sigmoid, then scale to letterbox pixels: centers over the whole input, sizes up to a quarter of it
+    scale = np.array([input_size, input_size, input_size / 4, input_size / 4, 1.0], dtype=np.float32).reshape(1, 5, 1)
+    initializers += [
+        numpy_helper.from_array(np.array([0, 5, -1], dtype=np.int64), 'shape'),
+        numpy_helper.from_array(scale, 'scale'),
+    ]
+    nodes += [
+        helper.make_node('Reshape', [previous, 'shape'], ['flat']),
+        helper.make_node('Sigmoid', ['flat'], ['sigmoid']),
+        helper.make_node('Mul', ['sigmoid', 'scale'], ['output0']),
+    ]
+
+    graph = helper.make_graph(
+        nodes, 'plate_stand_in',
+        [helper.make_tensor_value_info('images', TensorProto.FLOAT, ['batch', 3, input_size, input_size])],
+        [helper.make_tensor_value_info('output0', TensorProto.FLOAT, ['batch', 5, None])],
+        initializers
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    onnx.checker.check_model(model)
+    onnx.save(model, str(path))
+    return str(path)
+
+def bench_preprocess(options):
+    from ocr_extractor import BanglaLicensePlateOCR
+
+    generator = SyntheticPlateGenerator(options['seed'], options['font'])
+    crops = [generator.plate_crop()[0] for _ in range(options['samples'])]
+
+    ocr = BanglaLicensePlateOCR(self_test=False)
+    _, latencies, elapsed = time_calls(ocr.preprocess_image, crops, options['warmup'])
+    return {'samples': len(crops), 'preprocess_mode': ocr.preprocess_mode, **latency_stats(latencies, elapsed)}
+
+def bench_parse(options):
+    from ocr_extractor import BanglaLicensePlateOCR
+
+    generator = SyntheticPlateGenerator(options['seed'], options['font'])
+    rng = np.random.default_rng(options['seed'])
+    # Parsing is cheap, so it gets more samples than the image benchmarks
+    truths = [generator.plate_crop()[1] for _ in range(options['samples'])] * 20
+    texts = [ocr_like_text(truth, rng) for truth in truths]
+
+    ocr = BanglaLicensePlateOCR(self_test=False)
+    # Keep the parser's per-word debug output from dominating the timings
+    stderr, sys.stderr = sys.stderr, open(os.devnull, 'w')
+    try:
+        results, latencies, elapsed = time_calls(ocr.parse_two_line_license_plate, texts, options['warmup'])
+    finally:
+        sys.stderr.close()
+        sys.stderr = stderr
+    return {'samples': len(texts), **latency_stats(latencies, elapsed), 'accuracy': field_accuracy(results, truths)}
+
+def bench_ocr_sweep(options):
+    from ocr_extractor import BanglaLicensePlateOCR
+    from result_cache import ResultCache
+
+    generator = SyntheticPlateGenerator(options['seed'], options['font'])
+    samples = [generator.plate_crop() for _ in range(options['samples'])]
+
+    # Every config runs (no early exit) and warmup images are not answered from the cache
+    ocr = BanglaLicensePlateOCR(early_exit_score=0, result_cache=ResultCache(enabled=False))
+    results, latencies, elapsed = time_calls(ocr.extract_text, [image for image, _ in samples], options['warmup'])
+    return {
+        'samples': len(samples),
+        'backend': ocr.engine.name,
+        'configs': len(ocr.OCR_CONFIGS),
+        'ocr_workers': ocr.ocr_workers,
+        **latency_stats(latencies, elapsed),
+        'accuracy': field_accuracy(results, [truth for _, truth in samples]),
+    }
+
+def bench_detector(options):
+    from result_cache import ResultCache
+    from yolo_detector import YOLOLicensePlateDetector
+
+    model_path = options['model']
+    stand_in = not model_path or not Path(model_path).exists()
+    if stand_in and importlib.util.find_spec('onnx') is None:
+        # The stand-in model is built with the onnx package, which the app itself does not need
+        reason = "no plate model (--model or YOLO_MODEL_PATH) and the onnx package to build the stand-in is not installed (pip install onnx)"
+        print(f"Skipping detector benchmark: {reason}", file=sys.stderr)
+        return {'skipped': reason}
+
+    generator = SyntheticPlateGenerator(options['seed'], options['font'])
+    samples = [generator.frame() for _ in range(options['samples'])]
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        if stand_in:
+            model_path = build_stand_in_model(Path(model_dir) / 'stand_in.onnx')
+        detector = YOLOLicensePlateDetector(model_path, confidence_threshold=0.5, nms_threshold=0.4, result_cache=ResultCache(enabled=False))
+        results, latencies, elapsed = time_calls(detector.detect_license_plates, [frame for frame, _ in samples], options['warmup'])
+
+    matched_ious = []
+    total_predicted = 0
+    for result, (frame, truth) in zip(results, samples):
+        height, width = frame.shape[:2]
+        predicted = [[x / width, y / height, (x + w) / width, (y + h) / height] for x, y, w, h in (d['bbox'] for d in result['detections'])]
+        x, y, w, h = truth['bbox']
+        total_predicted += len(predicted)
+        matched_ious.extend(match_detections(predicted, [[x / width, y / height, (x + w) / width, (y + h) / height]], 0.5))
+
+    return {
+        'samples': len(samples),
+        'model': 'stand-in' if stand_in else model_path,
+        'backend': detector.model_type,
+        'input_size': detector.input_size,
+        **latency_stats(latencies, elapsed),
+        'accuracy': {
+            'recall': round(len(matched_ious) / len(samples), 4),
+            'precision': round(len(matched_ious) / total_predicted, 4) if total_predicted else None,
+            'mean_iou': round(float(np.mean(matched_ious)), 4) if matched_ious else None,
+        },
+    }
+
+def run_benchmark(name, options):
+    """Run one benchmark; meant to run in its own process so peak RSS is per benchmark"""
+    result = globals()[f'bench_{name}'](options)
+    return {'benchmark': name, **result, 'peak_rss_mb': peak_rss_mb()}
+
+def compare(report, baseline, latency_tolerance, accuracy_tolerance):
+    """
+    Compare a report with a saved baseline report
+
+    Returns:
+        List of per-benchmark comparisons; 'regression' is set when p50 latency grew by more
+        than latency_tolerance (a fraction) or an accuracy figure fell by more than accuracy_tolerance
+    """
+    if any(report['settings'][key] != baseline['settings'].get(key) for key in ('seed', 'samples', 'font')):
+        print("Warning: baseline was recorded with a different seed, sample count or font; "
+              "the inputs differ and the comparison is only indicative", file=sys.stderr)
+
+    previous = {entry['benchmark']: entry for entry in baseline['benchmarks']}
+    comparisons = []
+    for entry in report['benchmarks']:
+        before = previous.get(entry['benchmark'])
+        if before is None or any(key in entry or key in before for key in ('error', 'skipped')):
+            continue
+
+        p50_change = entry['latency_ms']['p50'] / max(before['latency_ms']['p50'], 1e-9) - 1
+        accuracy_changes = {
+            field: round(value - before['accuracy'][field], 4)
+            for field, value in entry.get('accuracy', {}).items()
+            if value is not None and before.get('accuracy', {}).get(field) is not None
+        }
+        comparisons.append({
+            'benchmark': entry['benchmark'],
+            'p50_change': round(p50_change, 4),
+            'p95_change': round(entry['latency_ms']['p95'] / max(before['latency_ms']['p95'], 1e-9) - 1, 4),
+            'throughput_change': round(entry['throughput_per_s'] / max(before['throughput_per_s'], 1e-9) - 1, 4),
+            'accuracy_change': accuracy_changes,
+            'regression': p50_change > latency_tolerance or any(change < -accuracy_tolerance for change in accuracy_changes.values()),
+        })
+    return comparisons
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing, parsing, the OCR sweep and the detector on synthetic plates")
+    parser.add_argument('--benchmarks', default=','.join(BENCHMARKS), help="Comma-separated benchmarks to run")
+    parser.add_argument('--samples', type=int, default=30, help="Synthetic images per benchmark")
+    parser.add_argument('--warmup', type=int, default=3, help="Untimed calls before each benchmark")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic corpus")
+    parser.add_argument('--font', help="Bangla font file (default: BENCH_FONT or a known system font)")
+    parser.add_argument('--model', default=os.getenv('YOLO_MODEL_PATH'), help="Plate model (default: YOLO_MODEL_PATH, else a tiny stand-in)")
+    parser.add_argument('--baseline', help="Earlier report to compare against; exits with 1 on a regression")
+    parser.add_argument('--latency-tolerance', type=float, default=0.10, help="Allowed p50 latency increase over the baseline")
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.01, help="Allowed accuracy drop below the baseline")
+    parser.add_argument('--output', help="Also write the JSON report to this file (usable as a later --baseline)")
+    args = parser.parse_args()
+
+    options = {
+        'samples': args.samples,
+        'warmup': args.warmup,
+        'seed': args.seed,
+        'font': find_bangla_font(args.font),
+        'model': args.model,
+    }
+
+    benchmarks = []
+    # A fresh process per benchmark keeps peak RSS and warm caches from leaking between them
+    context = multiprocessing.get_context('spawn')
+    for name in args.benchmarks.split(','):
+        name = name.strip()
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name}. Choose from: {', '.join(BENCHMARKS)}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Running benchmark {name} on {args.samples} synthetic samples...", file=sys.stderr)
+        with context.Pool(1) as pool:
+            try:
+                result = pool.apply(run_benchmark, (name, options))
+            except Exception as e:
+                result = {'benchmark': name, 'error': str(e)}
+        benchmarks.append(result)
+        print(json.dumps(result, ensure_ascii=False), file=sys.stderr)
+
+    report = {
+        'settings': {key: options[key] for key in ('seed', 'samples', 'warmup', 'font')},
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'benchmarks': benchmarks,
+    }
+
+    regressed = False
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        report['comparison'] = compare(report, baseline, args.latency_tolerance, args.accuracy_tolerance)
+        regressed = any(entry['regression'] for entry in report['comparison'])
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+    print(output)
+    if regressed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
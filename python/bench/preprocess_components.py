@@ -0,0 +1,83 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Benchmarks run from python/bench; the modules under test live one level up
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ocr_extractor import BanglaLicensePlateOCR
+
+def legacy_filter_components(binary, min_area, max_area):
+    """Component filter as preprocess_image used to do it: one full-image comparison per component"""
+    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(binary)
+    mask = np.zeros_like(binary)
+    for i in range(1, num_labels):
+        area = stats[i, cv2.CC_STAT_AREA]
+        if min_area <= area <= max_area:
+            mask[labels == i] = 255
+    return mask
+
+def noisy_plate(height, width, noise, seed=0):
+    """Grayscale plate-like crop: two lines of text plus salt-and-pepper noise"""
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width), 220, dtype=np.uint8)
+    scale = height / 60
+    cv2.putText(image, 'DHAKA METRO GA', (int(width * 0.05), int(height * 0.4)), cv2.FONT_HERSHEY_SIMPLEX, scale * 0.8, 20, max(1, int(scale * 2)))
+    cv2.putText(image, '12-3456', (int(width * 0.2), int(height * 0.85)), cv2.FONT_HERSHEY_SIMPLEX, scale, 20, max(1, int(scale * 2)))
+    speckles = rng.random((height, width)) < noise
+    image[speckles] = rng.integers(0, 255, speckles.sum(), dtype=np.uint8)
+    return image
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the vectorized component filter against the per-component loop")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case; the fastest is reported")
+    parser.add_argument('--noise', type=float, default=0.05, help="Fraction of pixels replaced with noise")
+    args = parser.parse_args()
+
+    ocr = BanglaLicensePlateOCR(self_test=False)
+    report = []
+
+    # Crop sizes before preprocess_image's upscale (the last one is a frame without a bbox)
+    for height, width in [(60, 200), (150, 450), (400, 1200)]:
+        plate = noisy_plate(height, width, args.noise)
+        binary = cv2.adaptiveThreshold(
+            cv2.resize(plate, (width * 3, height * 3), interpolation=cv2.INTER_CUBIC),
+            255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 15, 2
+        )
+        max_area = binary.size // 4
+        num_labels = cv2.connectedComponents(binary)[0]
+
+        legacy, legacy_time = time_call(lambda: legacy_filter_components(binary, 50, max_area), args.repeat)
+        vectorized, vectorized_time = time_call(lambda: ocr._filter_components(binary, 50, max_area), args.repeat)
+        _, preprocess_time = time_call(lambda: ocr.preprocess_image(plate), args.repeat)
+
+        report.append({
+            'crop': f'{width}x{height}',
+            'filtered_image': f'{binary.shape[1]}x{binary.shape[0]}',
+            'components': num_labels - 1,
+            'identical': bool(legacy.dtype == vectorized.dtype and np.array_equal(legacy, vectorized)),
+            'legacy_filter_ms': round(legacy_time * 1000, 2),
+            'vectorized_filter_ms': round(vectorized_time * 1000, 2),
+            'speedup': round(legacy_time / max(vectorized_time, 1e-9), 1),
+            'preprocess_image_ms': round(preprocess_time * 1000, 2),
+        })
+
+    print(json.dumps(report, indent=2))
+    if not all(case['identical'] for case in report):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Benchmarks run from python/bench; the modules under test live one level up
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from image_io import load_image
+from ocr_extractor import BanglaLicensePlateOCR
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+def load_truth(truth_path):
+    """
+    Read the ground truth for the corpus
+
+    The file maps image file names to either the expected license plate string or
+    {"license_plate": "...", "bbox": [x, y, w, h]} when the image is a full frame.
+    """
+    if not truth_path:
+        return {}
+    with open(truth_path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    return {name: entry if isinstance(entry, dict) else {'license_plate': entry} for name, entry in raw.items()}
+
+def percentiles(values):
+    values = np.array(values) if values else np.zeros(1)
+    return {
+        'p50': round(float(np.percentile(values, 50)), 1),
+        'p95': round(float(np.percentile(values, 95)), 1),
+        'max': round(float(values.max()), 1),
+    }
+
+def evaluate_mode(mode, images, truth, target_height, preprocess_only):
+    ocr = BanglaLicensePlateOCR(self_test=False, preprocess_mode=mode, target_height=target_height)
+    preprocess_ms = []
+    total_ms = []
+    correct = 0
+    labelled = 0
+
+    for image_path in images:
+        image = load_image(str(image_path))
+        entry = truth.get(image_path.name, {})
+        bbox = entry.get('bbox')
+
+        start = time.perf_counter()
+        ocr.preprocess_image(image, bbox)
+        preprocess_ms.append((time.perf_counter() - start) * 1000)
+
+        if preprocess_only:
+            continue
+
+        start = time.perf_counter()
+        result = ocr.extract_text(image, bbox)
+        total_ms.append((time.perf_counter() - start) * 1000)
+
+        if 'license_plate' in entry:
+            labelled += 1
+            if result.get('license_plate') == entry['license_plate']:
+                correct += 1
+
+    report = {
+        'mode': mode,
+        'images': len(images),
+        'preprocess_ms': percentiles(preprocess_ms),
+    }
+    if not preprocess_only:
+        report['ocr_total_ms'] = percentiles(total_ms)
+        report['plate_accuracy'] = round(correct / labelled, 4) if labelled else None
+        report['labelled_images'] = labelled
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy vs latency of the OCR preprocessing modes on a local plate corpus")
+    parser.add_argument('images', help="Folder of plate crops or camera frames")
+    parser.add_argument('--truth', help="JSON file mapping image names to the expected plate (and optional bbox)")
+    parser.add_argument('--target-height', type=int, default=BanglaLicensePlateOCR.DEFAULT_TARGET_HEIGHT,
+                        help="Target plate height for the adaptive mode")
+    parser.add_argument('--preprocess-only', action='store_true', help="Only time preprocess_image (no Tesseract needed)")
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    images = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not images:
+        print(f"No images found in: {args.images}", file=sys.stderr)
+        sys.exit(1)
+
+    truth = load_truth(args.truth)
+    report = [evaluate_mode(mode, images, truth, args.target_height, args.preprocess_only) for mode in ('legacy', 'adaptive')]
+
+    output = json.dumps({'target_height': args.target_height, 'modes': report}, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Benchmarks run from python/bench; the modules under test live one level up
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from area_matcher import AREA_ALIASES, VEHICLE_CLASS_LETTERS
+from plate_parser import TO_BANGLA_DIGITS, TO_ENGLISH_DIGITS, format_license_plate
+
+# Cities whose plates carry "মেট্রো" after the area name
+METRO_AREAS = ['ঢাকা', 'চট্টগ্রাম', 'সিলেট', 'রাজশাহী', 'বরিশাল', 'খুলনা']
+AREAS = [area for area in AREA_ALIASES if area != 'মেট্রো']
+
+# Fonts that cover Bangla, tried in order when neither --font nor BENCH_FONT is given
+BANGLA_FONT_CANDIDATES = [
+    '/usr/share/fonts/truetype/noto/NotoSansBengali-Regular.ttf',
+    '/usr/share/fonts/noto/NotoSansBengali-Regular.ttf',
+    '/usr/share/fonts/truetype/lohit-bengali/Lohit-Bengali.ttf',
+    '/usr/share/fonts/truetype/fonts-beng-extra/kalpurush.ttf',
+    '/Library/Fonts/Kohinoor Bangla.ttc',
+    '/System/Library/Fonts/KohinoorBangla.ttc',
+    'C:/Windows/Fonts/Nirmala.ttf',
+    'C:/Windows/Fonts/vrinda.ttf',
+]
+
+def find_bangla_font(font_path=None):
+    """Path of a font with Bangla glyphs (font_path, BENCH_FONT or a known system font), or None"""
+    for candidate in [font_path, os.getenv('BENCH_FONT'), *BANGLA_FONT_CANDIDATES]:
+        if candidate and Path(candidate).exists():
+            return candidate
+    return None
+
+def random_plate_text(rng):
+    """
+    Random plate contents in the Bangladeshi two-line format
+
+    Returns:
+        Dictionary with the two text lines and the expected area_name, vehicle_class,
+        number and license_plate as the parser should report them
+    """
+    area = AREAS[rng.integers(len(AREAS))]
+    vehicle_class = VEHICLE_CLASS_LETTERS[rng.integers(len(VEHICLE_CLASS_LETTERS))]
+    digits = ''.join(str(d) for d in rng.integers(0, 10, 6))
+    number = f"{digits[:2]}-{digits[2:]}".translate(TO_BANGLA_DIGITS)
+
+    area_line = f"{area} মেট্রো" if area in METRO_AREAS and rng.random() < 0.5 else area
+    return {
+        'lines': [f"{area_line}-{vehicle_class}", number],
+        'area_name': area,
+        'vehicle_class': vehicle_class,
+        'number': number,
+        'license_plate': format_license_plate(area, vehicle_class, number),
+    }
+
+class SyntheticPlateGenerator:
+    # Clean plates are drawn at this size before they are warped and degraded
+    PLATE_SIZE = (480, 240)
+
+    def __init__(self, seed=0, font_path=None):
+        """
+        Reproducible synthetic plate crops and camera frames with known ground truth
+
+        Without a Bangla font the plates fall back to OpenCV's Hershey font with the English
+        area alias and Latin digits. The area and number still parse from that, the class
+        letter does not, so OCR accuracy is only meaningful with a font.
+
+        Args:
+            seed: Seed of the random generator; the same seed gives the same corpus
+            font_path: Bangla TTF/TTC font (default BENCH_FONT or a known system font)
+        """
+        self.rng = np.random.default_rng(seed)
+        self.font_path = find_bangla_font(font_path)
+        self._fonts = {}
+        if self.font_path is None:
+            print("No Bangla font found (set BENCH_FONT); drawing plates with the Hershey fallback", file=sys.stderr)
+
+    def _font(self, size):
+        from PIL import ImageFont, features
+
+        if size not in self._fonts:
+            # Conjuncts such as ট্ট and ্র only render correctly with complex text layout
+            layout = ImageFont.Layout.RAQM if features.check('raqm') else ImageFont.Layout.BASIC
+            self._fonts[size] = ImageFont.truetype(self.font_path, size, layout_engine=layout)
+        return self._fonts[size]
+
+    def render_plate(self, truth):
+        """Clean, axis-aligned BGR plate image for the truth from random_plate_text"""
+        width, height = self.PLATE_SIZE
+        plate = np.full((height, width, 3), 245, dtype=np.uint8)
+        cv2.rectangle(plate, (4, 4), (width - 5, height - 5), (20, 20, 20), 4)
+
+        if self.font_path is None:
+            english = AREA_ALIASES[truth['area_name']][0].upper()
+            lines = [english, truth['number'].translate(TO_ENGLISH_DIGITS)]
+            for line, (scale, y) in zip(lines, [(1.6, 95), (2.4, 200)]):
+                (text_width, _), _ = cv2.getTextSize(line, cv2.FONT_HERSHEY_SIMPLEX, scale, 5)
+                cv2.putText(plate, line, ((width - text_width) // 2, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (20, 20, 20), 5)
+            return plate
+
+        from PIL import Image, ImageDraw
+
+        image = Image.fromarray(plate[:, :, ::-1])
+        draw = ImageDraw.Draw(image)
+        for line, size, center_y in zip(truth['lines'], (64, 88), (62, 170)):
+            font = self._font(size)
+            left, top, right, bottom = draw.textbbox((0, 0), line, font=font)
+            draw.text(((width - (right - left)) // 2 - left, center_y - (bottom + top) // 2), line, font=font, fill=(20, 20, 20))
+        return np.array(image)[:, :, ::-1].copy()
+
+    def _degrade(self, image):
+        """Blur, sensor noise and a brightness/contrast change, in place of a real camera"""
+        sigma = self.rng.uniform(0.0, 1.5)
+        if sigma > 0.3:
+            image = cv2.GaussianBlur(image, (0, 0), sigma)
+        contrast = self.rng.uniform(0.7, 1.1)
+        brightness = self.rng.uniform(-30, 20)
+        noise = self.rng.normal(0, self.rng.uniform(2, 12), image.shape)
+        return np.clip(image.astype(np.float32) * contrast + brightness + noise, 0, 255).astype(np.uint8)
+
+    def _quad(self, x, y, width, height):
+        """Destination corners of a plate at (x, y), with each corner jittered for perspective"""
+        jitter = self.rng.uniform(-0.08, 0.08, (4, 2)) * (width, height)
+        corners = np.array([[x, y], [x + width, y], [x + width, y + height], [x, y + height]], dtype=np.float32)
+        return (corners + jitter).astype(np.float32)
+
+    def _warp_onto(self, canvas, plate, quad):
+        source = np.array([[0, 0], [plate.shape[1], 0], [plate.shape[1], plate.shape[0]], [0, plate.shape[0]]], dtype=np.float32)
+        matrix = cv2.getPerspectiveTransform(source, quad)
+        size = (canvas.shape[1], canvas.shape[0])
+        warped = cv2.warpPerspective(plate, matrix, size, flags=cv2.INTER_AREA)
+        mask = cv2.warpPerspective(np.full(plate.shape[:2], 255, dtype=np.uint8), matrix, size)
+        canvas[mask > 0] = warped[mask > 0]
+        return canvas
+
+    def plate_crop(self):
+        """
+        Degraded plate crop roughly as the detector would cut it out of a frame
+
+        Returns:
+            Tuple of (BGR image, truth dictionary)
+        """
+        truth = random_plate_text(self.rng)
+        plate = self.render_plate(truth)
+
+        width = int(self.rng.uniform(140, 320))
+        height = width // 2
+        margin_x, margin_y = width // 10, height // 6
+        canvas = np.full((height + 2 * margin_y, width + 2 * margin_x, 3), int(self.rng.uniform(60, 160)), dtype=np.uint8)
+        canvas = self._warp_onto(canvas, plate, self._quad(margin_x, margin_y, width, height))
+        return self._degrade(canvas), truth
+
+    def frame(self, size=(1280, 720)):
+        """
+        Degraded camera-like frame with one plate in it
+
+        Returns:
+            Tuple of (BGR image, truth dictionary with the plate's [x, y, w, h] bbox)
+        """
+        truth = random_plate_text(self.rng)
+        plate = self.render_plate(truth)
+        frame_width, frame_height = size
+
+        # Road gradient with a box of vehicle body around the plate
+        column = np.linspace(70, 150, frame_height, dtype=np.float32)[:, None, None]
+        frame = np.broadcast_to(column, (frame_height, frame_width, 3)).astype(np.uint8).copy()
+        width = int(self.rng.uniform(0.1, 0.22) * frame_width)
+        height = width // 2
+        x = int(self.rng.uniform(0.1, 0.9) * frame_width - width / 2)
+        y = int(self.rng.uniform(0.45, 0.85) * frame_height - height / 2)
+        body = tuple(int(c) for c in self.rng.integers(30, 220, 3))
+        cv2.rectangle(frame, (max(0, x - width), max(0, y - height * 3)), (x + 2 * width, y + height * 2), body, -1)
+
+        quad = self._quad(x, y, width, height)
+        frame = self._warp_onto(frame, plate, quad)
+        bx, by, bw, bh = cv2.boundingRect(quad.round().astype(np.int32))
+        bx, by = max(0, bx), max(0, by)
+        truth['bbox'] = [bx, by, min(bw, frame_width - bx), min(bh, frame_height - by)]
+        return self._degrade(frame), truth
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Bangladeshi plate corpus with ground truth")
+    parser.add_argument('output', help="Folder the images and truth.json are written to")
+    parser.add_argument('--count', type=int, default=50, help="Number of images")
+    parser.add_argument('--frames', action='store_true', help="Write full camera frames (truth includes the bbox) instead of crops")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--font', help="Bangla font file (default: BENCH_FONT or a known system font)")
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    generator = SyntheticPlateGenerator(args.seed, args.font)
+
+    truth = {}
+    for index in range(args.count):
+        image, entry = generator.frame() if args.frames else generator.plate_crop()
+        name = f"plate_{index:04d}.png"
+        cv2.imwrite(str(output / name), image)
+        truth[name] = {key: entry[key] for key in ('license_plate', 'bbox') if key in entry}
+
+    # Same format as the --truth file of preprocess_modes.py
+    (output / 'truth.json').write_text(json.dumps(truth, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"Wrote {args.count} images to {output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+
+import cv2
+
+from image_io import load_image, load_image_reduced, image_size
+from instrumentation import StageTimer
+
+class CoarseToFineDetector:
+    def __init__(self, detector, coarse_factor=4, refine_scale=0.0, margin=0.3):
+        """
+        Two-stage plate detection for high-resolution lane cameras
+
+        Stage one runs the detector on a reduced decode of the frame (JPEG files and bytes are
+        decoded straight at 1/2, 1/4 or 1/8 size) and maps the boxes back to full resolution.
+        Stage two, when refine_scale is set, runs the detector again on full-resolution crops
+        around those boxes to tighten them. The full frame is only decoded when stage two or
+        the caller (for OCR crops) needs it.
+
+        Args:
+            detector: YOLOLicensePlateDetector instance
+            coarse_factor: Size reduction of the frame for stage one (2, 4 and 8 use reduced JPEG decoding)
+            refine_scale: Scale of the full-resolution crops in stage two; 0 skips the refinement
+            margin: Context added around a coarse box on each side for stage two, as a fraction of its size
+        """
+        self.detector = detector
+        self.coarse_factor = max(1, coarse_factor)
+        self.refine_scale = refine_scale
+        self.margin = margin
+
+    @classmethod
+    def from_env(cls, detector):
+        """Cascade configured by YOLO_CASCADE_COARSE, YOLO_CASCADE_REFINE_SCALE and YOLO_CASCADE_MARGIN"""
+        return cls(
+            detector,
+            coarse_factor=int(os.getenv('YOLO_CASCADE_COARSE', 4)),
+            refine_scale=float(os.getenv('YOLO_CASCADE_REFINE_SCALE', 0)),
+            margin=float(os.getenv('YOLO_CASCADE_MARGIN', 0.3))
+        )
+
+    @staticmethod
+    def _full_size(source, coarse_shape):
+        """Full-resolution (width, height), matched to the orientation of the decoded coarse image"""
+        width, height = image_size(source)
+        coarse_height, coarse_width = coarse_shape[:2]
+        # imread applies EXIF rotation, the header size does not; pick the orientation that fits
+        if abs(width / coarse_width - height / coarse_height) > abs(height / coarse_width - width / coarse_height):
+            width, height = height, width
+        return width, height
+
+    def _refine(self, frame, detections, timer):
+        """Re-detect each coarse box on a full-resolution crop around it"""
+        frame_height, frame_width = frame.shape[:2]
+        crops = []
+        origins = []
+        for detection in detections:
+            x, y, w, h = detection['bbox']
+            pad_x, pad_y = int(w * self.margin), int(h * self.margin)
+            x1, y1 = max(0, x - pad_x), max(0, y - pad_y)
+            x2, y2 = min(frame_width, x + w + pad_x), min(frame_height, y + h + pad_y)
+            crop = frame[y1:y2, x1:x2]
+            if self.refine_scale != 1.0:
+                crop = cv2.resize(crop, None, fx=self.refine_scale, fy=self.refine_scale, interpolation=cv2.INTER_AREA)
+            crops.append(crop)
+            origins.append((x1, y1))
+
+        with timer.stage('refine'):
+            results = self.detector.detect_license_plates_batch(crops)
+
+        refined = []
+        for detection, result, (x1, y1) in zip(detections, results, origins):
+            if not result['detections']:
+                # Keep the coarse box when the crop gives nothing better
+                refined.append({**detection, 'refined': False})
+                continue
+            best = max(result['detections'], key=lambda d: d['confidence'])
+            x, y, w, h = (int(round(v / self.refine_scale)) for v in best['bbox'])
+            refined.append({**best, 'bbox': [x + x1, y + y1, w, h], 'refined': True})
+        return refined
+
+    def detect_with_frame(self, image_source):
+        """
+        Detect plates and return the full-resolution frame for cropping them
+
+        Args:
+            image_source: Path to image file, encoded image bytes or BGR numpy array
+
+        Returns:
+            Tuple of (result dictionary as from detect_license_plates with bboxes in original image
+            coordinates, full-resolution BGR frame or None when no plate was found)
+        """
+        start_time = time.time()
+        timer = StageTimer('cascade')
+
+        with timer.stage('coarse_decode'):
+            coarse = load_image_reduced(image_source, self.coarse_factor)
+            full_width, full_height = self._full_size(image_source, coarse.shape)
+
+        result = self.detector.detect_license_plates_batch([coarse])[0]
+        scale_x, scale_y = full_width / coarse.shape[1], full_height / coarse.shape[0]
+        detections = [
+            {**d, 'bbox': [int(d['bbox'][0] * scale_x), int(d['bbox'][1] * scale_y),
+                           int(round(d['bbox'][2] * scale_x)), int(round(d['bbox'][3] * scale_y))]}
+            for d in result['detections']
+        ]
+
+        frame = None
+        if detections:
+            with timer.stage('full_decode'):
+                frame = load_image(image_source)
+            if self.refine_scale > 0:
+                detections = self._refine(frame, detections, timer)
+
+        print(f"Cascade: {len(detections)} plate(s) from a {coarse.shape[1]}x{coarse.shape[0]} coarse pass "
+              f"on a {full_width}x{full_height} frame", file=sys.stderr)
+
+        result['detections'] = detections
+        result['stage_ms'] = {**result.get('stage_ms', {}), **timer.as_ms()}
+        result['processing_time'] = round(time.time() - start_time, 2)
+        result['cascade'] = {
+            'coarse_factor': self.coarse_factor,
+            'coarse_size': [coarse.shape[1], coarse.shape[0]],
+            'image_size': [full_width, full_height],
+            'refine_scale': self.refine_scale
+        }
+        return result, frame
+
+    def detect(self, image_source):
+        """Detect plates; same result as detect_with_frame without the frame"""
+        return self.detect_with_frame(image_source)[0]
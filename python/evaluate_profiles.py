@@ -0,0 +1,176 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+def load_labels(image_path, labels_dir=None):
+    """
+    Read YOLO-format plate labels for an image
+
+    Labels are `<class> <cx> <cy> <w> <h>` lines normalized to [0, 1], in a .txt file
+    with the image's name, either next to the image or in labels_dir.
+
+    Returns:
+        List of [x1, y1, x2, y2] boxes in normalized coordinates
+    """
+    label_dir = Path(labels_dir) if labels_dir else image_path.parent
+    label_path = label_dir / f"{image_path.stem}.txt"
+    boxes = []
+
+    if label_path.exists():
+        for line in label_path.read_text().splitlines():
+            parts = line.split()
+            if len(parts) < 5:
+                continue
+            cx, cy, w, h = map(float, parts[1:5])
+            boxes.append([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2])
+
+    return boxes
+
+def box_iou(a, b):
+    """IoU of two [x1, y1, x2, y2] boxes"""
+    w = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    h = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = w * h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+def match_detections(predicted, ground_truth, iou_threshold):
+    """Greedily match ground-truth boxes to predictions; returns the IoU of every matched pair"""
+    unmatched = list(range(len(predicted)))
+    ious = []
+
+    for truth in ground_truth:
+        best_iou, best_index = 0.0, None
+        for i in unmatched:
+            iou = box_iou(truth, predicted[i])
+            if iou > best_iou:
+                best_iou, best_index = iou, i
+        if best_index is not None and best_iou >= iou_threshold:
+            unmatched.remove(best_index)
+            ious.append(best_iou)
+
+    return ious
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where it cannot be measured"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    except ImportError:
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+        except Exception:
+            return None
+
+def evaluate_profile(profile, model_path, images, labels_dir, iou_threshold, warmup):
+    """Run one profile over the image set; meant to run in its own process so peak RSS is per profile"""
+    import cv2
+    from yolo_detector import YOLOLicensePlateDetector
+
+    load_start = time.time()
+    try:
+        detector = YOLOLicensePlateDetector(model_path=model_path, confidence_threshold=0.5, nms_threshold=0.4, profile=profile)
+    except SystemExit:
+        # The detector exits the process on load errors; turn that into a per-profile failure
+        raise RuntimeError(f"Could not load model {model_path} with profile {profile}")
+    load_time = time.time() - load_start
+
+    latencies = []
+    matched_ious = []
+    total_truth = 0
+    total_predicted = 0
+
+    for index, image_path in enumerate(images):
+        image = cv2.imread(str(image_path))
+        if image is None:
+            print(f"Skipping unreadable image: {image_path}", file=sys.stderr)
+            continue
+        height, width = image.shape[:2]
+
+        start = time.perf_counter()
+        result = detector.detect_license_plates(image)
+        elapsed = time.perf_counter() - start
+        if index >= warmup:
+            latencies.append(elapsed * 1000)
+
+        predicted = [
+            [x / width, y / height, (x + w) / width, (y + h) / height]
+            for x, y, w, h in (d['bbox'] for d in result['detections'])
+        ]
+        ground_truth = load_labels(image_path, labels_dir)
+        total_truth += len(ground_truth)
+        total_predicted += len(predicted)
+        matched_ious.extend(match_detections(predicted, ground_truth, iou_threshold))
+
+    latencies = np.array(latencies) if latencies else np.zeros(1)
+    return {
+        'profile': profile,
+        'input_size': detector.input_size,
+        'model_load_s': round(load_time, 2),
+        'images': len(images),
+        'latency_ms': {
+            'mean': round(float(latencies.mean()), 1),
+            'p50': round(float(np.percentile(latencies, 50)), 1),
+            'p90': round(float(np.percentile(latencies, 90)), 1),
+            'p95': round(float(np.percentile(latencies, 95)), 1),
+            'p99': round(float(np.percentile(latencies, 99)), 1),
+        },
+        'peak_rss_mb': peak_rss_mb(),
+        'recall': round(len(matched_ious) / total_truth, 4) if total_truth else None,
+        'precision': round(len(matched_ious) / total_predicted, 4) if total_predicted else None,
+        'mean_iou': round(float(np.mean(matched_ious)), 4) if matched_ious else None,
+    }
+
+def _run_in_process(args):
+    return evaluate_profile(*args)
+
+def main():
+    from yolo_detector import DETECTOR_PROFILES
+
+    parser = argparse.ArgumentParser(description="Compare detector profiles on a folder of labelled plate images")
+    parser.add_argument('images', help="Folder of plate images (YOLO .txt labels next to them or in --labels)")
+    parser.add_argument('--labels', help="Folder containing the YOLO .txt label files")
+    parser.add_argument('--model', default=os.getenv('YOLO_MODEL_PATH', 'yolo.pt'), help="Model path (default: YOLO_MODEL_PATH)")
+    parser.add_argument('--profiles', default=','.join(DETECTOR_PROFILES), help="Comma-separated profiles to evaluate")
+    parser.add_argument('--iou', type=float, default=0.5, help="IoU needed for a detection to count as a hit")
+    parser.add_argument('--warmup', type=int, default=2, help="Images excluded from latency stats while the model warms up")
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    images = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not images:
+        print(f"No images found in: {args.images}", file=sys.stderr)
+        sys.exit(1)
+
+    report = []
+    # A fresh process per profile keeps model memory and peak RSS from leaking between profiles
+    context = multiprocessing.get_context('spawn')
+    for profile in args.profiles.split(','):
+        profile = profile.strip()
+        print(f"Evaluating profile {profile} on {len(images)} images...", file=sys.stderr)
+        with context.Pool(1) as pool:
+            try:
+                result = pool.apply(_run_in_process, ((profile, args.model, images, args.labels, args.iou, args.warmup),))
+            except Exception as e:
+                result = {'profile': profile, 'error': str(e)}
+        report.append(result)
+        print(json.dumps(result), file=sys.stderr)
+
+    output = json.dumps({'model': args.model, 'iou_threshold': args.iou, 'profiles': report}, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import base64
+import io
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+def load_image(source):
+    """
+    Load a BGR image without caring where it comes from
+
+    Args:
+        source: Image file path, encoded image bytes (JPEG/PNG/...) or a BGR numpy array
+
+    Returns:
+        BGR numpy array
+    """
+    if isinstance(source, np.ndarray):
+        return source
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        # Decode straight from memory instead of round-tripping through a temp file
+        image = cv2.imdecode(np.frombuffer(source, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"Could not decode image from {len(source)} bytes")
+        return image
+
+    image = cv2.imread(str(source))
+    if image is None:
+        raise ValueError(f"Could not load image from: {source}")
+    return image
+
+
+# cv2.imread flags that let the JPEG decoder produce a 1/2, 1/4 or 1/8 size image directly
+REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def load_image_reduced(source, factor):
+    """
+    Load a BGR image at roughly 1/factor of its size
+
+    Files and encoded bytes are decoded at reduced size (much cheaper than a full decode for
+    JPEG); arrays and factors without a reduced decode flag are resized instead.
+
+    Args:
+        source: Image file path, encoded image bytes or a BGR numpy array
+        factor: Reduction factor; 1 loads the image as is
+    """
+    flag = REDUCED_DECODE_FLAGS.get(factor)
+    if factor <= 1:
+        return load_image(source)
+
+    if flag is not None and isinstance(source, (bytes, bytearray, memoryview)):
+        image = cv2.imdecode(np.frombuffer(source, dtype=np.uint8), flag)
+        if image is None:
+            raise ValueError(f"Could not decode image from {len(source)} bytes")
+        return image
+
+    if flag is not None and not isinstance(source, np.ndarray):
+        image = cv2.imread(str(source), flag)
+        if image is None:
+            raise ValueError(f"Could not load image from: {source}")
+        return image
+
+    image = load_image(source)
+    height, width = image.shape[:2]
+    size = (max(1, round(width / factor)), max(1, round(height / factor)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def image_size(source):
+    """
+    (width, height) of an image without decoding its pixels where possible
+
+    Reads only the file header (via Pillow) for paths and bytes. The size is as stored, before any
+    EXIF rotation, so callers comparing it with a decoded image must allow for swapped axes.
+    """
+    if isinstance(source, np.ndarray):
+        return source.shape[1], source.shape[0]
+
+    from PIL import Image
+
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else str(source)
+    with Image.open(stream) as image:
+        return image.size
+
+
+def decode_base64_image(data):
+    """Decode a base64 image string (optionally a data: URL) into encoded image bytes"""
+    if data.startswith('data:') and ',' in data:
+        data = data.split(',', 1)[1]
+    return base64.b64decode(data)
+
+
+def image_from_request(request):
+    """
+    Get the image source of a worker request
+
+    Requests carry either the encoded image inline as base64 ("image") or,
+    for callers that already have a file on disk, an "image_path".
+    """
+    if request.get('image'):
+        return decode_base64_image(request['image'])
+
+    image_path = request.get('image_path')
+    if not image_path or not Path(image_path).exists():
+        raise FileNotFoundError(f"Image file not found: {image_path}")
+    return image_path
+
+
+def describe_image(source):
+    """Short description of an image source for log lines"""
+    if isinstance(source, np.ndarray):
+        return f"array {source.shape}"
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"{len(source)} bytes in memory"
+    return str(source)
@@ -0,0 +1,151 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram buckets in seconds, from sub-millisecond image ops up to slow Tesseract sweeps
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class StageMetrics:
+    def __init__(self, buckets=STAGE_BUCKETS):
+        """Process-wide duration histograms per (component, stage), rendered in Prometheus text format"""
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, component, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get((component, stage))
+            if histogram is None:
+                histogram = self._histograms[(component, stage)] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram['counts'][i] += 1
+                    break
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    def render(self, labels=None):
+        """
+        Prometheus text exposition of every histogram
+
+        Args:
+            labels: Extra labels added to every sample, e.g. {'worker': 'ocr'}
+        """
+        extra = ''.join(f',{key}="{_label_value(value)}"' for key, value in (labels or {}).items())
+        lines = [
+            '# HELP plate_stage_duration_seconds Time spent in each detection/OCR stage',
+            '# TYPE plate_stage_duration_seconds histogram',
+        ]
+        with self._lock:
+            for (component, stage), histogram in sorted(self._histograms.items()):
+                base = f'component="{_label_value(component)}",stage="{_label_value(stage)}"{extra}'
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram['counts']):
+                    cumulative += count
+                    lines.append(f'plate_stage_duration_seconds_bucket{{{base},le="{bound}"}} {cumulative}')
+                lines.append(f'plate_stage_duration_seconds_bucket{{{base},le="+Inf"}} {histogram["count"]}')
+                lines.append(f'plate_stage_duration_seconds_sum{{{base}}} {histogram["sum"]:.6f}')
+                lines.append(f'plate_stage_duration_seconds_count{{{base}}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+METRICS = StageMetrics()
+
+class StageTimer:
+    def __init__(self, component):
+        """
+        Per-request stage timings, also recorded in the process-wide METRICS histograms
+
+        stage() and add() are thread-safe; lap() measures consecutive steps of one thread.
+
+        Args:
+            component: Label for the histograms ('ocr', 'detector', ...)
+        """
+        self.component = component
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._lap_start = time.perf_counter()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        METRICS.observe(self.component, stage, seconds)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def start_laps(self):
+        self._lap_start = time.perf_counter()
+
+    def lap(self, stage):
+        """Record the time since the previous lap (or start_laps) as stage"""
+        now = time.perf_counter()
+        self.add(stage, now - self._lap_start)
+        self._lap_start = now
+
+    def as_ms(self):
+        with self._lock:
+            return {stage: round(seconds * 1000, 2) for stage, seconds in self.stages.items()}
+
+class RequestProfiler:
+    def __init__(self, path, dump_every=50):
+        """
+        cProfile hook around worker requests, accumulated across requests
+
+        Only the thread that handles the request is profiled; work that finishes on other
+        threads (micro-batcher, OCR config pool) is better sampled with py-spy
+        (`py-spy record --pid <worker pid>`), which needs no hook at all.
+
+        Args:
+            path: File the pstats data is written to (open with `python -m pstats` or snakeviz)
+            dump_every: Write the file (and a top-20 summary to stderr) every this many requests
+        """
+        self.path = path
+        self.dump_every = max(1, dump_every)
+        self._profile = cProfile.Profile()
+        self._lock = threading.Lock()
+        self._requests = 0
+
+    @classmethod
+    def from_env(cls, name):
+        """Profiler enabled by PLATE_PROFILE=1 (file from PLATE_PROFILE_PATH), or None when disabled"""
+        if os.getenv('PLATE_PROFILE', '0') != '1':
+            return None
+        path = os.getenv('PLATE_PROFILE_PATH', f'{name}.prof')
+        print(f"Profiling {name} worker requests into: {path}", file=sys.stderr)
+        return cls(path, int(os.getenv('PLATE_PROFILE_EVERY', 50)))
+
+    def call(self, func, *args):
+        # cProfile cannot profile two calls at once; requests are handled one at a time anyway
+        with self._lock:
+            self._profile.enable()
+            try:
+                return func(*args)
+            finally:
+                self._profile.disable()
+                self._requests += 1
+                if self._requests % self.dump_every == 0:
+                    self._dump()
+
+    def _dump(self):
+        self._profile.dump_stats(self.path)
+        summary = io.StringIO()
+        pstats.Stats(self._profile, stream=summary).sort_stats('cumulative').print_stats(20)
+        print(summary.getvalue(), file=sys.stderr)
+
+    def close(self):
+        with self._lock:
+            if self._requests:
+                self._dump()
@@ -0,0 +1,170 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+def parse_roi(value):
+    """
+    Parse a lane ROI polygon from "x,y;x,y;..." text
+
+    Coordinates are pixels, or fractions of the frame size when every value is at most 1.
+
+    Returns:
+        List of (x, y) tuples, or None for an empty value
+    """
+    if not value:
+        return None
+    points = [tuple(float(v) for v in point.split(',')) for point in value.split(';') if point.strip()]
+    if len(points) < 3 or any(len(point) != 2 for point in points):
+        raise ValueError(f"Lane ROI needs at least three x,y points: {value}")
+    return points
+
+class MotionGate:
+    # Motion is measured on the ROI scaled down to this width; full resolution adds cost, not accuracy
+    ANALYSIS_WIDTH = 160
+
+    def __init__(self, roi=None, threshold=0.01, method='diff', pixel_delta=25, learning_rate=0.05, hold_frames=10):
+        """
+        Cheap pre-filter that only lets frames with motion in the lane ROI through to the detector
+
+        Args:
+            roi: Lane polygon as [(x, y), ...] in pixels or frame fractions; None uses the whole frame
+            threshold: Fraction of ROI pixels that must change for a frame to count as motion
+            method: 'diff' (difference to a running-average background) or 'mog2' (OpenCV MOG2 subtractor)
+            pixel_delta: Grey-level change that marks a pixel as changed ('diff' only)
+            learning_rate: How fast the background adapts to the scene
+            hold_frames: Frames that still pass after motion stops, so a vehicle that halts at
+                         the barrier keeps being detected until the background absorbs it
+        """
+        if method not in ('diff', 'mog2'):
+            raise ValueError(f"Unknown motion method: {method}")
+        self.roi = roi
+        self.threshold = threshold
+        self.method = method
+        self.pixel_delta = pixel_delta
+        self.learning_rate = learning_rate
+        self.hold_frames = hold_frames
+
+        self._lock = threading.Lock()
+        self._frame_shape = None
+        self._rect = None
+        self._size = None
+        self._mask = None
+        self._mask_pixels = 1
+        self._background = None
+        self._subtractor = None
+        self._hold = 0
+
+        self.frames = 0
+        self.skipped = 0
+        self.last_motion = 0.0
+
+    @classmethod
+    def from_env(cls):
+        """Gate configured by LANE_ROI, MOTION_THRESHOLD, MOTION_METHOD and MOTION_HOLD_FRAMES"""
+        return cls(
+            roi=parse_roi(os.getenv('LANE_ROI')),
+            threshold=float(os.getenv('MOTION_THRESHOLD', 0.01)),
+            method=os.getenv('MOTION_METHOD', 'diff'),
+            hold_frames=int(os.getenv('MOTION_HOLD_FRAMES', 10))
+        )
+
+    def _setup(self, shape):
+        """
+        Bounding rectangle of the ROI and its polygon mask at analysis resolution, per frame size
+
+        Raises:
+            ValueError: The ROI does not overlap the frame
+        """
+        height, width = shape[:2]
+        if self.roi:
+            points = np.array(self.roi, dtype=np.float32)
+            if points.max() <= 1.0:
+                points *= (width, height)
+            points = points.round().astype(np.int32)
+            # Clamp the bounding rectangle to the frame; the polygon mask below is clipped with it
+            x, y, w, h = cv2.boundingRect(points)
+            x1, y1 = min(max(0, x), width), min(max(0, y), height)
+            x2, y2 = min(max(0, x + w), width), min(max(0, y + h), height)
+            if x2 <= x1 or y2 <= y1:
+                raise ValueError(f"Lane ROI {self.roi} lies outside the {width}x{height} frame")
+            x, y, w, h = x1, y1, x2 - x1, y2 - y1
+        else:
+            points = None
+            x, y, w, h = 0, 0, width, height
+
+        scale = min(1.0, self.ANALYSIS_WIDTH / max(w, 1))
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        mask = np.full((size[1], size[0]), 255, dtype=np.uint8)
+        if points is not None:
+            mask[:] = 0
+            cv2.fillPoly(mask, [((points - (x, y)) * scale).round().astype(np.int32)], 255)
+
+        self._frame_shape = shape[:2]
+        self._rect = (x, y, w, h)
+        self._size = size
+        self._mask = mask
+        self._mask_pixels = max(1, int(np.count_nonzero(mask)))
+        self._background = None
+        self._subtractor = None
+
+    def _changed_fraction(self, small):
+        if self.method == 'mog2':
+            if self._subtractor is None:
+                self._subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+            foreground = self._subtractor.apply(small, learningRate=self.learning_rate)
+        else:
+            if self._background is None:
+                self._background = small.astype(np.float32)
+                # Nothing to compare the first frame with, so it always goes to the detector
+                return 1.0
+            foreground = cv2.absdiff(small, cv2.convertScaleAbs(self._background))
+            cv2.accumulateWeighted(small, self._background, self.learning_rate)
+            foreground = (foreground > self.pixel_delta).astype(np.uint8) * 255
+
+        changed = cv2.countNonZero(cv2.bitwise_and(foreground, self._mask))
+        return changed / self._mask_pixels
+
+    def check(self, frame):
+        """
+        Decide whether a frame needs the detector
+
+        Returns:
+            (x, y, crop) with the ROI crop and its offset in the frame, or None when the lane is still
+        """
+        with self._lock:
+            if self._frame_shape != frame.shape[:2]:
+                self._setup(frame.shape)
+            x, y, w, h = self._rect
+            crop = frame[y:y + h, x:x + w]
+
+            gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+            small = cv2.GaussianBlur(cv2.resize(gray, self._size, interpolation=cv2.INTER_AREA), (5, 5), 0)
+
+            self.frames += 1
+            self.last_motion = self._changed_fraction(small)
+            if self.last_motion >= self.threshold:
+                self._hold = self.hold_frames
+            elif self._hold > 0:
+                self._hold -= 1
+            else:
+                self.skipped += 1
+                return None
+
+            return x, y, crop
+
+    def stats(self):
+        with self._lock:
+            roi_fraction = None
+            if self._rect and self._frame_shape:
+                roi_fraction = round(self._rect[2] * self._rect[3] / (self._frame_shape[0] * self._frame_shape[1]), 4)
+            return {
+                'method': self.method,
+                'frames': self.frames,
+                'skipped': self.skipped,
+                'detector_runs': self.frames - self.skipped,
+                'skip_rate': round(self.skipped / self.frames, 4) if self.frames else 0.0,
+                'roi_fraction': roi_fraction,
+                'last_motion': round(self.last_motion, 4)
+            }
@@ -5,8 +5,16 @@ import sys
 import time
 import re
 import os
+import threading
 from pathlib import Path
-from difflib import get_close_matches
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from image_io import load_image, image_from_request, describe_image
+from area_matcher import AreaNameMatcher
+from plate_parser import LicensePlateParser, extract_vehicle_class, extract_number, format_license_plate
+from plate_registry import PlateRegistry
+from instrumentation import StageTimer
+from result_cache import ResultCache
 
 try:
     import pytesseract
@@ -61,45 +69,301 @@ except ImportError:
     print("Error: pytesseract not installed. Install with: pip install pytesseract", file=sys.stderr)
     sys.exit(1)
 
-class BanglaLicensePlateOCR:
+# Optional in-process Tesseract binding (no fork-exec of the tesseract binary per call)
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+class PytesseractEngine:
+    """Runs Tesseract through pytesseract (one tesseract process per call)"""
+    name = 'pytesseract'
+    
+    def image_to_string(self, image, config):
+        return pytesseract.image_to_string(image, config=config)
+    
+    def image_to_data(self, image, config):
+        return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+
+class TesserocrEngine:
+    """Runs Tesseract in-process through tesserocr, keeping one loaded API handle per language/PSM"""
+    name = 'tesserocr'
+    
     def __init__(self):
+        if tesserocr is None:
+            raise ImportError("tesserocr not installed. Install with: pip install tesserocr")
+        self._apis = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _parse_config(config):
+        """Extract language, page segmentation mode and -c variables from a tesseract CLI config string"""
+        lang_match = re.search(r'-l\s+(\S+)', config)
+        psm_match = re.search(r'--psm\s+(\d+)', config)
+        lang = lang_match.group(1) if lang_match else 'eng'
+        psm = int(psm_match.group(1)) if psm_match else 3
+        variables = tuple(sorted(re.findall(r'-c\s+(\w+)=(\S+)', config)))
+        return lang, psm, variables
+    
+    def _get_api(self, config):
+        """Return the (api, lock) pair for a config, loading the traineddata on first use only"""
+        key = self._parse_config(config)
+        with self._lock:
+            if key not in self._apis:
+                lang, psm, variables = key
+                print(f"Loading tesserocr API for lang={lang}, psm={psm}", file=sys.stderr)
+                api = tesserocr.PyTessBaseAPI(lang=lang, psm=psm, oem=tesserocr.OEM.DEFAULT)
+                for name, value in variables:
+                    api.SetVariable(name, value)
+                self._apis[key] = (api, threading.Lock())
+            return self._apis[key]
+    
+    def _set_image(self, api, image):
+        from PIL import Image
+        if len(image.shape) == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        api.SetImage(Image.fromarray(image))
+    
+    def image_to_string(self, image, config):
+        api, lock = self._get_api(config)
+        with lock:
+            self._set_image(api, image)
+            return api.GetUTF8Text()
+    
+    def image_to_data(self, image, config):
+        """Word-level results with the same keys pytesseract's Output.DICT uses"""
+        api, lock = self._get_api(config)
+        data = {'block_num': [], 'par_num': [], 'line_num': [], 'word_num': [], 'text': [], 'conf': []}
+        level = tesserocr.RIL.WORD
+        
+        with lock:
+            self._set_image(api, image)
+            api.Recognize()
+            iterator = api.GetIterator()
+            if iterator is None:
+                return data
+            
+            block_num = par_num = line_num = word_num = 0
+            while True:
+                if iterator.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                    block_num += 1
+                    par_num = line_num = 0
+                if iterator.IsAtBeginningOf(tesserocr.RIL.PARA):
+                    par_num += 1
+                    line_num = 0
+                if iterator.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line_num += 1
+                    word_num = 0
+                word_num += 1
+                
+                data['block_num'].append(block_num)
+                data['par_num'].append(par_num)
+                data['line_num'].append(line_num)
+                data['word_num'].append(word_num)
+                data['text'].append(iterator.GetUTF8Text(level) or '')
+                data['conf'].append(iterator.Confidence(level))
+                
+                if not iterator.Next(level):
+                    break
+        
+        return data
+
+def create_ocr_engine(backend=None):
+    """Create the Tesseract engine selected by `backend` or the OCR_BACKEND env var"""
+    backend = (backend or os.getenv('OCR_BACKEND', 'pytesseract')).lower()
+    
+    if backend == 'tesserocr':
+        return TesserocrEngine()
+    if backend == 'auto':
+        return TesserocrEngine() if tesserocr is not None else PytesseractEngine()
+    return PytesseractEngine()
+
+class OCRConfigScheduler:
+    def __init__(self, configs, stats_path=None, save_every=20):
+        """
+        Orders OCR configs by how often they produced the winning result
+        
+        Args:
+            configs: OCR config dicts ({'config', 'name'}) in their default order
+            stats_path: Optional JSON file the per-config win statistics are loaded from and saved to
+            save_every: Save the statistics after this many recorded plates
+        """
+        self.configs = list(configs)
+        self.stats_path = stats_path
+        self.save_every = save_every
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self.stats = {c['name']: {'runs': 0, 'wins': 0} for c in self.configs}
+        self._load()
+    
+    def _load(self):
+        if not self.stats_path or not Path(self.stats_path).exists():
+            return
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            for name, entry in saved.items():
+                if name in self.stats:
+                    self.stats[name] = {'runs': int(entry.get('runs', 0)), 'wins': int(entry.get('wins', 0))}
+            print(f"Loaded OCR config statistics from: {self.stats_path}", file=sys.stderr)
+        except Exception as e:
+            print(f"Could not load OCR config statistics: {e}", file=sys.stderr)
+    
+    def save(self):
+        if not self.stats_path:
+            return
+        try:
+            with self._lock:
+                snapshot = json.dumps(self.stats, ensure_ascii=False, indent=2)
+                self._unsaved = 0
+            with open(self.stats_path, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+        except Exception as e:
+            print(f"Could not save OCR config statistics: {e}", file=sys.stderr)
+    
+    def win_rate(self, name):
+        """Smoothed win rate, so configs that have rarely run are not ruled out"""
+        entry = self.stats[name]
+        return (entry['wins'] + 1) / (entry['runs'] + 2)
+    
+    def ordered(self):
+        """Configs sorted by win rate; ties keep the default order"""
+        with self._lock:
+            return sorted(self.configs, key=lambda c: -self.win_rate(c['name']))
+    
+    def record(self, tried_names, winner_name):
+        """Record which configs ran for a plate and which one won"""
+        with self._lock:
+            for name in tried_names:
+                self.stats[name]['runs'] += 1
+            if winner_name:
+                self.stats[winner_name]['wins'] += 1
+            self._unsaved += 1
+            should_save = self._unsaved >= self.save_every
+        
+        if should_save:
+            self.save()
+    
+    def summary(self):
+        with self._lock:
+            return {
+                name: {**entry, 'win_rate': round(self.win_rate(name), 3)}
+                for name, entry in self.stats.items()
+            }
+
+class BanglaLicensePlateOCR:
+    # OCR configurations optimized for two-line text
+    OCR_CONFIGS = [
+        # Config 1: PSM 4 - Single column of text of variable sizes
+        {'config': r'--oem 3 --psm 4 -l ben+eng', 'name': 'Bengali+English PSM4 (Column)'},
+        
+        # Config 2: PSM 6 - Uniform block of text
+        {'config': r'--oem 3 --psm 6 -l ben+eng', 'name': 'Bengali+English PSM6 (Block)'},
+        
+        # Config 3: PSM 3 - Fully automatic page segmentation
+        {'config': r'--oem 3 --psm 3 -l ben+eng', 'name': 'Bengali+English PSM3 (Auto)'},
+        
+        # Config 4: PSM 11 - Sparse text
+        {'config': r'--oem 3 --psm 11 -l ben+eng', 'name': 'Bengali+English PSM11 (Sparse)'},
+        
+        # Config 5: Bengali only
+        {'config': r'--oem 3 --psm 4 -l ben', 'name': 'Bengali-only PSM4'},
+        
+        # Config 6: English fallback
+        {'config': r'--oem 3 --psm 4 -l eng', 'name': 'English-only PSM4'},
+    ]
+    
+    # Score of a full plate (area + number + six digits = 0.9) read with more than 0.8 confidence
+    DEFAULT_EARLY_EXIT_SCORE = 1.7
+    
+    # Line-segmented mode: one single-line (PSM 7) pass per plate line with a constrained alphabet.
+    # Line 1 is the Bangla area name and class letter, line 2 the dd-dddd number.
+    LINE_CONFIGS = [
+        {'config': r'--oem 3 --psm 7 -l ben', 'name': 'Line 1 Bengali PSM7'},
+        {'config': r'--oem 3 --psm 7 -l ben+eng -c tessedit_char_whitelist=০১২৩৪৫৬৭৮৯0123456789-', 'name': 'Line 2 digits PSM7'},
+    ]
+    # The line pass binarizes the plate at this height; a row whose ink is at most LINE_GAP_RATIO
+    # of the busier line next to it separates the lines
+    LINE_PLATE_HEIGHT = 160
+    LINE_GAP_RATIO = 0.35
+    
+    # Multi-frame voting: OCR configs run per frame (the scheduler's best first), and the
+    # number of agreeing reads that settles a field
+    DEFAULT_VOTE_CONFIGS = 2
+    DEFAULT_VOTE_AGREEMENT = 2
+    VOTE_FIELDS = ('area_name', 'vehicle_class', 'number')
+    
+    # Adaptive preprocessing: plate crop height to scale to, largest upscale, and pixel budget
+    # for the working image (bounds OCR cost when a whole camera frame is passed without a bbox)
+    DEFAULT_TARGET_HEIGHT = 240
+    MAX_UPSCALE = 4.0
+    MAX_PIXELS = 2_000_000
+    # Above this many pixels the bilateral filter uses a smaller neighbourhood
+    BILATERAL_MAX_PIXELS = 1_000_000
+    
+    def __init__(self, backend=None, self_test=True, ocr_workers=None, early_exit_score=None, stats_path=None,
+                 preprocess_mode=None, target_height=None, result_cache=None, segment_lines=None,
+                 registry=None):
+        """
+        Initialize the Bangla license plate OCR
+        
+        Args:
+            backend: Tesseract engine ('pytesseract', 'tesserocr' or 'auto'); defaults to OCR_BACKEND env var
+            self_test: Run the Tesseract self-test OCR passes (done once per process)
+            ocr_workers: Number of OCR configs evaluated concurrently; defaults to OCR_WORKERS env var,
+                         or one per CPU core (capped at the number of configs)
+            early_exit_score: Stop trying further configs once a result scores at least this much;
+                              defaults to OCR_EARLY_EXIT_SCORE env var, 0 disables early exit
+            stats_path: JSON file for per-config win statistics; defaults to OCR_STATS_PATH env var
+            preprocess_mode: 'legacy' (fixed 3x minimum upscale) or 'adaptive' (scale to target_height within
+                             a pixel budget); defaults to OCR_PREPROCESS_MODE env var, else 'legacy'
+            target_height: Plate crop height in pixels for the adaptive mode; defaults to OCR_TARGET_HEIGHT env var
+            result_cache: ResultCache for repeated plate crops, keyed by exact pixels; defaults to one configured by the
+                          RESULT_CACHE* env vars (RESULT_CACHE_PERCEPTUAL only applies to the detector cache)
+            segment_lines: Split the plate into its two lines and read each with its own single-line config
+                           before falling back to the whole-plate sweep; defaults to OCR_SEGMENT_LINES env var
+            registry: PlateRegistry each reading is resolved against (added as 'registered'); defaults to one
+                      loaded from PLATE_REGISTRY_PATH, or none when that is unset
+        """
+        self.engine = create_ocr_engine(backend)
+        
+        if ocr_workers is None:
+            ocr_workers = int(os.getenv('OCR_WORKERS', min(len(self.OCR_CONFIGS), os.cpu_count() or 1)))
+        self.ocr_workers = max(1, ocr_workers)
+        # Tesseract runs outside the GIL (subprocess or tesserocr), so threads give real parallelism.
+        # Both pools are created up front (their threads only start on first submit): _map_configs runs
+        # on the frame pool's threads, where a lazy check-then-create could build and leak a second pool
+        self._executor = ThreadPoolExecutor(max_workers=self.ocr_workers, thread_name_prefix='ocr')
+        # Separate from the config pool: frame tasks wait on config tasks, so sharing one pool could deadlock
+        self._frame_executor = ThreadPoolExecutor(max_workers=self.ocr_workers, thread_name_prefix='ocr-frame')
+        
+        if early_exit_score is None:
+            early_exit_score = float(os.getenv('OCR_EARLY_EXIT_SCORE', self.DEFAULT_EARLY_EXIT_SCORE))
+        self.early_exit_score = early_exit_score
+        self.scheduler = OCRConfigScheduler(self.OCR_CONFIGS, stats_path or os.getenv('OCR_STATS_PATH'))
+        
+        self.preprocess_mode = preprocess_mode or os.getenv('OCR_PREPROCESS_MODE', 'legacy')
+        if self.preprocess_mode not in ('legacy', 'adaptive'):
+            raise ValueError(f"Unknown preprocess mode: {self.preprocess_mode}")
+        self.target_height = target_height or int(os.getenv('OCR_TARGET_HEIGHT', self.DEFAULT_TARGET_HEIGHT))
+        # Similar-looking crops of two different plates can share a perceptual hash, and a
+        # reading returned for the wrong vehicle bills the wrong owner
+        self.result_cache = result_cache or ResultCache.from_env(allow_perceptual=False)
+        if self.result_cache.perceptual:
+            raise ValueError("OCR results must be cached by exact pixels, not a perceptual hash")
+        if segment_lines is None:
+            segment_lines = os.getenv('OCR_SEGMENT_LINES', '0') == '1'
+        self.segment_lines = segment_lines
+        self.registry = registry if registry is not None else PlateRegistry.from_env()
+        print(f"Using OCR backend: {self.engine.name}", file=sys.stderr)
+        
         # Test Tesseract installation
-        self._test_tesseract()
-        
-        # Complete list of Bangladesh area names for difflib matching
-        self.area_names = [
-            # Major cities
-            'ঢাকা', 'dhaka', 'DHAKA', 'Dhaka',
-            'চট্টগ্রাম', 'chittagong', 'CHITTAGONG', 'Chittagong', 'ctg', 'CTG',
-            'সিলেট', 'sylhet', 'SYLHET', 'Sylhet',
-            'রাজশাহী', 'rajshahi', 'RAJSHAHI', 'Rajshahi',
-            'বরিশাল', 'barisal', 'BARISAL', 'Barisal',
-            'খুলনা', 'khulna', 'KHULNA', 'Khulna',
-            'রংপুর', 'rangpur', 'RANGPUR', 'Rangpur',
-            'ময়মনসিংহ', 'mymensingh', 'MYMENSINGH', 'Mymensingh',
-            'কুমিল্লা', 'comilla', 'COMILLA', 'Comilla',
-            'নোয়াখালী', 'noakhali', 'NOAKHALI', 'Noakhali',
-            'ফেনী', 'feni', 'FENI', 'Feni',
-            'লক্ষ্মীপুর', 'lakshmipur', 'LAKSHMIPUR', 'Lakshmipur',
-            'ব্রাহ্মণবাড়িয়া', 'brahmanbaria', 'BRAHMANBARIA', 'Brahmanbaria',
-            'চাঁদপুর', 'chandpur', 'CHANDPUR', 'Chandpur',
-            
-            # Metro areas
-            'মেট্রো', 'metro', 'METRO', 'Metro',
-            
-            # Vehicle classes
-            'ক', 'খ', 'গ', 'ঘ', 'ঙ', 'চ', 'ছ', 'জ', 'ঝ', 'ঞ', 'ট', 'ঠ', 'ড', 'ঢ', 'ণ',
-            'ত', 'থ', 'দ', 'ধ', 'ন', 'প', 'ফ', 'ব', 'ভ', 'ম', 'য', 'র', 'ল', 'শ', 'ষ', 'স', 'হ'
-        ]
-        
-        # Bangla to English number mapping
-        self.bangla_numbers = {
-            '০': '0', '১': '1', '২': '2', '৩': '3', '৪': '4',
-            '৫': '5', '৬': '6', '৭': '7', '৮': '8', '৯': '9'
-        }
+        if self_test:
+            self._test_tesseract()
         
-        # English to Bangla number mapping
-        self.english_to_bangla = {v: k for k, v in self.bangla_numbers.items()}
+        # Area names (and vehicle class letters) are matched through a prebuilt index
+        self.area_matcher = AreaNameMatcher()
+        self.parser = LicensePlateParser(self.area_matcher)
     
     def _test_tesseract(self):
         """Test if Tesseract is working properly"""
@@ -109,12 +373,12 @@ class BanglaLicensePlateOCR:
             cv2.putText(test_image, 'TEST', (50, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
             
             # Try to extract text
-            test_text = pytesseract.image_to_string(test_image, config='--psm 8')
+            test_text = self.engine.image_to_string(test_image, '--psm 8')
             print(f"Tesseract test successful. Detected: '{test_text.strip()}'", file=sys.stderr)
             
             # Test Bengali language support
             try:
-                test_text_ben = pytesseract.image_to_string(test_image, lang='ben+eng', config='--psm 8')
+                test_text_ben = self.engine.image_to_string(test_image, '-l ben+eng --psm 8')
                 print("Bengali language support confirmed", file=sys.stderr)
             except Exception as e:
                 print(f"Warning: Bengali language support may not be available: {e}", file=sys.stderr)
@@ -124,22 +388,134 @@ class BanglaLicensePlateOCR:
             print(f"Tesseract test failed: {e}", file=sys.stderr)
             raise Exception(f"Tesseract is not working properly: {e}")
     
-    def preprocess_image(self, image, bbox=None):
-        """Preprocess image for better OCR results with enhanced Bangla text recognition"""
+    @staticmethod
+    def _filter_components(binary, min_area, max_area):
+        """Keep only connected components whose area is within [min_area, max_area]"""
+        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(binary)
+        
+        # One lookup table over all labels instead of a full-image comparison per component
+        areas = stats[:, cv2.CC_STAT_AREA]
+        keep = (areas >= min_area) & (areas <= max_area)
+        keep[0] = False  # Background (label 0)
+        lut = np.where(keep, 255, 0).astype(binary.dtype)
+        
+        return lut[labels]
+    
+    def _line_images(self, image, bbox=None):
+        """
+        Binarize the plate for the line pass: text dark on white at LINE_PLATE_HEIGHT
+        
+        Otsu on the lightly blurred plate keeps whole strokes. Both polarities are returned,
+        dark text first (white plates), then light text; in each, ink touching the image edge
+        (background around the plate) or shaped like the plate frame is removed.
+        """
+        plate, _ = self._plate_region(image, bbox)
+        gray = cv2.cvtColor(plate, cv2.COLOR_BGR2GRAY) if plate.ndim == 3 else plate
+        height, width = gray.shape
+        scale = self.LINE_PLATE_HEIGHT / height
+        interpolation = cv2.INTER_CUBIC if scale >= 1 else cv2.INTER_AREA
+        gray = cv2.resize(gray, (max(1, int(width * scale)), self.LINE_PLATE_HEIGHT), interpolation=interpolation)
+        _, binary = cv2.threshold(cv2.GaussianBlur(gray, (3, 3), 0), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        
+        images = []
+        for ink in (binary == 0, binary > 0):
+            num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(ink.astype(np.uint8))
+            x, y = stats[:, cv2.CC_STAT_LEFT], stats[:, cv2.CC_STAT_TOP]
+            w, h = stats[:, cv2.CC_STAT_WIDTH], stats[:, cv2.CC_STAT_HEIGHT]
+            rows, cols = ink.shape
+            # Taller than a text line, or a long thin rule: frame parts. Long words joined by their
+            # matra are wide too, but as tall as a line
+            frame = (h > 0.6 * rows) | ((w > 0.6 * cols) & (h < 0.08 * rows))
+            discard = (x == 0) | (y == 0) | (x + w >= cols) | (y + h >= rows) | frame
+            discard[0] = True  # Background (label 0)
+            images.append(np.where(discard, 255, 0).astype(np.uint8)[labels])
+        return images
+    
+    @classmethod
+    def _segment_lines(cls, binary):
+        """
+        Split a binarized two-line plate (dark text on white) into its lines with a horizontal projection profile
+        
+        The cut is the emptiest row in the middle half of the inked rows, provided it is clearly
+        emptier than the text above and below it.
+        
+        Returns:
+            Tuple of (line 1 image, line 2 image), or None when no clear gap between two lines is found
+        """
+        height = binary.shape[0]
+        profile = np.count_nonzero(binary == 0, axis=1).astype(np.float32)
+        # Smooth over a few rows so gaps inside a letter (e.g. under a matra) do not count as a line gap
+        window = max(3, height // 40)
+        profile = np.convolve(profile, np.ones(window, dtype=np.float32) / window, mode='same')
+        
+        peak = profile.max()
+        if height < 8 or peak <= 0:
+            return None
+        
+        # Look for the cut in the middle half of the inked rows
+        rows = np.flatnonzero(profile > 0.05 * peak)
+        first, last = rows[0], rows[-1] + 1
+        top, bottom = first + (last - first) // 4, last - (last - first) // 4
+        if bottom <= top:
+            return None
+        cut = top + int(np.argmin(profile[top:bottom]))
+        if profile[cut] > cls.LINE_GAP_RATIO * min(profile[first:cut].max(), profile[cut:last].max()):
+            return None
+        
+        # Tight single-line strips with a small margin
+        margin = max(2, height // 40)
+        return binary[max(0, first - margin):cut], binary[cut:min(height, last + margin)]
+    
+    def _adaptive_scale(self, height, width, cropped):
+        """Scale factor for the adaptive preprocessing mode"""
+        # A plate crop is scaled to target_height; a whole frame keeps its resolution
+        # since the text size in it is unknown
+        scale = self.target_height / height if cropped else 1.0
+        scale = min(scale, self.MAX_UPSCALE)
+        
+        # Keep the working image within the pixel budget whatever the input size
+        budget_scale = (self.MAX_PIXELS / (height * width)) ** 0.5
+        return min(scale, budget_scale)
+    
+    @staticmethod
+    def _plate_region(image, bbox):
+        """
+        Crop image to bbox, clamped to the image bounds
+        
+        Returns:
+            Tuple of (region, cropped); the whole image and False when there is no usable bbox
+        """
+        if bbox and len(bbox) == 4:
+            x, y, w, h = bbox
+            # Ensure coordinates are within image bounds
+            height, width = image.shape[:2]
+            x = max(0, min(x, width))
+            y = max(0, min(y, height))
+            w = min(w, width - x)
+            h = min(h, height - y)
+            
+            if w > 0 and h > 0:
+                return image[y:y+h, x:x+w], True
+        
+        return image, False
+    
+    def preprocess_image(self, image, bbox=None, timer=None):
+        """
+        Preprocess image for better OCR results with enhanced Bangla text recognition
+        
+        Args:
+            image: BGR (or grayscale) numpy array
+            bbox: Optional [x, y, w, h] plate region within the image
+            timer: StageTimer the preprocessing stages are recorded in (a new one when None)
+        """
+        timer = timer or StageTimer('ocr')
+        timer.start_laps()
         try:
             # Crop image if bounding box provided
-            if bbox and len(bbox) == 4:
-                x, y, w, h = bbox
-                # Ensure coordinates are within image bounds
-                height, width = image.shape[:2]
-                x = max(0, min(x, width))
-                y = max(0, min(y, height))
-                w = min(w, width - x)
-                h = min(h, height - y)
-                
-                if w > 0 and h > 0:
-                    image = image[y:y+h, x:x+w]
-                    print(f"Cropped image to bbox: [{x}, {y}, {w}, {h}]", file=sys.stderr)
+            image, cropped = self._plate_region(image, bbox)
+            if cropped:
+                print(f"Cropped image to bbox {bbox}: {image.shape[1]}x{image.shape[0]}", file=sys.stderr)
+            timer.lap('crop')
             
             # Convert to grayscale
             if len(image.shape) == 3:
@@ -147,23 +523,35 @@ class BanglaLicensePlateOCR:
             else:
                 gray = image
             
-            # Significantly resize image for better OCR (make it much larger)
             height, width = gray.shape
-            # Use a larger scale factor for better text recognition
-            scale_factor = max(200/height, 600/width, 3.0)  # Increased scale factor
+            if self.preprocess_mode == 'adaptive':
+                # Scale plate crops to a fixed text size, never past the pixel budget
+                scale_factor = self._adaptive_scale(height, width, cropped)
+            else:
+                # Significantly resize image for better OCR (make it much larger)
+                # Use a larger scale factor for better text recognition
+                scale_factor = max(200/height, 600/width, 3.0)  # Increased scale factor
             new_width = int(width * scale_factor)
             new_height = int(height * scale_factor)
-            gray = cv2.resize(gray, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+            interpolation = cv2.INTER_CUBIC if scale_factor >= 1 else cv2.INTER_AREA
+            gray = cv2.resize(gray, (new_width, new_height), interpolation=interpolation)
             print(f"Resized image from {width}x{height} to {new_width}x{new_height} (scale: {scale_factor:.2f})", file=sys.stderr)
+            timer.lap('resize')
             
             # Enhanced preprocessing pipeline for Bangla text
             
             # 1. Noise reduction with bilateral filter (preserves edges better)
-            denoised = cv2.bilateralFilter(gray, 9, 75, 75)
+            # Its cost grows with the square of the neighbourhood, so large adaptive inputs use a smaller one
+            diameter = 9
+            if self.preprocess_mode == 'adaptive' and new_width * new_height > self.BILATERAL_MAX_PIXELS:
+                diameter = 5
+            denoised = cv2.bilateralFilter(gray, diameter, 75, 75)
+            timer.lap('denoise')
             
             # 2. Contrast enhancement using CLAHE
             clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
             enhanced = clahe.apply(denoised)
+            timer.lap('clahe')
             
             # 3. Multiple thresholding approaches - try different methods
             # Method 1: Adaptive threshold
@@ -186,10 +574,14 @@ class BanglaLicensePlateOCR:
                 # Prefer images with moderate number of components (not too noisy, not too sparse)
                 score = abs(num_labels - 20)  # Target around 20 components for license plate
                 binary_scores.append(score)
+                # Nothing can beat a perfect score and argmin keeps the first one, so skip the rest
+                if score == 0:
+                    break
             
             best_binary_idx = np.argmin(binary_scores)
             binary = binary_images[best_binary_idx]
             print(f"Selected thresholding method {best_binary_idx + 1} (score: {binary_scores[best_binary_idx]})", file=sys.stderr)
+            timer.lap('threshold')
             
             # 4. Morphological operations to clean up text
             # Use different kernel sizes for different operations
@@ -204,21 +596,13 @@ class BanglaLicensePlateOCR:
             
             # Dilate slightly to make text thicker (helps with OCR)
             binary = cv2.dilate(binary, kernel_small, iterations=1)
+            timer.lap('morphology')
             
             # 5. Final cleanup - remove very small or very large components
-            num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(binary)
-            
-            # Create a mask for components of reasonable size
             min_area = 50  # Minimum area for a character
             max_area = (new_width * new_height) // 4  # Maximum area (quarter of image)
-            
-            mask = np.zeros_like(binary)
-            for i in range(1, num_labels):  # Skip background (label 0)
-                area = stats[i, cv2.CC_STAT_AREA]
-                if min_area <= area <= max_area:
-                    mask[labels == i] = 255
-            
-            binary = mask
+            binary = self._filter_components(binary, min_area, max_area)
+            timer.lap('components')
             
             # 6. Optional: Save debug images for troubleshooting
             # Uncomment these lines to save intermediate processing steps
@@ -232,111 +616,54 @@ class BanglaLicensePlateOCR:
             print(f"Image preprocessing error: {e}", file=sys.stderr)
             return image
     
-    def extract_text_two_line_format(self, image_path, bbox=None):
-        """Extract text from Bangladeshi license plate with two-line format using difflib correction"""
+    def extract_text_two_line_format(self, image_source, bbox=None, max_configs=None):
+        """
+        Extract text from Bangladeshi license plate with two-line format using difflib correction
+        
+        Args:
+            image_source: Path to image file, encoded image bytes or BGR numpy array
+            bbox: Optional [x, y, w, h] plate region within the image
+            max_configs: Try at most this many OCR configs (in scheduler order); None tries them all
+        """
         start_time = time.time()
+        timer = StageTimer('ocr')
         
         try:
-            # Load image
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError(f"Could not load image from: {image_path}")
+            # Load image (decoded in memory when given bytes or an array)
+            with timer.stage('decode'):
+                image = load_image(image_source)
             
-            print(f"Processing OCR for two-line license plate: {image_path}", file=sys.stderr)
+            print(f"Processing OCR for two-line license plate: {describe_image(image_source)}", file=sys.stderr)
             if bbox:
                 print(f"Using bounding box: {bbox}", file=sys.stderr)
             
-            # Preprocess image
-            processed_image = self.preprocess_image(image, bbox)
-            
-            # Try multiple OCR configurations optimized for two-line text
-            ocr_configs = [
-                # Config 1: PSM 4 - Single column of text of variable sizes
-                {'config': r'--oem 3 --psm 4 -l ben+eng', 'name': 'Bengali+English PSM4 (Column)'},
-                
-                # Config 2: PSM 6 - Uniform block of text
-                {'config': r'--oem 3 --psm 6 -l ben+eng', 'name': 'Bengali+English PSM6 (Block)'},
-                
-                # Config 3: PSM 3 - Fully automatic page segmentation
-                {'config': r'--oem 3 --psm 3 -l ben+eng', 'name': 'Bengali+English PSM3 (Auto)'},
-                
-                # Config 4: PSM 11 - Sparse text
-                {'config': r'--oem 3 --psm 11 -l ben+eng', 'name': 'Bengali+English PSM11 (Sparse)'},
-                
-                # Config 5: Bengali only
-                {'config': r'--oem 3 --psm 4 -l ben', 'name': 'Bengali-only PSM4'},
-                
-                # Config 6: English fallback
-                {'config': r'--oem 3 --psm 4 -l eng', 'name': 'English-only PSM4'},
-            ]
+            # The reading depends only on the plate pixels and the OCR settings, so a repeated
+            # frame (or the same plate region of a new one) reuses the earlier result
+            with timer.stage('cache_lookup'):
+                plate, cropped = self._plate_region(image, bbox)
+                cache_key = self.result_cache.key(plate, cropped, self.preprocess_mode, self.target_height,
+                                                  self.engine.name, max_configs, self.segment_lines)
+                cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                print(f"Using cached OCR result: '{cached['license_plate']}'", file=sys.stderr)
+                cached['cached'] = True
+                cached['processing_time'] = round(time.time() - start_time, 2)
+                cached['stage_ms'] = timer.as_ms()
+                return cached
             
-            best_result = None
-            best_score = 0
+            # Two small single-line passes first; a plate they cannot read fully gets the whole-plate sweep
+            best_result, configs_tried = None, 0
+            if self.segment_lines:
+                best_result = self._read_segmented_lines(image, bbox, timer)
+                configs_tried = len(self.LINE_CONFIGS)
             
-            for config_info in ocr_configs:
-                try:
-                    config = config_info['config']
-                    config_name = config_info['name']
-                    
-                    print(f"Trying OCR config: {config_name}", file=sys.stderr)
-                    
-                    # Extract text
-                    extracted_text = pytesseract.image_to_string(processed_image, config=config)
-                    extracted_text = extracted_text.strip()
-                    
-                    if not extracted_text:
-                        print(f"  No text extracted with {config_name}", file=sys.stderr)
-                        continue
-                    
-                    print(f"  Raw extracted text: '{extracted_text}'", file=sys.stderr)
-                    
-                    # Parse the two-line format
-                    parsed_result = self.parse_two_line_license_plate(extracted_text)
-                    
-                    if parsed_result['success']:
-                        # Get confidence score
-                        try:
-                            data = pytesseract.image_to_data(processed_image, config=config, output_type=pytesseract.Output.DICT)
-                            confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
-                            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-                            confidence = avg_confidence / 100.0
-                        except:
-                            confidence = 0.5
-                        
-                        # Calculate result score
-                        result_score = confidence
-                        
-                        # Bonus for complete license plate
-                        if parsed_result['license_plate']:
-                            result_score += 0.4
-                        
-                        # Bonus for finding area name
-                        if parsed_result['area_name']:
-                            result_score += 0.2
-                        
-                        # Bonus for finding 6-digit number
-                        if parsed_result['number'] and len(parsed_result['number'].replace('-', '')) == 6:
-                            result_score += 0.3
-                        
-                        print(f"  Parsed result: {parsed_result}", file=sys.stderr)
-                        print(f"  Score: {result_score:.3f}", file=sys.stderr)
-                        
-                        if result_score > best_score:
-                            best_score = result_score
-                            best_result = {
-                                'extracted_text': extracted_text,
-                                'area_name': parsed_result['area_name'],
-                                'vehicle_class': parsed_result['vehicle_class'],
-                                'number': parsed_result['number'],
-                                'license_plate': parsed_result['license_plate'],
-                                'confidence': confidence,
-                                'config_used': config_name
-                            }
-                            print(f"  New best result with score: {result_score:.3f}", file=sys.stderr)
-                    
-                except Exception as e:
-                    print(f"  Config {config_name} failed: {e}", file=sys.stderr)
-                    continue
+            if best_result is None:
+                # Preprocess image
+                processed_image = self.preprocess_image(image, bbox, timer)
+                
+                # Try OCR configurations in order of past win rate, stopping early on a confident full plate
+                best_result, sweep_tried = self._run_scheduled_configs(processed_image, max_configs, timer)
+                configs_tried += sweep_tried
             
             processing_time = time.time() - start_time
             
@@ -347,7 +674,7 @@ class BanglaLicensePlateOCR:
                 print(f"  Number: '{best_result['number']}'", file=sys.stderr)
                 print(f"  License Plate: '{best_result['license_plate']}'", file=sys.stderr)
                 
-                return {
+                result = {
                     'success': True,
                     'extracted_text': best_result['extracted_text'],
                     'license_plate': best_result['license_plate'],
@@ -356,18 +683,24 @@ class BanglaLicensePlateOCR:
                     'number': best_result['number'],
                     'confidence': round(best_result['confidence'], 3),
                     'processing_time': round(processing_time, 2),
-                    'config_used': best_result['config_used']
+                    'config_used': best_result['config_used'],
+                    'configs_tried': configs_tried,
+                    'stage_ms': timer.as_ms()
                 }
             else:
                 print("No valid license plate found with any configuration", file=sys.stderr)
-                return {
+                result = {
                     'success': False,
                     'error': 'No valid license plate pattern found',
                     'extracted_text': '',
                     'license_plate': '',
                     'confidence': 0.0,
-                    'processing_time': round(processing_time, 2)
+                    'processing_time': round(processing_time, 2),
+                    'stage_ms': timer.as_ms()
                 }
+            
+            self.result_cache.put(cache_key, result)
+            return result
                 
         except Exception as e:
             processing_time = time.time() - start_time
@@ -378,212 +711,404 @@ class BanglaLicensePlateOCR:
                 'extracted_text': '',
                 'license_plate': '',
                 'confidence': 0.0,
-                'processing_time': round(processing_time, 2)
+                'processing_time': round(processing_time, 2),
+                'stage_ms': timer.as_ms()
             }
     
-    def parse_two_line_license_plate(self, text):
-        """Parse Bangladeshi two-line license plate format using difflib for area name correction"""
+    def _read_segmented_lines(self, image, bbox, timer):
+        """
+        Read the plate line by line with LINE_CONFIGS
+        
+        Args:
+            image: BGR (or grayscale) numpy array
+            bbox: Optional [x, y, w, h] plate region within the image
+            timer: StageTimer the segmentation and Tesseract passes are recorded in
+        
+        Returns:
+            Result dict in the shape _run_ocr_config produces, or None when the lines cannot be
+            separated or do not give a full plate (area name and number)
+        """
+        with timer.stage('segment'):
+            lines = next(filter(None, map(self._segment_lines, self._line_images(image, bbox))), None)
+        if lines is None:
+            print("Could not split the plate into two lines; using the whole-plate configs", file=sys.stderr)
+            return None
+        
+        def read_line(item):
+            line_image, config_info = item
+            with timer.stage(f"tesseract[{config_info['name']}]"):
+                return self.engine.image_to_data(line_image, config_info['config'])
+        
+        try:
+            line_data = self._map_configs(read_line, list(zip(lines, self.LINE_CONFIGS)))
+        except Exception as e:
+            print(f"  Line-segmented OCR failed: {e}", file=sys.stderr)
+            return None
+        
+        # One output line per plate line, whatever Tesseract made of the words inside it
+        extracted_text = '\n'.join(self._text_from_data(data).replace('\n', ' ').strip() for data in line_data)
+        print(f"  Line-segmented text: '{extracted_text}'", file=sys.stderr)
+        
+        with timer.stage('parse'):
+            parsed_result = self.parse_two_line_license_plate(extracted_text)
+        if not parsed_result['success'] or not parsed_result['license_plate']:
+            return None
+        
+        confidences = [int(float(conf)) for data in line_data for conf in data['conf'] if float(conf) > 0]
+        confidence = sum(confidences) / len(confidences) / 100.0 if confidences else 0.5
+        return {
+            'extracted_text': extracted_text,
+            'area_name': parsed_result['area_name'],
+            'vehicle_class': parsed_result['vehicle_class'],
+            'number': parsed_result['number'],
+            'license_plate': parsed_result['license_plate'],
+            'confidence': confidence,
+            'config_used': 'Line-segmented PSM7'
+        }
+    
+    def _run_scheduled_configs(self, processed_image, max_configs=None, timer=None):
+        """
+        Run OCR configs in scheduler order until one scores above early_exit_score
+        
+        The historically best config runs alone first, so the common case costs a single
+        Tesseract pass; the rest follow in waves of ocr_workers concurrent configs.
+        
+        Args:
+            processed_image: Output of preprocess_image
+            max_configs: Only try the first this many configs in scheduler order (None: all)
+            timer: StageTimer each Tesseract pass and parse is recorded in
+        
+        Returns:
+            Tuple of (best result dict or None, number of configs tried)
+        """
+        ordered = self.scheduler.ordered()[:max_configs]
+        waves = [ordered[:1]] + [ordered[i:i + self.ocr_workers] for i in range(1, len(ordered), self.ocr_workers)]
+        config_index = {c['name']: i for i, c in enumerate(self.OCR_CONFIGS)}
+        
+        candidates = {}
+        tried = []
+        
+        for wave in waves:
+            if not wave:
+                continue
+            
+            results = self._map_configs(
+                lambda config_info: self._run_ocr_config(processed_image, config_info, timer),
+                wave
+            )
+            for config_info, candidate in zip(wave, results):
+                tried.append(config_info['name'])
+                if candidate:
+                    candidates[config_index[config_info['name']]] = candidate
+            
+            if self.early_exit_score > 0 and any(c['score'] >= self.early_exit_score for c in candidates.values()):
+                print(f"Early exit after {len(tried)} OCR config(s)", file=sys.stderr)
+                break
+        
+        best_result = None
+        best_score = 0
+        
+        # Select in default config order with a strict comparison so ties resolve
+        # exactly as they did when every config was tried one after another
+        for index in sorted(candidates):
+            candidate = candidates[index]
+            if candidate['score'] > best_score:
+                best_score = candidate['score']
+                best_result = candidate['result']
+                print(f"  New best result from {best_result['config_used']} with score: {best_score:.3f}", file=sys.stderr)
+        
+        self.scheduler.record(tried, best_result['config_used'] if best_result else None)
+        return best_result, len(tried)
+    
+    def extract_text_multi_frame(self, image_sources, bboxes=None, configs_per_frame=None, agreement=None):
+        """
+        Read several crops of the same vehicle and vote per field
+        
+        Up to ocr_workers frames are read concurrently, each with only the scheduler's top
+        configs_per_frame OCR configs, and the next frame starts as soon as one finishes. Every read
+        votes for its area name, vehicle class and number with its OCR confidence; reading stops as
+        soon as each field's leading value is backed by `agreement` reads. Frames still being read
+        then finish in the background without being counted.
+        
+        Args:
+            image_sources: Paths, encoded image bytes and/or BGR arrays of the same vehicle
+            bboxes: Optional list of [x, y, w, h] plate regions, one per image (None entries allowed)
+            configs_per_frame: OCR configs tried per frame; defaults to OCR_VOTE_CONFIGS env var
+            agreement: Agreeing reads that settle a field; defaults to OCR_VOTE_AGREEMENT env var
+        
+        Returns:
+            Dictionary in the shape of extract_text plus per-field votes and the number of frames read
+        """
+        start_time = time.time()
+        image_sources = list(image_sources)
+        bboxes = list(bboxes or [])
+        bboxes += [None] * (len(image_sources) - len(bboxes))
+        if configs_per_frame is None:
+            configs_per_frame = int(os.getenv('OCR_VOTE_CONFIGS', self.DEFAULT_VOTE_CONFIGS))
+        if agreement is None:
+            agreement = int(os.getenv('OCR_VOTE_AGREEMENT', self.DEFAULT_VOTE_AGREEMENT))
+        
+        # At most ocr_workers frames are in flight, started in order and counted as each one finishes,
+        # so reading stops at the first frame that settles every field and no further frame is started
+        frames = iter(enumerate(zip(image_sources, bboxes)))
+        pending = {}
+        counts = {field: {} for field in self.VOTE_FIELDS}
+        reads_by_frame = {}
+        frames_read = 0
+        settled = False
         try:
-            # Clean and split text into lines
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-            
-            print(f"Parsing lines: {lines}", file=sys.stderr)
-            
-            if len(lines) < 2:
-                # Try to split by common separators if only one line detected
-                combined_text = ' '.join(lines)
-                # Try different splitting strategies
-                possible_splits = [
-                    combined_text.split(),
-                    re.split(r'[,\s]+', combined_text),
-                    re.split(r'[-\s]+', combined_text)
-                ]
+            while True:
+                for index, (image_source, bbox) in frames:
+                    future = self._frame_executor.submit(self.extract_text_two_line_format, image_source, bbox, configs_per_frame)
+                    pending[future] = index
+                    if len(pending) >= self.ocr_workers:
+                        break
+                if not pending:
+                    break
                 
-                for split_attempt in possible_splits:
-                    if len(split_attempt) >= 3:  # Need at least area, class, number
-                        lines = split_attempt
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=pending.get):
+                    index = pending.pop(future)
+                    result = future.result()
+                    frames_read += 1
+                    if not result.get('success'):
+                        continue
+                    reads_by_frame[index] = result
+                    for field in self.VOTE_FIELDS:
+                        value = result.get(field)
+                        if value:
+                            counts[field][value] = counts[field].get(value, 0) + 1
+                    
+                    settled = all(counts[field] and max(counts[field].values()) >= agreement for field in self.VOTE_FIELDS)
+                    if settled:
                         break
+                if settled:
+                    print(f"Fields agree after {frames_read} of {len(image_sources)} frame(s)", file=sys.stderr)
+                    break
+        finally:
+            # Frames still being read finish in the background and are not counted
+            for future in pending:
+                future.cancel()
+        
+        # Tally in frame order so ties between equally weighted values do not depend on thread timing
+        reads = [reads_by_frame[index] for index in sorted(reads_by_frame)]
+        votes = {field: {} for field in self.VOTE_FIELDS}
+        for result in reads:
+            weight = max(result['confidence'], 0.01)
+            for field in self.VOTE_FIELDS:
+                value = result.get(field)
+                if value:
+                    votes[field][value] = votes[field].get(value, 0.0) + weight
+        
+        processing_time = time.time() - start_time
+        
+        if not reads:
+            return {
+                'success': False,
+                'error': 'No valid license plate pattern found',
+                'extracted_text': '',
+                'license_plate': '',
+                'confidence': 0.0,
+                'processing_time': round(processing_time, 2),
+                'frames_read': frames_read
+            }
+        
+        winners = {field: max(votes[field], key=votes[field].get) if votes[field] else '' for field in self.VOTE_FIELDS}
+        # Confidence of the reads that back the voted number (all reads when no number won)
+        backing = [r for r in reads if r['number'] == winners['number']] if winners['number'] else reads
+        best_read = max(backing, key=lambda r: r['confidence'])
+        print(f"Voted plate fields: {winners}", file=sys.stderr)
+        
+        return self.resolve_registered({
+            'success': True,
+            'extracted_text': best_read['extracted_text'],
+            'license_plate': format_license_plate(winners['area_name'], winners['vehicle_class'], winners['number']),
+            **winners,
+            'confidence': round(sum(r['confidence'] for r in backing) / len(backing), 3),
+            'processing_time': round(processing_time, 2),
+            'frames_read': frames_read,
+            'votes': {field: {value: round(weight, 3) for value, weight in votes[field].items()} for field in self.VOTE_FIELDS}
+        })
+    
+    def _map_configs(self, func, configs):
+        """Apply func to every OCR config, on the thread pool if ocr_workers > 1, keeping config order"""
+        if self.ocr_workers <= 1 or len(configs) <= 1:
+            return [func(config_info) for config_info in configs]
+        
+        return list(self._executor.map(func, configs))
+    
+    @staticmethod
+    def _text_from_data(data):
+        """Rebuild line-structured text from image_to_data word boxes (one output line per Tesseract line)"""
+        lines = []
+        current_key = None
+        
+        for i, word in enumerate(data['text']):
+            word = str(word).strip()
+            if not word:
+                continue
             
-            if len(lines) < 2:
-                print("Could not identify two lines or sufficient components", file=sys.stderr)
-                return {'success': False}
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            if key != current_key:
+                lines.append([])
+                current_key = key
+            lines[-1].append(word)
+        
+        return '\n'.join(' '.join(words) for words in lines)
+    
+    def _run_ocr_config(self, processed_image, config_info, timer=None):
+        """Run one OCR config on the preprocessed plate and score the parsed result"""
+        config = config_info['config']
+        config_name = config_info['name']
+        timer = timer or StageTimer('ocr')
+        
+        try:
+            print(f"Trying OCR config: {config_name}", file=sys.stderr)
             
-            # Line 1: Area name and vehicle class
-            line1 = lines[0]
-            # Line 2: 6-digit number in format dd-dddd
-            line2 = lines[1] if len(lines) > 1 else ''
+            # Single Tesseract pass: text lines and word confidences both come from image_to_data
+            with timer.stage(f'tesseract[{config_name}]'):
+                data = self.engine.image_to_data(processed_image, config)
+            extracted_text = self._text_from_data(data).strip()
             
-            # Extract area name using difflib
-            area_name = self.extract_area_name_with_difflib(line1)
+            if not extracted_text:
+                print(f"  No text extracted with {config_name}", file=sys.stderr)
+                return None
             
-            # Extract vehicle class (Bangla letter)
-            vehicle_class = self.extract_vehicle_class(line1)
+            print(f"  Raw extracted text: '{extracted_text}'", file=sys.stderr)
             
-            # Extract 6-digit number
-            number = self.extract_six_digit_number(line2 if line2 else line1)
+            # Parse the two-line format
+            with timer.stage('parse'):
+                parsed_result = self.parse_two_line_license_plate(extracted_text)
             
-            # If we didn't find number in line2, try line1
-            if not number and len(lines) > 1:
-                number = self.extract_six_digit_number(line1)
+            if not parsed_result['success']:
+                return None
             
-            # Try to find number in any remaining lines
-            if not number and len(lines) > 2:
-                for line in lines[2:]:
-                    number = self.extract_six_digit_number(line)
-                    if number:
-                        break
+            # Get confidence score
+            try:
+                confidences = [int(float(conf)) for conf in data['conf'] if float(conf) > 0]
+                avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+                confidence = avg_confidence / 100.0
+            except:
+                confidence = 0.5
             
-            print(f"Extracted components - Area: '{area_name}', Class: '{vehicle_class}', Number: '{number}'", file=sys.stderr)
+            # Calculate result score
+            result_score = confidence
             
-            # Construct license plate
-            license_plate = ''
-            if area_name and vehicle_class and number:
-                license_plate = f"{area_name}-{vehicle_class}-{number}"
-            elif area_name and number:
-                license_plate = f"{area_name}-{number}"
+            # Bonus for complete license plate
+            if parsed_result['license_plate']:
+                result_score += 0.4
+            
+            # Bonus for finding area name
+            if parsed_result['area_name']:
+                result_score += 0.2
+            
+            # Bonus for finding 6-digit number
+            if parsed_result['number'] and len(parsed_result['number'].replace('-', '')) == 6:
+                result_score += 0.3
+            
+            print(f"  Parsed result ({config_name}): {parsed_result}", file=sys.stderr)
+            print(f"  Score ({config_name}): {result_score:.3f}", file=sys.stderr)
             
             return {
-                'success': bool(area_name or vehicle_class or number),
-                'area_name': area_name,
-                'vehicle_class': vehicle_class,
-                'number': number,
-                'license_plate': license_plate
+                'score': result_score,
+                'result': {
+                    'extracted_text': extracted_text,
+                    'area_name': parsed_result['area_name'],
+                    'vehicle_class': parsed_result['vehicle_class'],
+                    'number': parsed_result['number'],
+                    'license_plate': parsed_result['license_plate'],
+                    'confidence': confidence,
+                    'config_used': config_name
+                }
             }
             
+        except Exception as e:
+            print(f"  Config {config_name} failed: {e}", file=sys.stderr)
+            return None
+    
+    def parse_two_line_license_plate(self, text):
+        """Parse Bangladeshi two-line license plate format using fuzzy area name correction"""
+        try:
+            return self.parser.parse(text)
         except Exception as e:
             print(f"Two-line parsing error: {e}", file=sys.stderr)
             return {'success': False}
     
     def extract_area_name_with_difflib(self, text):
         """Extract area name using difflib for fuzzy matching"""
-        try:
-            # Clean text and get individual words
-            words = re.findall(r'[^\s\-,]+', text)
-            
-            best_match = ''
-            best_ratio = 0
-            
-            for word in words:
-                if len(word) < 2:  # Skip very short words
-                    continue
-                
-                # Use difflib to find closest matches
-                matches = get_close_matches(word, self.area_names, n=3, cutoff=0.6)
-                
-                if matches:
-                    # Get the best match
-                    match = matches[0]
-                    
-                    # Calculate similarity ratio
-                    from difflib import SequenceMatcher
-                    ratio = SequenceMatcher(None, word.lower(), match.lower()).ratio()
-                    
-                    print(f"  Word '{word}' matched to '{match}' with ratio {ratio:.3f}", file=sys.stderr)
-                    
-                    if ratio > best_ratio:
-                        best_ratio = ratio
-                        # Convert to Bangla if it's an English match
-                        if match in ['dhaka', 'DHAKA', 'Dhaka']:
-                            best_match = 'ঢাকা'
-                        elif match in ['chittagong', 'CHITTAGONG', 'Chittagong', 'ctg', 'CTG']:
-                            best_match = 'চট্টগ্রাম'
-                        elif match in ['sylhet', 'SYLHET', 'Sylhet']:
-                            best_match = 'সিলেট'
-                        elif match in ['rajshahi', 'RAJSHAHI', 'Rajshahi']:
-                            best_match = 'রাজশাহী'
-                        elif match in ['barisal', 'BARISAL', 'Barisal']:
-                            best_match = 'বরিশাল'
-                        elif match in ['khulna', 'KHULNA', 'Khulna']:
-                            best_match = 'খুলনা'
-                        elif match in ['rangpur', 'RANGPUR', 'Rangpur']:
-                            best_match = 'রংপুর'
-                        elif match in ['mymensingh', 'MYMENSINGH', 'Mymensingh']:
-                            best_match = 'ময়মনসিংহ'
-                        elif match in ['metro', 'METRO', 'Metro']:
-                            best_match = 'মেট্রো'
-                        else:
-                            best_match = match
-            
-            print(f"Best area name match: '{best_match}' with ratio {best_ratio:.3f}", file=sys.stderr)
-            return best_match if best_ratio > 0.6 else ''
-            
-        except Exception as e:
-            print(f"Area name extraction error: {e}", file=sys.stderr)
-            return ''
+        return self.parser.extract_area_name(text)
     
     def extract_vehicle_class(self, text):
         """Extract vehicle class (Bangla letter)"""
-        try:
-            # Look for Bangla letters
-            bangla_letters = ['ক', 'খ', 'গ', 'ঘ', 'ঙ', 'চ', 'ছ', 'জ', 'ঝ', 'ঞ', 'ট', 'ঠ', 'ড', 'ঢ', 'ণ',
-                             'ত', 'থ', 'দ', 'ধ', 'ন', 'প', 'ফ', 'ব', 'ভ', 'ম', 'য', 'র', 'ল', 'শ', 'ষ', 'স', 'হ']
-            
-            for letter in bangla_letters:
-                if letter in text:
-                    print(f"Found vehicle class: '{letter}'", file=sys.stderr)
-                    return letter
-            
-            return ''
-            
-        except Exception as e:
-            print(f"Vehicle class extraction error: {e}", file=sys.stderr)
-            return ''
+        return extract_vehicle_class(text)
     
     def extract_six_digit_number(self, text):
         """Extract 6-digit number in format dd-dddd"""
-        try:
-            # Convert any Bangla numbers to English
-            converted_text = text
-            for bangla, english in self.bangla_numbers.items():
-                converted_text = converted_text.replace(bangla, english)
-            
-            # Look for 6-digit patterns
-            patterns = [
-                r'(\d{2})-(\d{4})',  # dd-dddd format
-                r'(\d{2})\s*-\s*(\d{4})',  # dd - dddd with spaces
-                r'(\d{2})\s+(\d{4})',  # dd dddd with space
-                r'(\d{6})',  # dddddd without separator
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, converted_text)
-                if matches:
-                    if len(matches[0]) == 2:  # Two groups (dd, dddd)
-                        number = f"{matches[0][0]}-{matches[0][1]}"
-                    else:  # Single group (dddddd)
-                        num_str = matches[0]
-                        if len(num_str) == 6:
-                            number = f"{num_str[:2]}-{num_str[2:]}"
-                        else:
-                            continue
-                    
-                    # Convert back to Bangla numbers
-                    bangla_number = number
-                    for english, bangla in self.english_to_bangla.items():
-                        bangla_number = bangla_number.replace(english, bangla)
-                    
-                    print(f"Found 6-digit number: '{bangla_number}' (from '{number}')", file=sys.stderr)
-                    return bangla_number
-            
-            return ''
-            
-        except Exception as e:
-            print(f"Number extraction error: {e}", file=sys.stderr)
-            return ''
+        return extract_number(text)
+    
+    def resolve_registered(self, result):
+        """
+        Add the nearest registered plate to a successful reading as 'registered' (None when nothing is close enough)
+        
+        Resolution runs after the result cache, so a cached reading is matched against the current registry.
+        """
+        if self.registry is None or not result.get('success'):
+            return result
+        
+        start_time = time.time()
+        result['registered'] = self.registry.resolve(result)
+        if 'stage_ms' in result:
+            result['stage_ms']['registry'] = round((time.time() - start_time) * 1000, 2)
+        if result['registered']:
+            print(f"Registered plate: '{result['registered']['license']}' at distance {result['registered']['distance']}", file=sys.stderr)
+        return result
     
     # Keep the old method as fallback
-    def extract_text(self, image_path, bbox=None):
+    def extract_text(self, image_source, bbox=None):
         """Main extraction method - uses two-line format extraction"""
-        return self.extract_text_two_line_format(image_path, bbox)
+        return self.resolve_registered(self.extract_text_two_line_format(image_source, bbox))
+
+def serve():
+    """Run the OCR as a warm worker answering requests over stdin/stdout"""
+    from worker import LineProtocolWorker
+    
+    # Tesseract check and self-test run once here instead of on every plate
+    ocr = BanglaLicensePlateOCR()
+    
+    def extract(request):
+        return ocr.extract_text(image_from_request(request), request.get('bbox'))
+    
+    def extract_multi(request):
+        images = [image_from_request({'image': image}) for image in request.get('images') or []]
+        images += [image_from_request({'image_path': path}) for path in request.get('image_paths') or []]
+        return ocr.extract_text_multi_frame(images, request.get('bboxes'))
+    
+    def stats(request):
+        return {
+            'config_stats': ocr.scheduler.summary(),
+            'result_cache': ocr.result_cache.stats(),
+            'registry': ocr.registry.stats() if ocr.registry else None
+        }
+    
+    worker = LineProtocolWorker('ocr', {'extract': extract, 'extract_multi': extract_multi, 'stats': stats}, info={'backend': ocr.engine.name})
+    try:
+        worker.serve()
+    finally:
+        ocr.scheduler.save()
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python ocr_extractor.py <image_path> [bbox_json]", file=sys.stderr)
+        print("Usage: python ocr_extractor.py <image_path> [bbox_json]   (use - to read the encoded image from stdin)", file=sys.stderr)
+        print("       python ocr_extractor.py --serve", file=sys.stderr)
         sys.exit(1)
     
+    if sys.argv[1] == '--serve':
+        serve()
+        return
+    
     try:
-        # Get image path from command line
-        image_path = sys.argv[1]
+        # Get image path from command line, or the encoded image itself from stdin
+        image = sys.argv[1]
         
         # Get bounding box if provided
         bbox = None
@@ -592,14 +1117,16 @@ def main():
             bbox = json.loads(bbox_json)
         
         # Check if image file exists
-        if not Path(image_path).exists():
-            raise FileNotFoundError(f"Image file not found: {image_path}")
+        if image == '-':
+            image = sys.stdin.buffer.read()
+        elif not Path(image).exists():
+            raise FileNotFoundError(f"Image file not found: {image}")
         
         # Initialize OCR
         ocr = BanglaLicensePlateOCR()
         
         # Extract text using two-line format
-        results = ocr.extract_text(image_path, bbox)
+        results = ocr.extract_text(image, bbox)
         
         # Output ONLY JSON results to stdout (no debug messages)
         print(json.dumps(results))
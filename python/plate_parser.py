@@ -0,0 +1,145 @@
+import re
+import sys
+
+from area_matcher import AreaNameMatcher, VEHICLE_CLASS_LETTERS
+
+BANGLA_DIGITS = '০১২৩৪৫৬৭৮৯'
+TO_ENGLISH_DIGITS = str.maketrans(BANGLA_DIGITS, '0123456789')
+TO_BANGLA_DIGITS = str.maketrans('0123456789', BANGLA_DIGITS)
+
+# Plate number grammar: dd-dddd, dd - dddd, dd dddd or dddddd. The lookahead reports every
+# start position in one scan; the separator tells which form matched there.
+NUMBER_PATTERN = re.compile(r'(?=(\d{2})(\s*-\s*|\s+|)(\d{4}))')
+VEHICLE_CLASS_PATTERN = re.compile('[' + ''.join(VEHICLE_CLASS_LETTERS) + ']')
+VEHICLE_CLASS_RANK = {letter: rank for rank, letter in enumerate(VEHICLE_CLASS_LETTERS)}
+WORD_PATTERN = re.compile(r'[^\s\-,]+')
+SPLIT_PATTERNS = [re.compile(r'[,\s]+'), re.compile(r'[-\s]+')]
+
+def _number_form(separator):
+    """Preference of a number form, lowest first: dd-dddd, dd - dddd, dd dddd, dddddd"""
+    if separator == '-':
+        return 0
+    if '-' in separator:
+        return 1
+    return 2 if separator else 3
+
+def extract_vehicle_class(text):
+    """Vehicle class letter; when several are present the earliest in VEHICLE_CLASS_LETTERS wins"""
+    letters = VEHICLE_CLASS_PATTERN.findall(text)
+    if not letters:
+        return ''
+
+    letter = min(letters, key=VEHICLE_CLASS_RANK.__getitem__)
+    print(f"Found vehicle class: '{letter}'", file=sys.stderr)
+    return letter
+
+def extract_number(text):
+    """
+    Extract the 6-digit plate number in dd-dddd format
+
+    The first occurrence of the most preferred form wins, so 'dd-dddd' anywhere in the
+    text beats an earlier 'dd dddd' or 'dddddd'.
+
+    Returns:
+        Number with Bangla digits, or '' when none is found
+    """
+    best = None
+    for match in NUMBER_PATTERN.finditer(text.translate(TO_ENGLISH_DIGITS)):
+        form = _number_form(match.group(2))
+        if best is None or form < best[0]:
+            best = (form, match)
+            if form == 0:
+                break
+
+    if best is None:
+        return ''
+
+    match = best[1]
+    number = f"{match.group(1)}-{match.group(3)}"
+    bangla_number = number.translate(TO_BANGLA_DIGITS)
+    print(f"Found 6-digit number: '{bangla_number}' (from '{number}')", file=sys.stderr)
+    return bangla_number
+
+def format_license_plate(area_name, vehicle_class, number):
+    """Full plate string; empty unless at least the area name and number are known"""
+    if area_name and vehicle_class and number:
+        return f"{area_name}-{vehicle_class}-{number}"
+    if area_name and number:
+        return f"{area_name}-{number}"
+    return ''
+
+class LicensePlateParser:
+    def __init__(self, area_matcher=None):
+        """
+        Parser for Bangladeshi two-line license plate text
+
+        Args:
+            area_matcher: AreaNameMatcher used for the area name (default: a new matcher)
+        """
+        self.area_matcher = area_matcher or AreaNameMatcher()
+
+    def extract_area_name(self, text):
+        """Best fuzzy area name match among the words of text"""
+        best_match = ''
+        best_ratio = 0
+
+        for word in WORD_PATTERN.findall(text):
+            if len(word) < 2:  # Skip very short words
+                continue
+
+            match, ratio = self.area_matcher.match(word)
+            if match:
+                print(f"  Word '{word}' matched to '{match}' with ratio {ratio:.3f}", file=sys.stderr)
+                if ratio > best_ratio:
+                    best_ratio = ratio
+                    best_match = match
+
+        print(f"Best area name match: '{best_match}' with ratio {best_ratio:.3f}", file=sys.stderr)
+        return best_match if best_ratio > 0.6 else ''
+
+    def split_lines(self, text):
+        """Plate lines; a single OCR line is split into words when that gives area, class and number"""
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        print(f"Parsing lines: {lines}", file=sys.stderr)
+
+        if len(lines) < 2:
+            combined_text = ' '.join(lines)
+            for split_attempt in (combined_text.split(), *(pattern.split(combined_text) for pattern in SPLIT_PATTERNS)):
+                if len(split_attempt) >= 3:  # Need at least area, class, number
+                    return split_attempt
+
+        return lines
+
+    def parse(self, text):
+        """
+        Parse OCR text into area name, vehicle class and number
+
+        Returns:
+            Dictionary with success, area_name, vehicle_class, number and license_plate
+        """
+        lines = self.split_lines(text)
+        if len(lines) < 2:
+            print("Could not identify two lines or sufficient components", file=sys.stderr)
+            return {'success': False}
+
+        # Line 1: area name and vehicle class; line 2: number (falling back to the other lines)
+        line1, line2 = lines[0], lines[1]
+        area_name = self.extract_area_name(line1)
+        vehicle_class = extract_vehicle_class(line1)
+
+        number = extract_number(line2 if line2 else line1)
+        if not number:
+            for line in [line1, *lines[2:]]:
+                number = extract_number(line)
+                if number:
+                    break
+
+        print(f"Extracted components - Area: '{area_name}', Class: '{vehicle_class}', Number: '{number}'", file=sys.stderr)
+
+        return {
+            'success': bool(area_name or vehicle_class or number),
+            'area_name': area_name,
+            'vehicle_class': vehicle_class,
+            'number': number,
+            'license_plate': format_license_plate(area_name, vehicle_class, number)
+        }
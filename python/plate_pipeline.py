@@ -0,0 +1,203 @@
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from detection_cascade import CoarseToFineDetector
+from image_io import load_image, image_from_request, describe_image
+from instrumentation import METRICS
+from yolo_detector import YOLOLicensePlateDetector
+from ocr_extractor import BanglaLicensePlateOCR
+
+class LicensePlatePipeline:
+    def __init__(self, detector, ocr, max_plates=None, cascade=None):
+        """
+        Detect-then-read pipeline sharing one decoded frame between YOLO and OCR
+
+        Args:
+            detector: YOLOLicensePlateDetector instance
+            ocr: BanglaLicensePlateOCR instance
+            max_plates: Read at most this many detections per frame (highest confidence first); None reads all
+            cascade: Optional CoarseToFineDetector; plates are then found on a reduced decode and
+                     read from the full-resolution frame, which is only decoded when a plate is found
+        """
+        self.detector = detector
+        self.ocr = ocr
+        self.max_plates = max_plates
+        self.cascade = cascade
+
+    def process(self, image_source):
+        """
+        Detect license plates and read every detected plate
+
+        Args:
+            image_source: Path to image file, encoded image bytes or BGR numpy array
+
+        Returns:
+            Dictionary with detections, per-plate OCR readings (with the nearest registered plate when
+            a registry is configured) and a per-stage timing breakdown
+        """
+        start_time = time.time()
+        timings = {}
+
+        try:
+            print(f"Pipeline processing image: {describe_image(image_source)}", file=sys.stderr)
+            if self.cascade is not None:
+                # Decoding is part of the cascade (coarse and, when needed, full); see detector_stage_ms
+                timings['decode'] = 0.0
+                stage_start = time.time()
+                detection_result, image = self.cascade.detect_with_frame(image_source)
+                timings['detect'] = round(time.time() - stage_start, 3)
+            else:
+                # Decode once; the detector and the OCR both work on this array
+                stage_start = time.time()
+                image = load_image(image_source)
+                timings['decode'] = round(time.time() - stage_start, 3)
+
+                stage_start = time.time()
+                detection_result = self.detector.detect_license_plates(image)
+                timings['detect'] = round(time.time() - stage_start, 3)
+            if not detection_result.get('success', True):
+                # A failed decode or inference pass is an error, not a frame without plates
+                return self._failure(detection_result.get('error', 'Detection failed'), start_time, timings)
+            detections = detection_result['detections']
+
+            to_read = sorted(detections, key=lambda d: d['confidence'], reverse=True)
+            if self.max_plates is not None:
+                to_read = to_read[:self.max_plates]
+
+            plates = []
+            timings['ocr'] = []
+            for detection in to_read:
+                # The crop is a view of the decoded frame handed straight to preprocess_image
+                stage_start = time.time()
+                reading = self.ocr.extract_text(image, detection['bbox'])
+                timings['ocr'].append(round(time.time() - stage_start, 3))
+
+                plates.append({
+                    'bbox': detection['bbox'],
+                    'detection_confidence': detection['confidence'],
+                    **reading
+                })
+
+            processing_time = time.time() - start_time
+            timings['total'] = round(processing_time, 3)
+
+            METRICS.observe('pipeline', 'decode', timings['decode'])
+            METRICS.observe('pipeline', 'detect', timings['detect'])
+            for ocr_time in timings['ocr']:
+                METRICS.observe('pipeline', 'ocr', ocr_time)
+            METRICS.observe('pipeline', 'total', processing_time)
+
+            return {
+                'success': True,
+                'detections': detections,
+                'plates': plates,
+                'processing_time': round(processing_time, 2),
+                'model_version': detection_result['model_version'],
+                'timings': timings,
+                # Finer breakdowns in milliseconds; each plate also carries its OCR stage_ms
+                'detector_stage_ms': detection_result.get('stage_ms', {})
+            }
+
+        except Exception as e:
+            print(f"Pipeline error: {e}", file=sys.stderr)
+            return self._failure(str(e), start_time, timings)
+
+    @staticmethod
+    def _failure(error, start_time, timings):
+        """Result for a frame the pipeline could not process, with the timings of the stages that ran"""
+        processing_time = time.time() - start_time
+        timings['total'] = round(processing_time, 3)
+        return {
+            'success': False,
+            'error': error,
+            'detections': [],
+            'plates': [],
+            'processing_time': round(processing_time, 2),
+            'timings': timings
+        }
+
+def create_pipeline():
+    """Build the pipeline from the same configuration the standalone scripts use"""
+    model_path = os.getenv('YOLO_MODEL_PATH', 'yolo.pt')
+
+    detector = YOLOLicensePlateDetector(
+        model_path=model_path,
+        confidence_threshold=0.5,
+        nms_threshold=0.4
+    )
+    ocr = BanglaLicensePlateOCR()
+
+    max_plates = os.getenv('PIPELINE_MAX_PLATES')
+    cascade = CoarseToFineDetector.from_env(detector) if os.getenv('YOLO_CASCADE', '0') == '1' else None
+    return LicensePlatePipeline(detector, ocr, int(max_plates) if max_plates else None, cascade)
+
+def serve():
+    """Run the pipeline as a warm worker answering requests over stdin/stdout"""
+    from worker import LineProtocolWorker
+
+    pipeline = create_pipeline()
+
+    def process(request):
+        return pipeline.process(image_from_request(request))
+
+    def stats(request):
+        return {
+            'detector_cache': pipeline.detector.result_cache.stats(),
+            'ocr_cache': pipeline.ocr.result_cache.stats(),
+            'registry': pipeline.ocr.registry.stats() if pipeline.ocr.registry else None
+        }
+
+    worker = LineProtocolWorker(
+        'pipeline',
+        {'process': process, 'stats': stats},
+        info={
+            'model_version': f'{pipeline.detector.model_type}_license_plate_detector',
+            'model_load_ms': round(pipeline.detector.load_time * 1000, 1),
+            'backend': pipeline.ocr.engine.name
+        }
+    )
+    try:
+        worker.serve()
+    finally:
+        pipeline.ocr.scheduler.save()
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python plate_pipeline.py <image_path>   (use - to read the encoded image from stdin)", file=sys.stderr)
+        print("       python plate_pipeline.py --serve", file=sys.stderr)
+        sys.exit(1)
+
+    if sys.argv[1] == '--serve':
+        serve()
+        return
+
+    try:
+        image = sys.argv[1]
+        if image == '-':
+            image = sys.stdin.buffer.read()
+        elif not Path(image).exists():
+            raise FileNotFoundError(f"Image file not found: {image}")
+
+        pipeline = create_pipeline()
+        results = pipeline.process(image)
+
+        # Output ONLY JSON results to stdout (no debug messages)
+        print(json.dumps(results))
+
+    except Exception as e:
+        error_result = {
+            'success': False,
+            'error': str(e),
+            'detections': [],
+            'plates': [],
+            'processing_time': 0
+        }
+        # Output error as JSON to stdout
+        print(json.dumps(error_result))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from area_matcher import AreaNameMatcher, VEHICLE_CLASS_LETTERS
+from plate_parser import TO_ENGLISH_DIGITS
+
+# Fields of a tollplaza.license-plate document kept in memory and returned with a match
+REGISTRY_FIELDS = ('license', 'owner', 'phone', 'vehicleType', 'tollAmount', 'createdAt')
+TOKEN_PATTERN = re.compile(r'[^\s\-,]+')
+NON_DIGIT_PATTERN = re.compile(r'\D')
+
+def levenshtein(a, b):
+    """Edit distance (insertions, deletions and substitutions) between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def _plain(value):
+    """Unwrap MongoDB extended JSON ({"$oid": ...}, {"$date": ...}, {"$numberInt": ...}) as written by mongoexport"""
+    if not isinstance(value, dict) or len(value) != 1:
+        return value
+    (tag, inner), = value.items()
+    if tag == '$oid':
+        return inner
+    if tag == '$date':
+        inner = _plain(inner)
+        if isinstance(inner, (int, float)) or (isinstance(inner, str) and inner.lstrip('-').isdigit()):
+            return datetime.fromtimestamp(int(inner) / 1000, timezone.utc).isoformat().replace('+00:00', 'Z')
+        return inner
+    if tag in ('$numberInt', '$numberLong'):
+        return int(inner)
+    if tag in ('$numberDouble', '$numberDecimal'):
+        return float(inner)
+    return value
+
+class SymmetricDeleteIndex:
+    def __init__(self, max_deletes=2):
+        """
+        Symmetric-delete index over strings for edit-distance lookups (the SymSpell scheme)
+
+        Every key is stored under each string obtained by deleting up to max_deletes of its
+        characters. Two strings within edit distance k share such a variant with at most k
+        deletions on each side, so a query only verifies the keys found under its own variants
+        instead of comparing against every key. Plate numbers are short strings over ten
+        digits, where metric trees such as a BK-tree end up visiting most of their nodes.
+
+        Args:
+            max_deletes: Largest edit distance a search can be asked for
+        """
+        self.max_deletes = max_deletes
+        self._items = defaultdict(list)
+        self._variants = defaultdict(set)
+
+    @staticmethod
+    def deletes(key, max_deletes):
+        """key and every string made from it by deleting up to max_deletes characters"""
+        variants = {key}
+        level = {key}
+        for _ in range(max_deletes):
+            level = {variant[:i] + variant[i + 1:] for variant in level for i in range(len(variant))}
+            variants |= level
+        return variants
+
+    def add(self, key, item):
+        """Store item under key; items with equal keys share an entry"""
+        if key not in self._items:
+            for variant in self.deletes(key, self.max_deletes):
+                self._variants[variant].add(key)
+        self._items[key].append(item)
+
+    def remove(self, key, item):
+        items = self._items.get(key)
+        if not items or item not in items:
+            return
+        items.remove(item)
+        if not items:
+            del self._items[key]
+            for variant in self.deletes(key, self.max_deletes):
+                self._variants[variant].discard(key)
+                if not self._variants[variant]:
+                    del self._variants[variant]
+
+    def __len__(self):
+        return sum(len(items) for items in self._items.values())
+
+    def search(self, key, max_distance):
+        """
+        Items within max_distance (at most max_deletes) of key
+
+        Returns:
+            List of (distance, item) tuples
+        """
+        max_distance = min(max_distance, self.max_deletes)
+        found = []
+        checked = set()
+        for variant in self.deletes(key, max_distance):
+            for candidate in self._variants.get(variant, ()):
+                # A variant reached with more deletions than max_distance on the stored side cannot match
+                if candidate in checked or len(candidate) - len(variant) > max_distance:
+                    continue
+                checked.add(candidate)
+                distance = levenshtein(key, candidate)
+                if distance <= max_distance:
+                    found.extend((distance, item) for item in self._items[candidate])
+        return found
+
+class PlateRegistry:
+    def __init__(self, path, max_distance=2, refresh_interval=5.0, area_matcher=None):
+        """
+        In-memory index of the registered vehicles, for resolving OCR readings without a database lookup
+
+        The registry is loaded from a mongoexport of tollplaza.license-plate, either JSON lines
+        (the mongoexport default) or a JSON array (--jsonArray). JSON-lines exports are refreshed
+        incrementally: records appended to the file are read from where the last load stopped, so
+        new registrations can be added with `mongoexport --query` on createdAt and `>>`. The part
+        already indexed is checked against a hash first; any other change to the file (rewritten in
+        place, edited, truncated or a JSON array) reloads it whole.
+
+        Each plate is split into area name, vehicle class and the six number digits. The digits are
+        indexed by symmetric deletes, and a reading's distance to a plate is the edit distance between
+        the digits plus one for a different area name and one for a different class letter (a field
+        the OCR did not read costs nothing).
+
+        Args:
+            path: Export file of the license-plate collection
+            max_distance: Largest distance at which a reading still resolves to a plate
+            refresh_interval: Seconds between checks of the export file for changes; 0 checks on every lookup
+            area_matcher: AreaNameMatcher for the area part of registered plates (default: a new matcher)
+        """
+        self.path = Path(path)
+        self.max_distance = max_distance
+        self.refresh_interval = refresh_interval
+        self.area_matcher = area_matcher or AreaNameMatcher()
+        self._lock = threading.Lock()
+        self._reset()
+        self._checked_at = 0.0
+        self._signature = None
+        self.full_loads = 0
+        self.incremental_loads = 0
+        self.lookups = 0
+        self.resolved = 0
+        self.refresh()
+
+    @classmethod
+    def from_env(cls):
+        """Registry from PLATE_REGISTRY_PATH (None when unset), PLATE_REGISTRY_MAX_DISTANCE and PLATE_REGISTRY_REFRESH"""
+        path = os.getenv('PLATE_REGISTRY_PATH')
+        if not path:
+            return None
+        return cls(
+            path,
+            max_distance=int(os.getenv('PLATE_REGISTRY_MAX_DISTANCE', 2)),
+            refresh_interval=float(os.getenv('PLATE_REGISTRY_REFRESH', 5))
+        )
+
+    def _reset(self):
+        self.index = SymmetricDeleteIndex(self.max_distance)
+        self._records = {}
+        self._offset = 0
+        self._prefix_digest = None
+        self.latest_created_at = None
+
+    def parse_license(self, license):
+        """
+        Area name, vehicle class and number digits of a registered plate string
+
+        Accepts the forms the OCR and the dashboard produce ("ঢাকা-গ-১২-৩৪৫৬", "ঢাকা মেট্রো-গ-১২৩৪৫৬",
+        "Dhaka-12-3456"), with Bangla or English digits.
+
+        Returns:
+            Tuple of (area_name, vehicle_class, digits); digits has Bangla digits converted to English
+        """
+        digits = NON_DIGIT_PATTERN.sub('', license.translate(TO_ENGLISH_DIGITS))
+        area_name = ''
+        vehicle_class = ''
+        for token in TOKEN_PATTERN.findall(license):
+            if token.translate(TO_ENGLISH_DIGITS).isdigit():
+                continue
+            if token in VEHICLE_CLASS_LETTERS:
+                vehicle_class = token
+                continue
+            match, _ = self.area_matcher.match(token)
+            if match and match != 'মেট্রো' and match not in VEHICLE_CLASS_LETTERS and not area_name:
+                area_name = match
+        return area_name, vehicle_class, digits
+
+    def _add(self, document):
+        """Index one exported document, replacing an earlier version of it"""
+        document = {key: _plain(value) for key, value in document.items()}
+        license = document.get('license')
+        if not isinstance(license, str) or not license.strip():
+            return
+
+        record_id = str(document.get('_id') or license)
+        record = {'_id': record_id, **{field: document.get(field) for field in REGISTRY_FIELDS}}
+        record['area_name'], record['vehicle_class'], record['digits'] = self.parse_license(license)
+        if not record['digits']:
+            print(f"Registry: no plate number in '{license}', skipped", file=sys.stderr)
+            return
+
+        previous = self._records.get(record_id)
+        if previous is not None:
+            self.index.remove(previous['digits'], previous)
+        self._records[record_id] = record
+        self.index.add(record['digits'], record)
+
+        created_at = record.get('createdAt')
+        if isinstance(created_at, str) and (self.latest_created_at is None or created_at > self.latest_created_at):
+            self.latest_created_at = created_at
+
+    @staticmethod
+    def _digest(data):
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def _load_lines(self, data):
+        """
+        Index the JSON lines in data
+
+        Returns:
+            Number of bytes up to the last newline; a final line without one may still be being
+            written, so it is indexed if it parses but read again on the next refresh
+        """
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                self._add(json.loads(line))
+            except (ValueError, AttributeError) as e:
+                print(f"Registry: skipping bad record: {e}", file=sys.stderr)
+
+        tail = data[end:].strip()
+        if tail:
+            try:
+                self._add(json.loads(tail))
+            except (ValueError, AttributeError):
+                pass
+        return end
+
+    def refresh(self, force=False):
+        """
+        Bring the index up to date with the export file
+
+        Args:
+            force: Check the file even if refresh_interval has not passed since the last check
+
+        Returns:
+            True when records were (re)loaded
+        """
+        now = time.monotonic()
+        if not force and self._signature is not None and now - self._checked_at < self.refresh_interval:
+            return False
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                stat = self.path.stat()
+            except OSError as e:
+                print(f"Registry export not readable: {e}", file=sys.stderr)
+                return False
+
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if signature == self._signature:
+                return False
+
+            start_time = time.time()
+            data = self.path.read_bytes()
+            # Only an append keeps the indexed prefix byte for byte; an in-place rewrite (e.g. mongoexport -o
+            # over the old file) can keep the inode and grow, but edits or shifts the records already read
+            appended = (self._offset > 0 and len(data) >= self._offset and data[self._offset - 1:self._offset] == b'\n'
+                        and self._digest(data[:self._offset]) == self._prefix_digest)
+            if appended:
+                self._offset += self._load_lines(data[self._offset:])
+                self.incremental_loads += 1
+            else:
+                self._reset()
+                if data.lstrip()[:1] == b'[':
+                    for document in json.loads(data):
+                        self._add(document)
+                else:
+                    self._offset = self._load_lines(data)
+                self.full_loads += 1
+            self._prefix_digest = self._digest(data[:self._offset]) if self._offset else None
+
+            self._signature = signature
+            print(f"Registry: {len(self._records)} plates from {self.path} "
+                  f"({'incremental' if appended else 'full'} load, {time.time() - start_time:.3f}s)", file=sys.stderr)
+            return True
+
+    def resolve(self, reading):
+        """
+        Nearest registered plate to an OCR reading
+
+        Args:
+            reading: Dictionary with area_name, vehicle_class and number as returned by BanglaLicensePlateOCR
+
+        Returns:
+            The registered record (license, owner, phone, vehicleType, tollAmount, createdAt, _id) with its
+            distance, exact and ambiguous (another plate is equally close), or None when no plate lies
+            within max_distance
+        """
+        self.refresh()
+        digits = NON_DIGIT_PATTERN.sub('', (reading.get('number') or '').translate(TO_ENGLISH_DIGITS))
+        if not digits:
+            return None
+
+        area_name = reading.get('area_name') or ''
+        vehicle_class = reading.get('vehicle_class') or ''
+        with self._lock:
+            self.lookups += 1
+            # Widen the search one edit at a time: the first level holding a plate at most that far
+            # away already holds every nearest plate, so most readings stop at the exact level
+            best_distance, best = None, []
+            for level in range(self.max_distance + 1):
+                for distance, record in self.index.search(digits, level):
+                    if area_name and record['area_name'] and area_name != record['area_name']:
+                        distance += 1
+                    if vehicle_class and record['vehicle_class'] and vehicle_class != record['vehicle_class']:
+                        distance += 1
+                    if best_distance is None or distance < best_distance:
+                        best_distance, best = distance, [record]
+                    elif distance == best_distance and record not in best:
+                        best.append(record)
+                if best_distance is not None and best_distance <= level:
+                    break
+
+            if best_distance is None or best_distance > self.max_distance:
+                return None
+            self.resolved += 1
+
+        match = best[0]
+        return {
+            '_id': match['_id'],
+            **{field: match[field] for field in REGISTRY_FIELDS},
+            'distance': best_distance,
+            'exact': best_distance == 0,
+            'ambiguous': len(best) > 1
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                'path': str(self.path),
+                'plates': len(self._records),
+                'latest_created_at': self.latest_created_at,
+                'max_distance': self.max_distance,
+                'full_loads': self.full_loads,
+                'incremental_loads': self.incremental_loads,
+                'lookups': self.lookups,
+                'resolved': self.resolved
+            }
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python plate_registry.py <export.jsonl|export.json> <plate>", file=sys.stderr)
+        sys.exit(1)
+
+    registry = PlateRegistry(sys.argv[1])
+    area_name, vehicle_class, digits = registry.parse_license(sys.argv[2])
+    match = registry.resolve({'area_name': area_name, 'vehicle_class': vehicle_class, 'number': digits})
+
+    # Output ONLY JSON results to stdout (no debug messages)
+    print(json.dumps({'registered': match, 'registry': registry.stats()}, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+def box_iou_matrix(boxes_a, boxes_b):
+    """IoU of every pair of [x, y, w, h] boxes; returns an array of shape (len(boxes_a), len(boxes_b))"""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 0] + a[:, None, 2], b[None, :, 0] + b[None, :, 2])
+    y2 = np.minimum(a[:, None, 1] + a[:, None, 3], b[None, :, 1] + b[None, :, 3])
+
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+def crop_sharpness(frame, bbox):
+    """Variance of the Laplacian over the plate crop; higher is sharper"""
+    x, y, w, h = bbox
+    crop = frame[max(0, y):y + h, max(0, x):x + w]
+    if crop.size == 0:
+        return 0.0
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+class PlateTrack:
+    def __init__(self, track_id, frame_index, keep_frames=1):
+        """One plate followed across sampled frames; keeps the keep_frames frames it is best seen in"""
+        self.track_id = track_id
+        self.bbox = None
+        self.hits = 0
+        self.missed = 0
+        self.first_frame = frame_index
+        self.last_frame = frame_index
+        self.keep_frames = max(1, keep_frames)
+        self.frames = []
+
+    @property
+    def best(self):
+        return self.frames[0] if self.frames else None
+
+    def update(self, frame, detection, frame_index, timestamp, best_by):
+        self.bbox = detection['bbox']
+        self.hits += 1
+        self.missed = 0
+        self.last_frame = frame_index
+
+        candidate = {
+            'frame': frame,
+            'frame_index': frame_index,
+            'timestamp': timestamp,
+            'bbox': detection['bbox'],
+            'confidence': detection['confidence'],
+        }
+        if best_by == 'sharpness':
+            candidate['sharpness'] = round(crop_sharpness(frame, detection['bbox']), 1)
+
+        # Only the best few frames are kept alive, so memory stays bounded per vehicle
+        if len(self.frames) < self.keep_frames or candidate[best_by] > self.frames[-1][best_by]:
+            self.frames.append(candidate)
+            self.frames.sort(key=lambda c: c[best_by], reverse=True)
+            del self.frames[self.keep_frames:]
+
+class PlateTracker:
+    def __init__(self, iou_threshold=0.3, max_missed=5, min_hits=2, best_by='confidence', keep_frames=1):
+        """
+        Greedy IoU tracker for plate boxes across sampled frames
+
+        Args:
+            iou_threshold: Minimum IoU for a detection to continue a track
+            max_missed: Sampled frames a track may go unseen before it is closed
+            min_hits: Frames a track needs to count as a vehicle (filters one-frame false positives)
+            best_by: 'confidence' or 'sharpness'; how the frames sent to OCR are chosen
+            keep_frames: Best frames kept per track; more than one are read with multi-frame voting
+        """
+        if best_by not in ('confidence', 'sharpness'):
+            raise ValueError(f"Unknown best frame criterion: {best_by}")
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.min_hits = min_hits
+        self.best_by = best_by
+        self.keep_frames = keep_frames
+        self.tracks = []
+        self._next_id = 1
+
+    def update(self, frame, detections, frame_index, timestamp):
+        """
+        Match one sampled frame's detections to the open tracks
+
+        Returns:
+            Tuple of (list of (track, detection) pairs seen in this frame, list of closed vehicle tracks)
+        """
+        assigned = {}
+        if self.tracks and detections:
+            ious = box_iou_matrix([t.bbox for t in self.tracks], [d['bbox'] for d in detections])
+            # Highest-overlap pairs first; each track and detection is used at most once
+            for flat_index in np.argsort(-ious, axis=None):
+                t, d = (int(i) for i in np.unravel_index(flat_index, ious.shape))
+                if ious[t, d] < self.iou_threshold:
+                    break
+                if t not in assigned.values() and d not in assigned:
+                    assigned[d] = t
+
+        seen = []
+        matched_tracks = set()
+        for d, detection in enumerate(detections):
+            if d in assigned:
+                track = self.tracks[assigned[d]]
+            else:
+                track = PlateTrack(self._next_id, frame_index, self.keep_frames)
+                self._next_id += 1
+                self.tracks.append(track)
+            track.update(frame, detection, frame_index, timestamp, self.best_by)
+            matched_tracks.add(track.track_id)
+            seen.append((track, detection))
+
+        closed = []
+        open_tracks = []
+        for track in self.tracks:
+            if track.track_id not in matched_tracks:
+                track.missed += 1
+            if track.missed > self.max_missed:
+                closed.append(track)
+            else:
+                open_tracks.append(track)
+        self.tracks = open_tracks
+
+        return seen, [track for track in closed if track.hits >= self.min_hits]
+
+    def flush(self):
+        """Close every open track (end of stream)"""
+        closed = [track for track in self.tracks if track.hits >= self.min_hits]
+        self.tracks = []
+        return closed
+
+class PlateStream:
+    def __init__(self, detector, ocr=None, tracker=None, sample_fps=5.0, output=None, gate=None):
+        """
+        Watch a video file or camera stream and report each vehicle's plate once
+
+        Args:
+            detector: YOLOLicensePlateDetector instance
+            ocr: BanglaLicensePlateOCR instance, or None to only track plates
+            tracker: PlateTracker (default settings when None)
+            sample_fps: Frames per second run through the detector; 0 runs every frame
+            output: Text stream the JSON lines are written to (default stdout)
+            gate: Optional MotionGate; sampled frames without motion in the lane ROI skip the detector
+        """
+        self.detector = detector
+        self.ocr = ocr
+        self.tracker = tracker or PlateTracker()
+        self.sample_fps = sample_fps
+        self.output = output or sys.stdout
+        self.gate = gate
+        self._output_lock = threading.Lock()
+        # OCR runs beside the capture loop so a live stream is not left buffering behind it
+        self._ocr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stream-ocr')
+        self.vehicles = 0
+
+    def emit(self, event):
+        with self._output_lock:
+            self.output.write(json.dumps(event, ensure_ascii=False) + '\n')
+            self.output.flush()
+
+    def _report_vehicle(self, track):
+        best = track.best
+        event = {
+            'event': 'vehicle',
+            'track_id': track.track_id,
+            'first_frame': track.first_frame,
+            'last_frame': track.last_frame,
+            'frames_seen': track.hits,
+            'best_frame': best['frame_index'],
+            'timestamp': round(best['timestamp'], 3),
+            'bbox': best['bbox'],
+            'detection_confidence': best['confidence'],
+        }
+        if 'sharpness' in best:
+            event['sharpness'] = best['sharpness']
+
+        try:
+            if self.ocr is not None and len(track.frames) > 1:
+                event.update(self.ocr.extract_text_multi_frame(
+                    [c['frame'] for c in track.frames],
+                    [c['bbox'] for c in track.frames]
+                ))
+            elif self.ocr is not None:
+                event.update(self.ocr.extract_text(best['frame'], best['bbox']))
+        except Exception as e:
+            print(f"Stream OCR error for track {track.track_id}: {e}", file=sys.stderr)
+            event.update({'success': False, 'error': str(e)})
+        finally:
+            track.frames = []
+
+        self.emit(event)
+
+    def _close(self, tracks):
+        for track in tracks:
+            self.vehicles += 1
+            self._ocr_executor.submit(self._report_vehicle, track)
+
+    def run(self, source):
+        """
+        Process the stream until it ends
+
+        Args:
+            source: Video file path, stream URL (rtsp://, http://) or camera index
+        """
+        capture = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+        if not capture.isOpened():
+            raise ValueError(f"Could not open video source: {source}")
+
+        source_fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        # Files have a frame count and are sampled by frame index; live streams by wall clock
+        is_file = capture.get(cv2.CAP_PROP_FRAME_COUNT) > 0 and source_fps > 0
+        step = max(1, round(source_fps / self.sample_fps)) if is_file and self.sample_fps else 1
+        interval = 1.0 / self.sample_fps if not is_file and self.sample_fps else 0.0
+        print(f"Streaming {source} ({'file' if is_file else 'live'}, {source_fps:.1f} fps source)", file=sys.stderr)
+
+        start_time = time.time()
+        next_due = 0.0
+        frame_index = -1
+        processed = 0
+
+        try:
+            while True:
+                # grab() skips decoding; only sampled frames are retrieved
+                if not capture.grab():
+                    break
+                frame_index += 1
+
+                if interval:
+                    now = time.monotonic()
+                    if now < next_due:
+                        continue
+                    next_due = now + interval
+                elif frame_index % step:
+                    continue
+
+                ok, frame = capture.retrieve()
+                if not ok:
+                    continue
+                processed += 1
+
+                timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 if is_file else time.time() - start_time
+                result = self.detector.detect_license_plates(frame, self.gate)
+                seen, closed = self.tracker.update(frame, result['detections'], frame_index, timestamp)
+
+                if seen:
+                    self.emit({
+                        'event': 'detections',
+                        'frame': frame_index,
+                        'timestamp': round(timestamp, 3),
+                        'processing_time': result['processing_time'],
+                        'tracks': [
+                            {'track_id': track.track_id, 'bbox': d['bbox'], 'confidence': d['confidence']}
+                            for track, d in seen
+                        ]
+                    })
+                self._close(closed)
+        finally:
+            capture.release()
+            self._close(self.tracker.flush())
+            self._ocr_executor.shutdown(wait=True)
+
+        summary = {
+            'event': 'end',
+            'frames_read': frame_index + 1,
+            'frames_processed': processed,
+            'vehicles': self.vehicles,
+            'elapsed': round(time.time() - start_time, 2)
+        }
+        if self.gate is not None:
+            summary['motion_gate'] = self.gate.stats()
+        self.emit(summary)
+
+def stream(model_path, source):
+    """Run the streaming mode configured from STREAM_* environment variables"""
+    from yolo_detector import YOLOLicensePlateDetector
+    from result_cache import ResultCache
+
+    # Consecutive camera frames never repeat byte for byte, so hashing them for the cache is wasted work
+    detector = YOLOLicensePlateDetector(
+        model_path=model_path,
+        confidence_threshold=0.5,
+        nms_threshold=0.4,
+        result_cache=ResultCache(enabled=False)
+    )
+
+    ocr = None
+    if os.getenv('STREAM_OCR', '1') != '0':
+        from ocr_extractor import BanglaLicensePlateOCR
+        ocr = BanglaLicensePlateOCR()
+
+    tracker = PlateTracker(
+        iou_threshold=float(os.getenv('STREAM_IOU', 0.3)),
+        max_missed=int(os.getenv('STREAM_MAX_MISSED', 5)),
+        min_hits=int(os.getenv('STREAM_MIN_HITS', 2)),
+        best_by=os.getenv('STREAM_BEST_FRAME', 'confidence'),
+        keep_frames=int(os.getenv('STREAM_VOTE_FRAMES', 1))
+    )
+
+    gate = None
+    if os.getenv('MOTION_GATE', '0') == '1':
+        from motion_gate import MotionGate
+        gate = MotionGate.from_env()
+
+    try:
+        PlateStream(detector, ocr, tracker, sample_fps=float(os.getenv('STREAM_SAMPLE_FPS', 5)), gate=gate).run(source)
+    finally:
+        if ocr is not None:
+            ocr.scheduler.save()
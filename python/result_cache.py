@@ -0,0 +1,129 @@
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+class ResultCache:
+    def __init__(self, max_entries=128, ttl=60.0, enabled=True, perceptual=False):
+        """
+        LRU cache of detection/OCR results keyed by image content
+
+        Args:
+            max_entries: Entries kept before the least recently used one is evicted
+            ttl: Seconds an entry stays valid; 0 keeps entries until evicted
+            enabled: False turns every lookup into a miss without hashing anything
+            perceptual: Key decoded images by a 64-bit difference hash instead of their exact
+                        bytes, so re-encoded or slightly noisy copies of a frame also hit
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.enabled = enabled
+        self.perceptual = perceptual
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls, allow_perceptual=True):
+        """
+        Cache configured by RESULT_CACHE (0 opts out), RESULT_CACHE_SIZE, RESULT_CACHE_TTL and RESULT_CACHE_PERCEPTUAL
+
+        Args:
+            allow_perceptual: False ignores RESULT_CACHE_PERCEPTUAL and always keys by exact content. Caches of
+                              per-plate readings need this: different plates can share a 64-bit hash
+        """
+        return cls(
+            max_entries=int(os.getenv('RESULT_CACHE_SIZE', 128)),
+            ttl=float(os.getenv('RESULT_CACHE_TTL', 60)),
+            enabled=os.getenv('RESULT_CACHE', '1') != '0',
+            perceptual=allow_perceptual and os.getenv('RESULT_CACHE_PERCEPTUAL', '0') == '1'
+        )
+
+    @staticmethod
+    def difference_hash(image):
+        """64-bit dHash: sign of horizontal brightness steps on a 9x8 thumbnail"""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        thumbnail = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+        bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).flatten()
+        return int(np.packbits(bits).view('>u8')[0])
+
+    def key(self, image, *context):
+        """
+        Cache key for an image plus whatever else the result depends on
+
+        Args:
+            image: Encoded image bytes or a decoded numpy array (bytes cannot be keyed perceptually)
+            context: Hashable values such as the bbox and the model/OCR configuration
+
+        Returns:
+            Hashable key, or None when caching is disabled or the image cannot be keyed
+        """
+        if not self.enabled:
+            return None
+
+        if isinstance(image, np.ndarray):
+            if self.perceptual:
+                return ('dhash', self.difference_hash(image), image.shape, *context)
+            digest = hashlib.blake2b(np.ascontiguousarray(image).data, digest_size=16)
+            return ('pixels', digest.hexdigest(), image.shape, str(image.dtype), *context)
+
+        if isinstance(image, (bytes, bytearray, memoryview)) and not self.perceptual:
+            return ('bytes', hashlib.blake2b(image, digest_size=16).hexdigest(), *context)
+
+        return None
+
+    def get(self, key):
+        """Copy of the cached result for key, or None on a miss"""
+        if key is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key, result):
+        if key is None:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'perceptual': self.perceptual,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,58 @@
+import random
+from difflib import SequenceMatcher, get_close_matches
+
+import pytest
+
+from area_matcher import AreaNameMatcher, AREA_ALIASES, VEHICLE_CLASS_LETTERS
+
+# The character index and quick_ratio bound only prune candidates; match() must give the
+# same best spelling and ratio as scoring every spelling with get_close_matches.
+
+SPELLINGS = [spelling for canonical, spellings in AREA_ALIASES.items() for spelling in [canonical, *spellings]]
+ALPHABET = 'abcdefghiklmnoprstuy01 ্াোিীেৃঁংঃকগচটডতদনপবমরলশসহ'
+
+def expected_match(matcher, word):
+    word = matcher.normalize(word)
+    matches = get_close_matches(word, matcher.names, n=1, cutoff=matcher.cutoff) if word else []
+    if not matches:
+        return '', 0.0
+    return matcher.canonical[matches[0]], SequenceMatcher(None, word, matches[0]).ratio()
+
+def misspelled(rng):
+    chars = list(rng.choice(SPELLINGS + VEHICLE_CLASS_LETTERS))
+    for _ in range(rng.randrange(0, 4)):
+        edit = rng.random()
+        position = rng.randrange(len(chars) + 1)
+        if edit < 0.35 and chars:
+            del chars[min(position, len(chars) - 1)]
+        elif edit < 0.7 and chars:
+            chars[min(position, len(chars) - 1)] = rng.choice(ALPHABET)
+        else:
+            chars.insert(position, rng.choice(ALPHABET))
+    word = ''.join(chars)
+    return word.upper() if rng.random() < 0.2 else word
+
+def generated(rng):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(1, 14)))
+
+@pytest.mark.parametrize('cutoff', [0.6, 0.4, 0.8])
+def test_match_agrees_with_get_close_matches(cutoff):
+    matcher = AreaNameMatcher(cutoff=cutoff)
+    rng = random.Random(cutoff)
+    for _ in range(3000):
+        word = misspelled(rng) if rng.random() < 0.7 else generated(rng)
+        assert matcher.match(word) == expected_match(matcher, word), word
+
+def test_exact_spellings_resolve_to_canonical_names():
+    matcher = AreaNameMatcher()
+    for canonical, spellings in AREA_ALIASES.items():
+        for spelling in [canonical, *spellings]:
+            assert matcher.match(spelling) == (canonical, 1.0)
+            assert matcher.match(spelling.upper())[0] == canonical
+
+def test_custom_aliases_agree_with_get_close_matches():
+    matcher = AreaNameMatcher(aliases={'গাজীপুর': ['gazipur', 'gajipur'], 'টঙ্গী': ['tongi']}, extra_names=[])
+    rng = random.Random(7)
+    for _ in range(500):
+        word = ''.join(rng.choice('gazipurtonি্') for _ in range(rng.randrange(1, 9)))
+        assert matcher.match(word) == expected_match(matcher, word), word
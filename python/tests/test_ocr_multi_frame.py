@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+from ocr_extractor import BanglaLicensePlateOCR
+
+PLATE = {'area_name': 'ঢাকা', 'vehicle_class': 'গ', 'number': '১২-৩৪৫৬'}
+
+def make_ocr(workers, reads):
+    """OCR whose per-frame read returns reads[frame] (None for a failed read) and records started frames"""
+    ocr = BanglaLicensePlateOCR(self_test=False, ocr_workers=workers)
+    started = []
+    lock = threading.Lock()
+
+    def read_frame(frame, bbox, configs_per_frame):
+        with lock:
+            started.append(frame)
+        time.sleep(0.02)
+        fields = reads[frame]
+        if fields is None:
+            return {'success': False}
+        return {'success': True, 'confidence': 0.8, 'extracted_text': str(fields), **fields}
+
+    ocr.extract_text_two_line_format = read_frame
+    return ocr, started
+
+@pytest.mark.parametrize('workers', [1, 2, 3])
+def test_stops_once_fields_agree(workers):
+    ocr, started = make_ocr(workers, [PLATE] * 6)
+    result = ocr.extract_text_multi_frame(range(6), agreement=2)
+
+    assert result['license_plate'] == 'ঢাকা-গ-১২-৩৪৫৬'
+    assert result['frames_read'] == 2
+    # Only frames already in flight when the second read agreed were started
+    assert len(started) <= 2 + workers - 1
+
+def test_counts_every_frame_read_without_agreement():
+    other = {**PLATE, 'number': '৯৮-৭৬৫৪'}
+    ocr, started = make_ocr(2, [PLATE, other, None, {**PLATE, 'number': '১১-১১১১'}])
+    result = ocr.extract_text_multi_frame(range(4), agreement=2)
+
+    assert result['frames_read'] == 4
+    assert sorted(started) == [0, 1, 2, 3]
+    # Equal weights: the earliest frame wins the tie whatever order the reads finished in
+    assert result['number'] == '১২-৩৪৫৬'
+
+def test_failed_reads_count_as_read():
+    ocr, _ = make_ocr(2, [None, None, None])
+    result = ocr.extract_text_multi_frame(range(3), agreement=2)
+
+    assert result['success'] is False
+    assert result['frames_read'] == 3
@@ -0,0 +1,286 @@
+import random
+import re
+from difflib import SequenceMatcher, get_close_matches
+
+import pytest
+
+from area_matcher import AreaNameMatcher, AREA_ALIASES, VEHICLE_CLASS_LETTERS
+from plate_parser import LicensePlateParser, extract_number, extract_vehicle_class, format_license_plate
+
+# Frozen copy of the parsing in BanglaLicensePlateOCR before it moved to plate_parser.py
+# (chained replaces, four separate number regexes, a substring scan per class letter).
+# The compiled-regex parser must give the same result on every input.
+
+BASELINE_BANGLA_NUMBERS = {
+    '০': '0', '১': '1', '২': '2', '৩': '3', '৪': '4',
+    '৫': '5', '৬': '6', '৭': '7', '৮': '8', '৯': '9'
+}
+BASELINE_ENGLISH_TO_BANGLA = {v: k for k, v in BASELINE_BANGLA_NUMBERS.items()}
+BASELINE_CLASS_LETTERS = ['ক', 'খ', 'গ', 'ঘ', 'ঙ', 'চ', 'ছ', 'জ', 'ঝ', 'ঞ', 'ট', 'ঠ', 'ড', 'ঢ', 'ণ',
+                          'ত', 'থ', 'দ', 'ধ', 'ন', 'প', 'ফ', 'ব', 'ভ', 'ম', 'য', 'র', 'ল', 'শ', 'ষ', 'স', 'হ']
+
+def baseline_extract_vehicle_class(text):
+    for letter in BASELINE_CLASS_LETTERS:
+        if letter in text:
+            return letter
+    return ''
+
+def baseline_extract_six_digit_number(text):
+    converted_text = text
+    for bangla, english in BASELINE_BANGLA_NUMBERS.items():
+        converted_text = converted_text.replace(bangla, english)
+
+    patterns = [
+        r'(\d{2})-(\d{4})',
+        r'(\d{2})\s*-\s*(\d{4})',
+        r'(\d{2})\s+(\d{4})',
+        r'(\d{6})',
+    ]
+    for pattern in patterns:
+        matches = re.findall(pattern, converted_text)
+        if matches:
+            if len(matches[0]) == 2:
+                number = f"{matches[0][0]}-{matches[0][1]}"
+            else:
+                num_str = matches[0]
+                if len(num_str) == 6:
+                    number = f"{num_str[:2]}-{num_str[2:]}"
+                else:
+                    continue
+
+            bangla_number = number
+            for english, bangla in BASELINE_ENGLISH_TO_BANGLA.items():
+                bangla_number = bangla_number.replace(english, bangla)
+            return bangla_number
+    return ''
+
+def baseline_format_license_plate(area_name, vehicle_class, number):
+    license_plate = ''
+    if area_name and vehicle_class and number:
+        license_plate = f"{area_name}-{vehicle_class}-{number}"
+    elif area_name and number:
+        license_plate = f"{area_name}-{number}"
+    return license_plate
+
+# Area lookup as it was before area_matcher.py: get_close_matches over the spelling list and an
+# if/elif mapping to Bangla. The two behaviour changes of the precompiled matcher are applied here
+# explicitly: words and spellings are case-folded (so the list collapses to one spelling per case
+# variant), and the remaining English district spellings map to their Bangla names as well.
+BASELINE_AREA_NAMES = [
+    # Major cities
+    'ঢাকা', 'dhaka', 'DHAKA', 'Dhaka',
+    'চট্টগ্রাম', 'chittagong', 'CHITTAGONG', 'Chittagong', 'ctg', 'CTG',
+    'সিলেট', 'sylhet', 'SYLHET', 'Sylhet',
+    'রাজশাহী', 'rajshahi', 'RAJSHAHI', 'Rajshahi',
+    'বরিশাল', 'barisal', 'BARISAL', 'Barisal',
+    'খুলনা', 'khulna', 'KHULNA', 'Khulna',
+    'রংপুর', 'rangpur', 'RANGPUR', 'Rangpur',
+    'ময়মনসিংহ', 'mymensingh', 'MYMENSINGH', 'Mymensingh',
+    'কুমিল্লা', 'comilla', 'COMILLA', 'Comilla',
+    'নোয়াখালী', 'noakhali', 'NOAKHALI', 'Noakhali',
+    'ফেনী', 'feni', 'FENI', 'Feni',
+    'লক্ষ্মীপুর', 'lakshmipur', 'LAKSHMIPUR', 'Lakshmipur',
+    'ব্রাহ্মণবাড়িয়া', 'brahmanbaria', 'BRAHMANBARIA', 'Brahmanbaria',
+    'চাঁদপুর', 'chandpur', 'CHANDPUR', 'Chandpur',
+
+    # Metro areas
+    'মেট্রো', 'metro', 'METRO', 'Metro',
+
+    # Vehicle classes
+    'ক', 'খ', 'গ', 'ঘ', 'ঙ', 'চ', 'ছ', 'জ', 'ঝ', 'ঞ', 'ট', 'ঠ', 'ড', 'ঢ', 'ণ',
+    'ত', 'থ', 'দ', 'ধ', 'ন', 'প', 'ফ', 'ব', 'ভ', 'ম', 'য', 'র', 'ল', 'শ', 'ষ', 'স', 'হ'
+]
+# Case folding (user-013): one lowercase spelling per name, first occurrence kept
+BASELINE_FOLDED_AREA_NAMES = list(dict.fromkeys(name.lower() for name in BASELINE_AREA_NAMES))
+
+def baseline_to_bangla(match):
+    if match in ['dhaka', 'DHAKA', 'Dhaka']:
+        return 'ঢাকা'
+    elif match in ['chittagong', 'CHITTAGONG', 'Chittagong', 'ctg', 'CTG']:
+        return 'চট্টগ্রাম'
+    elif match in ['sylhet', 'SYLHET', 'Sylhet']:
+        return 'সিলেট'
+    elif match in ['rajshahi', 'RAJSHAHI', 'Rajshahi']:
+        return 'রাজশাহী'
+    elif match in ['barisal', 'BARISAL', 'Barisal']:
+        return 'বরিশাল'
+    elif match in ['khulna', 'KHULNA', 'Khulna']:
+        return 'খুলনা'
+    elif match in ['rangpur', 'RANGPUR', 'Rangpur']:
+        return 'রংপুর'
+    elif match in ['mymensingh', 'MYMENSINGH', 'Mymensingh']:
+        return 'ময়মনসিংহ'
+    elif match in ['metro', 'METRO', 'Metro']:
+        return 'মেট্রো'
+    # Districts that previously came back in English (user-013)
+    elif match == 'comilla':
+        return 'কুমিল্লা'
+    elif match == 'noakhali':
+        return 'নোয়াখালী'
+    elif match == 'feni':
+        return 'ফেনী'
+    elif match == 'lakshmipur':
+        return 'লক্ষ্মীপুর'
+    elif match == 'brahmanbaria':
+        return 'ব্রাহ্মণবাড়িয়া'
+    elif match == 'chandpur':
+        return 'চাঁদপুর'
+    return match
+
+def baseline_extract_area_name(text):
+    best_match = ''
+    best_ratio = 0
+    for word in re.findall(r'[^\s\-,]+', text):
+        if len(word) < 2:
+            continue
+        word = word.strip().lower()
+        matches = get_close_matches(word, BASELINE_FOLDED_AREA_NAMES, n=3, cutoff=0.6)
+        if matches:
+            match = matches[0]
+            ratio = SequenceMatcher(None, word.lower(), match.lower()).ratio()
+            if ratio > best_ratio:
+                best_ratio = ratio
+                best_match = baseline_to_bangla(match)
+    return best_match if best_ratio > 0.6 else ''
+
+def baseline_parse(text):
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    if len(lines) < 2:
+        combined_text = ' '.join(lines)
+        possible_splits = [
+            combined_text.split(),
+            re.split(r'[,\s]+', combined_text),
+            re.split(r'[-\s]+', combined_text)
+        ]
+        for split_attempt in possible_splits:
+            if len(split_attempt) >= 3:
+                lines = split_attempt
+                break
+
+    if len(lines) < 2:
+        return {'success': False}
+
+    line1 = lines[0]
+    line2 = lines[1] if len(lines) > 1 else ''
+    area_name = baseline_extract_area_name(line1)
+    vehicle_class = baseline_extract_vehicle_class(line1)
+    number = baseline_extract_six_digit_number(line2 if line2 else line1)
+    if not number and len(lines) > 1:
+        number = baseline_extract_six_digit_number(line1)
+    if not number and len(lines) > 2:
+        for line in lines[2:]:
+            number = baseline_extract_six_digit_number(line)
+            if number:
+                break
+
+    return {
+        'success': bool(area_name or vehicle_class or number),
+        'area_name': area_name,
+        'vehicle_class': vehicle_class,
+        'number': number,
+        'license_plate': baseline_format_license_plate(area_name, vehicle_class, number)
+    }
+
+# Generated OCR-like text: plate pieces in Bangla and English, digits in both scripts,
+# separators, OCR noise and the occasional stray character
+AREA_WORDS = [spelling for canonical, spellings in AREA_ALIASES.items() for spelling in [canonical, *spellings]]
+NOISE = ['', ' ', '  ', '-', ' - ', ',', '\n', '\n\n', '.', '|', ':', '—', 'O', 'l', 'I', 'ো', '্', 'া']
+SEEDS = range(400)
+
+def random_digits(rng, count):
+    digits = ''.join(str(rng.randrange(10)) for _ in range(count))
+    script = rng.random()
+    if script < 0.4:
+        return digits.translate(str.maketrans('0123456789', '০১২৩৪৫৬৭৮৯'))
+    if script < 0.8:
+        return digits
+    # Mixed Bangla and English digits
+    return ''.join(d.translate(str.maketrans('0123456789', '০১২৩৪৫৬৭৮৯')) if rng.random() < 0.5 else d for d in digits)
+
+def random_piece(rng):
+    kind = rng.random()
+    if kind < 0.25:
+        word = rng.choice(AREA_WORDS)
+        return word.upper() if rng.random() < 0.2 else word
+    if kind < 0.45:
+        return rng.choice(VEHICLE_CLASS_LETTERS)
+    if kind < 0.75:
+        separator = rng.choice(['-', ' - ', ' ', '', '  -', '\n'])
+        return random_digits(rng, rng.choice([2, 1, 3])) + separator + random_digits(rng, rng.choice([4, 3, 5, 6]))
+    if kind < 0.9:
+        return random_digits(rng, rng.randrange(1, 9))
+    return ''.join(rng.choice('abcxyz০১ক্র-') for _ in range(rng.randrange(1, 5)))
+
+def random_text(rng):
+    return ''.join(random_piece(rng) + rng.choice(NOISE) for _ in range(rng.randrange(1, 7)))
+
+@pytest.fixture(scope='module')
+def matcher():
+    return AreaNameMatcher()
+
+def test_extract_number_matches_baseline():
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        for _ in range(20):
+            text = random_text(rng)
+            assert extract_number(text) == baseline_extract_six_digit_number(text), (seed, text)
+
+def test_extract_vehicle_class_matches_baseline():
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        for _ in range(20):
+            text = random_text(rng)
+            assert extract_vehicle_class(text) == baseline_extract_vehicle_class(text), (seed, text)
+
+def test_format_license_plate_matches_baseline():
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        for _ in range(20):
+            fields = [rng.choice(['', piece]) for piece in (rng.choice(AREA_WORDS), rng.choice(VEHICLE_CLASS_LETTERS),
+                                                              random_digits(rng, 6))]
+            assert format_license_plate(*fields) == baseline_format_license_plate(*fields), (seed, fields)
+
+def test_parse_matches_baseline(matcher):
+    parser = LicensePlateParser(matcher)
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        for _ in range(5):
+            text = random_text(rng)
+            assert parser.parse(text) == baseline_parse(text), (seed, text)
+
+def misspell(rng, word):
+    """word with a few OCR-like edits and random casing"""
+    chars = list(word)
+    for _ in range(rng.randrange(0, 3)):
+        edit = rng.random()
+        position = rng.randrange(len(chars) + 1)
+        if edit < 0.4 and chars:
+            del chars[min(position, len(chars) - 1)]
+        elif edit < 0.7 and chars:
+            chars[min(position, len(chars) - 1)] = rng.choice('aeiouhnlrt01্া')
+        else:
+            chars.insert(position, rng.choice('aeiouhnlrt01্া'))
+    word = ''.join(chars)
+    casing = rng.random()
+    return word.upper() if casing < 0.2 else word.title() if casing < 0.4 else word
+
+def test_extract_area_name_matches_baseline(matcher):
+    parser = LicensePlateParser(matcher)
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        for _ in range(10):
+            text = ' '.join(misspell(rng, rng.choice(AREA_WORDS)) for _ in range(rng.randrange(1, 4)))
+            assert parser.extract_area_name(text) == baseline_extract_area_name(text), (seed, text)
+
+@pytest.mark.parametrize('text', [
+    'ঢাকা মেট্রো-গ\n১২-৩৪৫৬',
+    'DHAKA METRO GA\n12 3456',
+    '১২৩৪৫৬ ১২-৩৪৫৬',
+    '12 - 3456 and 65-4321',
+    'চট্টগ্রাম খ ১১১১১১১',
+    '',
+])
+def test_known_plates_match_baseline(text, matcher):
+    assert extract_number(text) == baseline_extract_six_digit_number(text)
+    assert extract_vehicle_class(text) == baseline_extract_vehicle_class(text)
+    assert LicensePlateParser(matcher).parse(text) == baseline_parse(text)
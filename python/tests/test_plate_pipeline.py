@@ -0,0 +1,48 @@
+import numpy as np
+
+from plate_pipeline import LicensePlatePipeline
+
+class StubDetector:
+    def __init__(self, result):
+        self.result = result
+
+    def detect_license_plates(self, image):
+        return self.result
+
+class StubOCR:
+    def __init__(self):
+        self.calls = 0
+
+    def extract_text(self, image, bbox):
+        self.calls += 1
+        return {'success': True, 'text': 'ঢাকা-গ-১২-৩৪৫৬'}
+
+FRAME = np.zeros((48, 64, 3), dtype=np.uint8)
+
+def test_detector_failure_is_reported_as_error():
+    detector = StubDetector({'success': False, 'error': 'inference failed', 'detections': []})
+    ocr = StubOCR()
+    result = LicensePlatePipeline(detector, ocr).process(FRAME)
+
+    assert result['success'] is False
+    assert result['error'] == 'inference failed'
+    assert result['plates'] == [] and result['detections'] == []
+    assert set(result['timings']) >= {'decode', 'detect', 'total'}
+    assert ocr.calls == 0
+
+def test_frame_without_plates_succeeds():
+    detector = StubDetector({'success': True, 'detections': [], 'model_version': 'stub'})
+    result = LicensePlatePipeline(detector, StubOCR()).process(FRAME)
+
+    assert result['success'] is True
+    assert result['plates'] == []
+
+def test_detected_plates_are_read():
+    detection = {'bbox': [4, 4, 20, 10], 'confidence': 0.9}
+    detector = StubDetector({'success': True, 'detections': [detection], 'model_version': 'stub'})
+    ocr = StubOCR()
+    result = LicensePlatePipeline(detector, ocr).process(FRAME)
+
+    assert result['success'] is True
+    assert ocr.calls == 1
+    assert result['plates'][0]['text'] == 'ঢাকা-গ-১২-৩৪৫৬'
@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from plate_registry import PlateRegistry, SymmetricDeleteIndex, levenshtein
+
+def write_export(path, documents, mode='w'):
+    with open(path, mode, encoding='utf-8') as export:
+        for document in documents:
+            export.write(json.dumps(document, ensure_ascii=False) + '\n')
+
+def bump_mtime(path):
+    # Some filesystems keep a coarse mtime; make sure the change is seen
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+@pytest.fixture
+def documents():
+    return [
+        {'_id': {'$oid': 'a1'}, 'license': 'ঢাকা-মেট্রো-গ-১২-৩৪৫৬', 'owner': 'A', 'tollAmount': {'$numberInt': '50'},
+         'createdAt': {'$date': '2024-01-01T00:00:00Z'}},
+        {'_id': {'$oid': 'a2'}, 'license': 'চট্টগ্রাম-খ-৯৮-৭৬৫৪', 'owner': 'B', 'tollAmount': 100,
+         'createdAt': {'$date': {'$numberLong': '1717200000000'}}},
+    ]
+
+def test_resolves_nearest_plate(tmp_path, documents):
+    path = tmp_path / 'plates.jsonl'
+    write_export(path, documents)
+    registry = PlateRegistry(path, refresh_interval=0)
+
+    exact = registry.resolve({'area_name': 'ঢাকা', 'vehicle_class': 'গ', 'number': '১২-৩৪৫৬'})
+    assert exact['_id'] == 'a1' and exact['distance'] == 0 and exact['exact'] and exact['tollAmount'] == 50
+
+    misread = registry.resolve({'area_name': 'ঢাকা', 'vehicle_class': 'ক', 'number': '১২-৩৪৫৮'})
+    assert misread['_id'] == 'a1' and misread['distance'] == 2 and not misread['exact']
+
+    assert registry.resolve({'number': '৫৫-৫৫৫৫'}) is None
+
+def test_appended_records_load_incrementally(tmp_path, documents):
+    path = tmp_path / 'plates.jsonl'
+    write_export(path, documents[:1])
+    registry = PlateRegistry(path, refresh_interval=0)
+
+    write_export(path, documents[1:], mode='a')
+    bump_mtime(path)
+    assert registry.resolve({'number': '৯৮-৭৬৫৪'})['_id'] == 'a2'
+    assert registry.stats()['incremental_loads'] == 1
+    assert registry.stats()['full_loads'] == 1
+
+def test_in_place_rewrite_with_edits_reloads(tmp_path, documents):
+    path = tmp_path / 'plates.jsonl'
+    write_export(path, documents)
+    registry = PlateRegistry(path, refresh_interval=0)
+    inode, size = os.stat(path).st_ino, os.stat(path).st_size
+
+    # Same inode, not shorter: a1 is renumbered, a2 is deleted, a new record is added
+    edited = [
+        {**documents[0], 'license': 'ঢাকা-মেট্রো-গ-১১-১১১১', 'owner': 'A (re-registered)'},
+        {'_id': {'$oid': 'a3'}, 'license': 'খুলনা-ঘ-২২-২২২২', 'owner': 'C', 'notes': 'x' * 200},
+    ]
+    with open(path, 'r+', encoding='utf-8') as export:
+        export.truncate(0)
+        export.write(''.join(json.dumps(d, ensure_ascii=False) + '\n' for d in edited))
+    bump_mtime(path)
+    assert os.stat(path).st_ino == inode
+    assert os.stat(path).st_size >= size
+
+    assert registry.resolve({'number': '১১-১১১১'})['owner'] == 'A (re-registered)'
+    assert registry.resolve({'number': '১২-৩৪৫৬'}) is None
+    assert registry.resolve({'number': '৯৮-৭৬৫৪'}) is None
+    assert registry.resolve({'number': '২২-২২২২'})['_id'] == 'a3'
+    assert registry.stats()['plates'] == 2
+    assert registry.stats()['full_loads'] == 2
+    assert registry.stats()['incremental_loads'] == 0
+
+def test_symmetric_delete_index_matches_brute_force():
+    import random
+
+    rng = random.Random(0)
+    keys = [f"{rng.randrange(10 ** 6):06d}" for _ in range(500)]
+    index = SymmetricDeleteIndex(max_deletes=2)
+    for key in keys:
+        index.add(key, key)
+
+    for _ in range(100):
+        query = f"{rng.randrange(10 ** 6):06d}"
+        expected = sorted((levenshtein(query, key), key) for key in keys if levenshtein(query, key) <= 2)
+        assert sorted(index.search(query, 2)) == expected
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('onnxruntime')
+pytest.importorskip('onnx')
+
+from bench.pipeline_suite import build_stand_in_model
+from motion_gate import MotionGate
+from result_cache import ResultCache
+from yolo_detector import YOLOLicensePlateDetector
+
+@pytest.fixture(scope='module')
+def detector(tmp_path_factory):
+    model_path = build_stand_in_model(tmp_path_factory.mktemp('model') / 'stand_in.onnx')
+    return YOLOLicensePlateDetector(str(model_path), result_cache=ResultCache(enabled=False))
+
+FRAME = np.full((120, 160, 3), 90, dtype=np.uint8)
+
+def test_gated_bad_frame_returns_error(detector):
+    gated = detector.detect_license_plates(b'not an image', gate=MotionGate())
+    ungated = detector.detect_license_plates(b'not an image')
+
+    assert gated['success'] is False and ungated['success'] is False
+    assert gated['error'] and gated['detections'] == []
+    assert {'success', 'error', 'detections', 'processing_time', 'model_version', 'profile'} <= set(gated)
+
+def test_gated_roi_outside_frame_returns_error(detector):
+    gate = MotionGate(roi=[(500, 500), (600, 500), (600, 600)])
+    result = detector.detect_license_plates(FRAME, gate=gate)
+
+    assert result['success'] is False
+    assert 'outside' in result['error']
+
+def test_gated_frames_succeed(detector):
+    gate = MotionGate(roi=[(0.0, 0.5), (1.0, 0.5), (1.0, 1.0), (0.0, 1.0)], hold_frames=0)
+    first = detector.detect_license_plates(FRAME, gate=gate)
+    still = detector.detect_license_plates(FRAME, gate=gate)
+
+    assert first['success'] is True and 'roi' in first
+    assert still['success'] is True and still['skipped'] == 'no_motion'
@@ -0,0 +1,144 @@
+import json
+import sys
+import threading
+import time
+from concurrent.futures import Future, wait
+
+from instrumentation import METRICS, RequestProfiler
+
+
+class LineProtocolWorker:
+    def __init__(self, name, handlers, info=None):
+        """
+        Long-lived JSON-lines worker over stdin/stdout
+
+        Every request is one JSON object per line, e.g.
+        {"id": 1, "cmd": "detect", "image_path": "..."}, and every response is
+        one JSON object per line echoing the request id. The built-in
+        "health" and "ready" commands act as liveness/readiness probes,
+        "metrics" returns the stage histograms in Prometheus text format and
+        "shutdown" stops the loop. A handler may return a Future instead of
+        a dict; its response is then sent when it completes, so several
+        requests can be in flight at once (e.g. for micro-batching).
+
+        Args:
+            name: Worker name reported by the probes
+            handlers: Mapping of command name to a callable taking the request dict
+            info: Extra static fields reported by the probes (model version etc.)
+        """
+        self.name = name
+        self.handlers = dict(handlers)
+        self.info = info or {}
+        self.started_at = time.time()
+        self.requests_served = 0
+        self.errors = 0
+        self.ready = False
+        self.profiler = RequestProfiler.from_env(name)
+
+    def health(self):
+        """Liveness/readiness probe payload"""
+        return {
+            'status': 'ok',
+            'worker': self.name,
+            'ready': self.ready,
+            'uptime': round(time.time() - self.started_at, 2),
+            'requests_served': self.requests_served,
+            'errors': self.errors,
+            **self.info
+        }
+
+    def handle(self, request):
+        """Dispatch a single decoded request and return the response dict (or a Future of it)"""
+        cmd = request.get('cmd', '')
+
+        if cmd in ('health', 'ready'):
+            return self.health()
+
+        if cmd == 'metrics':
+            return {'metrics': METRICS.render({'worker': self.name})}
+
+        handler = self.handlers.get(cmd)
+        if handler is None:
+            raise ValueError(f"Unknown command: {cmd}")
+
+        if self.profiler is not None:
+            return self.profiler.call(handler, request)
+        return handler(request)
+
+    def serve(self, stdin=None, stdout=None):
+        """Serve requests until stdin closes or a shutdown command arrives"""
+        stdin = stdin or sys.stdin
+        protocol_out = stdout or sys.stdout
+        send_lock = threading.Lock()
+        in_flight = set()
+        shutdown_id = None
+
+        # Keep the protocol channel clean: anything the model libraries
+        # print while serving ends up on stderr with the other debug output
+        sys.stdout = sys.stderr
+
+        def send(message):
+            with send_lock:
+                protocol_out.write(json.dumps(message) + '\n')
+                protocol_out.flush()
+
+        def fail(request_id, error):
+            self.errors += 1
+            print(f"{self.name} worker request failed: {error}", file=sys.stderr)
+            send({'id': request_id, 'error': str(error)})
+
+        def complete(request_id, cmd, start, future):
+            in_flight.discard(future)
+            try:
+                response = future.result()
+            except Exception as e:
+                fail(request_id, e)
+                return
+            self.requests_served += 1
+            METRICS.observe('worker', cmd, time.perf_counter() - start)
+            send({'id': request_id, **response})
+
+        self.ready = True
+        send({'event': 'ready', **self.health()})
+        print(f"{self.name} worker ready", file=sys.stderr)
+
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get('id')
+
+                if request.get('cmd') == 'shutdown':
+                    shutdown_id = request_id
+                    break
+
+                cmd = request.get('cmd')
+                start = time.perf_counter()
+                response = self.handle(request)
+            except Exception as e:
+                fail(request_id, e)
+                continue
+
+            if isinstance(response, Future):
+                in_flight.add(response)
+                response.add_done_callback(
+                    lambda future, request_id=request_id, cmd=cmd, start=start: complete(request_id, cmd, start, future)
+                )
+            else:
+                if cmd not in ('health', 'ready', 'metrics'):
+                    self.requests_served += 1
+                    METRICS.observe('worker', cmd, time.perf_counter() - start)
+                send({'id': request_id, **response})
+
+        # Let queued asynchronous requests finish before exiting
+        wait(list(in_flight))
+        self.ready = False
+        if self.profiler is not None:
+            self.profiler.close()
+        if shutdown_id is not None:
+            send({'id': shutdown_id, 'status': 'shutting_down'})
+        print(f"{self.name} worker stopped", file=sys.stderr)
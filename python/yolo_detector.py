@@ -4,50 +4,300 @@ import json
 import sys
 import time
 import os
+import queue
+import threading
+from concurrent.futures import Future
 from pathlib import Path
 
+from detection_cascade import CoarseToFineDetector
+from image_io import load_image, image_from_request, describe_image
+from instrumentation import METRICS, StageTimer
+from motion_gate import MotionGate
+from result_cache import ResultCache
+
+def non_max_suppression(boxes, scores, iou_threshold):
+    """
+    Greedy non-maximum suppression
+    
+    Args:
+        boxes: (N, 4) array of [x1, y1, x2, y2] boxes
+        scores: (N,) array of confidences
+        iou_threshold: Boxes overlapping a kept box by more than this IoU are dropped
+        
+    Returns:
+        Indices of the kept boxes, highest score first
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.maximum(0, x2 - x1) * np.maximum(0, y2 - y1)
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        
+        # IoU of the kept box against all remaining boxes at once
+        w = np.maximum(0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        h = np.maximum(0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = w * h
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    
+    return np.array(keep, dtype=np.int64)
+
+def boxes_to_detections(boxes, scores, confidence_threshold, nms_threshold):
+    """
+    Shared post-processing for every backend: confidence filter, NMS and conversion to detection dicts
+    
+    Args:
+        boxes: (N, 4) array of [x1, y1, x2, y2] boxes in original image coordinates
+        scores: (N,) array of confidences
+        confidence_threshold: Boxes scoring at or below this are dropped
+        nms_threshold: IoU above which the lower-scoring of two overlapping boxes is dropped
+        
+    Returns:
+        List of {'bbox': [x, y, w, h], 'confidence', 'class'} detections, highest confidence first
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+    
+    mask = scores > confidence_threshold
+    boxes, scores = boxes[mask], scores[mask]
+    keep = non_max_suppression(boxes, scores, nms_threshold)
+    boxes, scores = boxes[keep], scores[keep]
+    
+    # xyxy -> integer xywh for the whole array at once
+    xywh = np.empty_like(boxes)
+    xywh[:, :2] = boxes[:, :2]
+    xywh[:, 2:] = boxes[:, 2:] - boxes[:, :2]
+    
+    return [
+        {'bbox': bbox, 'confidence': confidence, 'class': 'license_plate'}
+        for bbox, confidence in zip(xywh.astype(np.int64).tolist(), scores.tolist())
+    ]
+
+class ONNXPlateModel:
+    def __init__(self, model_path, input_size=None, intra_op_threads=0, inter_op_threads=0):
+        """
+        YOLOv5/v8 plate model exported to ONNX, run with ONNX Runtime (no torch needed)
+        
+        Args:
+            model_path: Path to the exported .onnx model
+            input_size: Square network input size; defaults to the size baked into the model, else 640
+            intra_op_threads: Threads used inside a single operator (0 = ONNX Runtime default)
+            inter_op_threads: Threads used to run independent operators in parallel (0 = ONNX Runtime default)
+        """
+        import onnxruntime as ort
+        
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        
+        # Static dims are ints, dynamic ones are names or None
+        batch_dim, _, height_dim, _ = model_input.shape
+        self.dynamic_batch = not isinstance(batch_dim, int)
+        if isinstance(height_dim, int):
+            if input_size is not None and input_size != height_dim:
+                print(f"Model has a fixed {height_dim}px input; ignoring requested input size {input_size}. "
+                      f"Export with dynamic=True to use other sizes.", file=sys.stderr)
+            input_size = height_dim
+        elif input_size is None:
+            input_size = 640
+        self.input_size = input_size
+    
+    def letterbox(self, image):
+        """Resize keeping aspect ratio and pad to the square network input"""
+        height, width = image.shape[:2]
+        ratio = min(self.input_size / height, self.input_size / width)
+        new_width, new_height = int(round(width * ratio)), int(round(height * ratio))
+        
+        resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+        pad_x = (self.input_size - new_width) // 2
+        pad_y = (self.input_size - new_height) // 2
+        padded = cv2.copyMakeBorder(
+            resized, pad_y, self.input_size - new_height - pad_y, pad_x, self.input_size - new_width - pad_x,
+            cv2.BORDER_CONSTANT, value=(114, 114, 114)
+        )
+        return padded, ratio, (pad_x, pad_y)
+    
+    def _to_tensor(self, padded):
+        # BGR HWC uint8 -> RGB CHW float32 in [0, 1]
+        return padded[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    
+    def predict(self, images, confidence_threshold, nms_threshold, timer=None):
+        """
+        Run the model on a batch of BGR images
+        
+        Args:
+            timer: Optional StageTimer for the letterbox, forward and NMS steps
+        
+        Returns:
+            One list of {'bbox', 'confidence', 'class'} detections per image, in original image coordinates
+        """
+        timer = timer or StageTimer('detector')
+        with timer.stage('letterbox'):
+            letterboxed = [self.letterbox(image) for image in images]
+            tensors = [self._to_tensor(padded) for padded, _, _ in letterboxed]
+        
+        with timer.stage('forward'):
+            if self.dynamic_batch:
+                outputs = self.session.run(None, {self.input_name: np.stack(tensors)})[0]
+            else:
+                outputs = np.concatenate([
+                    self.session.run(None, {self.input_name: tensor[None]})[0] for tensor in tensors
+                ])
+        
+        with timer.stage('nms'):
+            results = []
+            for output, image, (_, ratio, (pad_x, pad_y)) in zip(outputs, images, letterboxed):
+                results.append(self._postprocess(output, image.shape, ratio, pad_x, pad_y, confidence_threshold, nms_threshold))
+        return results
+    
+    def _postprocess(self, output, image_shape, ratio, pad_x, pad_y, confidence_threshold, nms_threshold):
+        # YOLOv8 exports (4 + classes, anchors); YOLOv5 exports (anchors, 5 + classes) with objectness
+        if output.shape[0] < output.shape[1]:
+            output = output.T
+            boxes_xywh = output[:, :4]
+            scores = output[:, 4:].max(axis=1)
+        else:
+            boxes_xywh = output[:, :4]
+            class_scores = output[:, 5:]
+            scores = output[:, 4] * (class_scores.max(axis=1) if class_scores.shape[1] else 1.0)
+        
+        # Filter before the coordinate transform; most anchors are background
+        mask = scores > confidence_threshold
+        boxes_xywh, scores = boxes_xywh[mask], scores[mask]
+        
+        # Center xywh in letterbox space -> corner xyxy in original image space
+        boxes = np.empty_like(boxes_xywh)
+        boxes[:, 0] = (boxes_xywh[:, 0] - boxes_xywh[:, 2] / 2 - pad_x) / ratio
+        boxes[:, 1] = (boxes_xywh[:, 1] - boxes_xywh[:, 3] / 2 - pad_y) / ratio
+        boxes[:, 2] = (boxes_xywh[:, 0] + boxes_xywh[:, 2] / 2 - pad_x) / ratio
+        boxes[:, 3] = (boxes_xywh[:, 1] + boxes_xywh[:, 3] / 2 - pad_y) / ratio
+        height, width = image_shape[:2]
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+        
+        return boxes_to_detections(boxes, scores, confidence_threshold, nms_threshold)
+
+# Performance profiles: network input size (None = model default) and INT8 dynamic quantization
+DETECTOR_PROFILES = {
+    'fp32': {'input_size': None, 'int8': False},
+    'fp32-480': {'input_size': 480, 'int8': False},
+    'fp32-320': {'input_size': 320, 'int8': False},
+    'int8': {'input_size': None, 'int8': True},
+    'int8-320': {'input_size': 320, 'int8': True},
+}
+
+def quantize_onnx_model(model_path):
+    """
+    Create (once) an INT8 dynamically quantized copy of an ONNX model
+    
+    Returns:
+        Path of the quantized model, stored next to the original as <name>.int8.onnx
+    """
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    
+    source = Path(model_path)
+    quantized = source.with_name(f"{source.stem}.int8.onnx")
+    
+    if not quantized.exists() or quantized.stat().st_mtime < source.stat().st_mtime:
+        print(f"Quantizing {source} to INT8: {quantized}", file=sys.stderr)
+        quantize_dynamic(str(source), str(quantized), weight_type=QuantType.QUInt8)
+    
+    return str(quantized)
+
 class YOLOLicensePlateDetector:
-    def __init__(self, model_path, confidence_threshold=0.5, nms_threshold=0.4):
+    def __init__(self, model_path, confidence_threshold=0.5, nms_threshold=0.4, backend=None, profile=None,
+                 result_cache=None):
         """
-        Initialize YOLO detector for .pt models
+        Initialize YOLO detector for .pt or .onnx models
         
         Args:
-            model_path: Path to your YOLO .pt model file
+            model_path: Path to your YOLO .pt (or exported .onnx) model file
             confidence_threshold: Minimum confidence for detections
             nms_threshold: Non-maximum suppression threshold
+            backend: 'onnx', 'ultralytics' or 'torch_hub'; defaults to YOLO_BACKEND env var,
+                     else ONNX Runtime for .onnx files and ultralytics/torch.hub otherwise
+            profile: Name from DETECTOR_PROFILES (input size / INT8); defaults to YOLO_PROFILE env var, else 'fp32'
+            result_cache: ResultCache for repeated frames; defaults to one configured by the RESULT_CACHE* env vars
         """
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
         self.nms_threshold = nms_threshold
+        self.backend = backend or os.getenv('YOLO_BACKEND')
+        
+        self.profile = profile or os.getenv('YOLO_PROFILE', 'fp32')
+        if self.profile not in DETECTOR_PROFILES:
+            raise ValueError(f"Unknown detector profile '{self.profile}'. Choose from: {', '.join(DETECTOR_PROFILES)}")
+        self.input_size = DETECTOR_PROFILES[self.profile]['input_size']
+        
+        if DETECTOR_PROFILES[self.profile]['int8']:
+            # Dynamic INT8 quantization is done on the ONNX export and run with ONNX Runtime
+            if not str(model_path).lower().endswith('.onnx'):
+                onnx_path = Path(model_path).with_suffix('.onnx')
+                if not onnx_path.exists():
+                    raise FileNotFoundError(f"INT8 profiles need an ONNX export of the model: {onnx_path}")
+                self.model_path = str(onnx_path)
+            self.backend = 'onnx'
+        
+        if not self.backend and str(self.model_path).lower().endswith('.onnx'):
+            self.backend = 'onnx'
+        
+        self.result_cache = result_cache or ResultCache.from_env()
         
         # Load YOLOv5/v8 model
         self.model = None
+        self._inference_lock = threading.Lock()
+        load_start = time.perf_counter()
         self._load_model()
+        self.load_time = time.perf_counter() - load_start
+        METRICS.observe('detector', 'model_load', self.load_time)
         
     def _load_model(self):
-        """Load the YOLOv5/v8 .pt model"""
+        """Load the YOLOv5/v8 .pt model (or its ONNX export)"""
         try:
-            import torch
-            
             # Check if model file exists
             if not Path(self.model_path).exists():
                 raise FileNotFoundError(f"Model file not found: {self.model_path}")
             
+            if self.backend == 'onnx':
+                self._load_onnx_model()
+                return
+            
+            import torch
+            
             # Load model - suppress output during loading
             print(f"Loading YOLOv5/v8 model from: {self.model_path}", file=sys.stderr)
             
-            # Try loading with ultralytics first (YOLOv8)
-            try:
-                from ultralytics import YOLO
+            # Try loading with ultralytics first (YOLOv8), unless torch.hub was asked for
+            YOLO = None
+            if self.backend != 'torch_hub':
+                try:
+                    from ultralytics import YOLO
+                except ImportError:
+                    pass
+            
+            if YOLO is not None:
                 # Suppress ultralytics output
                 os.environ['YOLO_VERBOSE'] = 'False'
                 self.model = YOLO(self.model_path)
                 self.model.verbose = False  # Disable verbose output
                 self.model_type = "ultralytics"
                 print("Loaded with Ultralytics (YOLOv8)", file=sys.stderr)
-            except ImportError:
+            else:
                 # Fallback to torch.hub for YOLOv5
-                self.model = torch.hub.load('ultralytics/yolov5', 'custom', path=self.model_path, force_reload=True)
+                # Reuse the cached hub repo instead of refetching it on every start
+                self.model = torch.hub.load('ultralytics/yolov5', 'custom', path=self.model_path, force_reload=False)
                 self.model_type = "torch_hub"
                 print("Loaded with torch.hub (YOLOv5)", file=sys.stderr)
             
@@ -59,110 +309,353 @@ class YOLOLicensePlateDetector:
             
         except ImportError as e:
             print(f"Error: Missing dependencies for YOLOv5/v8: {e}", file=sys.stderr)
-            print("Install with: pip install torch ultralytics", file=sys.stderr)
+            if self.backend == 'onnx':
+                print("Install with: pip install onnxruntime", file=sys.stderr)
+            else:
+                print("Install with: pip install torch ultralytics", file=sys.stderr)
             sys.exit(1)
         except Exception as e:
             print(f"Error loading model: {e}", file=sys.stderr)
             sys.exit(1)
     
-    def detect_license_plates(self, image_path):
+    def _load_onnx_model(self):
+        """Load an exported .onnx plate model in ONNX Runtime"""
+        model_path = self.model_path
+        if DETECTOR_PROFILES[self.profile]['int8']:
+            model_path = quantize_onnx_model(model_path)
+        
+        print(f"Loading ONNX model from: {model_path}", file=sys.stderr)
+        
+        self.model = ONNXPlateModel(
+            model_path,
+            input_size=self.input_size,
+            intra_op_threads=int(os.getenv('ONNX_INTRA_OP_THREADS', 0)),
+            inter_op_threads=int(os.getenv('ONNX_INTER_OP_THREADS', 0))
+        )
+        self.model_type = "onnx"
+        self.input_size = self.model.input_size
+        print(f"Loaded with ONNX Runtime (profile {self.profile}, input size {self.input_size})", file=sys.stderr)
+        print(f"Successfully loaded model: {self.model_path}", file=sys.stderr)
+    
+    def detect_license_plates(self, image, gate=None):
         """
         Detect license plates in image
         
         Args:
-            image_path: Path to image file
+            image: Path to image file, encoded image bytes or BGR numpy array
+            gate: Optional MotionGate of the camera the frame comes from; frames without motion in
+                  its lane ROI are skipped and the rest are only searched inside the ROI
             
         Returns:
             Dictionary with detections, processing time, and model info
         """
-        start_time = time.time()
-        detections = []
+        if gate is None:
+            return self.detect_license_plates_batch([image])[0]
         
+        start_time = time.time()
         try:
-            # Load image
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError(f"Could not load image from: {image_path}")
-            
-            print(f"Processing image: {image_path}", file=sys.stderr)
-            print(f"Image shape: {image.shape}", file=sys.stderr)
+            frame = load_image(image)
+            region = gate.check(frame)
+        except Exception as e:
+            # Same shape as an image the batch path cannot load, e.g. a bad frame or an ROI outside it
+            print(f"Detection error for {describe_image(image)}: {e}", file=sys.stderr)
+            return {
+                'success': False,
+                'error': str(e),
+                'detections': [],
+                'processing_time': round(time.time() - start_time, 2),
+                'model_version': f'{self.model_type}_license_plate_detector',
+                'profile': self.profile
+            }
+        if region is None:
+            return {
+                'success': True,
+                'detections': [],
+                'processing_time': round(time.time() - start_time, 2),
+                'model_version': f'{self.model_type}_license_plate_detector',
+                'profile': self.profile,
+                'skipped': 'no_motion'
+            }
+        
+        x, y, crop = region
+        result = self.detect_license_plates_batch([crop])[0]
+        # Boxes come back in ROI coordinates; shift them into the full frame
+        for detection in result['detections']:
+            detection['bbox'][0] += x
+            detection['bbox'][1] += y
+        result['roi'] = [x, y, crop.shape[1], crop.shape[0]]
+        result['processing_time'] = round(time.time() - start_time, 2)
+        return result
+    
+    def detect_license_plates_batch(self, images):
+        """
+        Detect license plates in several images with one batched forward pass
+        
+        Args:
+            images: List of image file paths, encoded image bytes and/or BGR numpy arrays
             
-            # Run inference
-            if self.model_type == "ultralytics":
-                # Suppress ultralytics output during inference
-                results = self.model(image, verbose=False)
-                detections = self._process_ultralytics_results(results)
-            else:
-                results = self.model(image)
-                detections = self._process_torch_hub_results(results)
+        Returns:
+            List with one dictionary per image, in the same shape as detect_license_plates; an image
+            that cannot be loaded gets success False and its error without failing the others
+        """
+        start_time = time.time()
+        timer = StageTimer('detector')
+        results_per_image = [{'detections': []} for _ in images]
+        
+        # Load images; ones that fail get their own error entry and are left out of the batch,
+        # as are repeated frames whose detections are still cached
+        batch = []
+        batch_indices = []
+        batch_keys = []
+        cache_context = (self.model_path, self.profile, self.confidence_threshold, self.nms_threshold)
+        for i, image in enumerate(images):
+            try:
+                # Encoded bytes are keyed before decoding, so a repeated upload skips the decode too
+                loaded = None
+                with timer.stage('cache_lookup'):
+                    key = self.result_cache.key(image, *cache_context)
+                if key is None and self.result_cache.enabled:
+                    with timer.stage('decode'):
+                        loaded = load_image(image)
+                    with timer.stage('cache_lookup'):
+                        key = self.result_cache.key(loaded, *cache_context)
+                
+                cached = self.result_cache.get(key)
+                if cached is not None:
+                    print(f"Using cached detections for: {describe_image(image)}", file=sys.stderr)
+                    results_per_image[i]['detections'] = cached
+                    results_per_image[i]['cached'] = True
+                    continue
+                
+                if loaded is None:
+                    with timer.stage('decode'):
+                        loaded = load_image(image)
+                print(f"Processing image: {describe_image(image)}", file=sys.stderr)
+                print(f"Image shape: {loaded.shape}", file=sys.stderr)
+                batch.append(loaded)
+                batch_indices.append(i)
+                batch_keys.append(key)
+            except Exception as e:
+                print(f"Detection error for {describe_image(image)}: {e}", file=sys.stderr)
+                results_per_image[i] = {'success': False, 'error': str(e), 'detections': []}
+        
+        try:
+            if batch:
+                # Run inference on the whole batch at once; the model is not safe to call from several threads
+                with self._inference_lock:
+                    if self.model_type == "onnx":
+                        # Timed inside predict as its letterbox, forward and nms stages
+                        results = self.model.predict(batch, self.confidence_threshold, self.nms_threshold, timer)
+                    else:
+                        with timer.stage('inference'):
+                            if self.model_type == "ultralytics":
+                                # Suppress ultralytics output during inference
+                                if self.input_size:
+                                    results = self.model(batch, verbose=False, imgsz=self.input_size)
+                                else:
+                                    results = self.model(batch, verbose=False)
+                            elif self.input_size:
+                                results = self.model(batch, size=self.input_size)
+                            else:
+                                results = self.model(batch)
                 
+                with timer.stage('postprocess'):
+                    if self.model_type == "onnx":
+                        for i, detections in zip(batch_indices, results):
+                            results_per_image[i]['detections'] = detections
+                    elif self.model_type == "ultralytics":
+                        for i, result in zip(batch_indices, results):
+                            results_per_image[i]['detections'] = self._process_ultralytics_results([result])
+                    else:
+                        for position, i in enumerate(batch_indices):
+                            results_per_image[i]['detections'] = self._process_torch_hub_results(results, position)
+                
+                for i, key in zip(batch_indices, batch_keys):
+                    self.result_cache.put(key, results_per_image[i]['detections'])
         except Exception as e:
             print(f"Detection error: {e}", file=sys.stderr)
-            
+            for i in batch_indices:
+                results_per_image[i] = {'success': False, 'error': str(e), 'detections': []}
+        
         processing_time = time.time() - start_time
+        stage_ms = timer.as_ms()
         
-        return {
-            'detections': detections,
-            'processing_time': round(processing_time, 2),
-            'model_version': f'{self.model_type}_license_plate_detector'
-        }
+        for result in results_per_image:
+            result.setdefault('success', True)
+            result['processing_time'] = round(processing_time, 2)
+            result['model_version'] = f'{self.model_type}_license_plate_detector'
+            result['profile'] = self.profile
+            # Stage times are for the whole batch
+            result['stage_ms'] = stage_ms
+            if len(images) > 1:
+                result['batch_size'] = len(images)
+        
+        return results_per_image
+    
+    def _log_detections(self, detections):
+        summary = ', '.join(f"{d['bbox']}@{d['confidence']:.3f}" for d in detections)
+        print(f"Detections: {len(detections)} [{summary}]", file=sys.stderr)
     
     def _process_ultralytics_results(self, results):
-        """Process Ultralytics YOLO results"""
+        """Process Ultralytics YOLO results straight from the boxes tensors"""
         detections = []
         
         try:
             for result in results:
                 boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        confidence = float(box.conf[0])
-                        if confidence > self.confidence_threshold:
-                            # Get bounding box coordinates
-                            x1, y1, x2, y2 = box.xyxy[0].tolist()
-                            w, h = x2 - x1, y2 - y1
-                            
-                            detections.append({
-                                'bbox': [int(x1), int(y1), int(w), int(h)],
-                                'confidence': confidence,
-                                'class': 'license_plate'
-                            })
-                            
-                            print(f"Detection: bbox=[{int(x1)}, {int(y1)}, {int(w)}, {int(h)}], conf={confidence:.3f}", file=sys.stderr)
+                if boxes is not None and len(boxes):
+                    detections.extend(boxes_to_detections(
+                        boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(),
+                        self.confidence_threshold, self.nms_threshold
+                    ))
+            self._log_detections(detections)
         except Exception as e:
             print(f"Error processing Ultralytics results: {e}", file=sys.stderr)
         
         return detections
     
-    def _process_torch_hub_results(self, results):
-        """Process torch.hub YOLO results"""
+    def _process_torch_hub_results(self, results, index=0):
+        """Process torch.hub YOLO results for the image at `index` of the batch"""
         detections = []
         
         try:
-            # Convert to pandas dataframe
-            df = results.pandas().xyxy[0]
-            
-            for _, row in df.iterrows():
-                confidence = float(row['confidence'])
-                if confidence > self.confidence_threshold:
-                    x1, y1, x2, y2 = int(row['xmin']), int(row['ymin']), int(row['xmax']), int(row['ymax'])
-                    w, h = x2 - x1, y2 - y1
-                    
-                    detections.append({
-                        'bbox': [x1, y1, w, h],
-                        'confidence': confidence,
-                        'class': 'license_plate'
-                    })
-                    
-                    print(f"Detection: bbox=[{x1}, {y1}, {w}, {h}], conf={confidence:.3f}", file=sys.stderr)
+            # Rows of [x1, y1, x2, y2, confidence, class]; no pandas round trip
+            predictions = results.xyxy[index].cpu().numpy()
+            detections = boxes_to_detections(predictions[:, :4], predictions[:, 4], self.confidence_threshold, self.nms_threshold)
+            self._log_detections(detections)
         except Exception as e:
             print(f"Error processing torch.hub results: {e}", file=sys.stderr)
         
         return detections
 
+class MicroBatcher:
+    def __init__(self, detector, max_batch_size=8, max_wait_ms=10):
+        """
+        Gathers concurrent detection requests into batched forward passes
+        
+        Args:
+            detector: YOLOLicensePlateDetector used for inference
+            max_batch_size: Largest number of images run in one batch
+            max_wait_ms: How long the first queued image waits for more to arrive
+        """
+        self.detector = detector
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='yolo-batcher', daemon=True)
+        self._thread.start()
+    
+    def submit(self, image):
+        """Queue an image (path, encoded bytes or array); returns a Future of its detection result"""
+        future = Future()
+        self._queue.put((image, future))
+        return future
+    
+    def _run(self):
+        while True:
+            # Block for the first image, then collect more until the window closes or the batch is full
+            batch = [self._queue.get()]
+            deadline = time.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            images = [image for image, _ in batch]
+            try:
+                results = self.detector.detect_license_plates_batch(images)
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+def serve(model_path):
+    """Run the detector as a warm worker answering requests over stdin/stdout"""
+    from worker import LineProtocolWorker
+
+    # Model is loaded once; every request afterwards only pays for inference
+    detector = YOLOLicensePlateDetector(
+        model_path=model_path,
+        confidence_threshold=0.5,
+        nms_threshold=0.4
+    )
+
+    # Concurrent lane requests arriving within a few ms share one forward pass
+    batcher = MicroBatcher(
+        detector,
+        max_batch_size=int(os.getenv('YOLO_MAX_BATCH', 8)),
+        max_wait_ms=float(os.getenv('YOLO_BATCH_WAIT_MS', 10))
+    )
+    
+    # Optional per-lane motion gates; requests that name their lane are checked against its ROI
+    gates = {}
+    gate_lock = threading.Lock()
+    use_gates = os.getenv('MOTION_GATE', '0') == '1'
+    
+    # Optional coarse-to-fine cascade for high-resolution cameras (runs outside the micro-batcher)
+    cascade = CoarseToFineDetector.from_env(detector) if os.getenv('YOLO_CASCADE', '0') == '1' else None
+    
+    def lane_gate(request):
+        if not use_gates or request.get('lane') is None:
+            return None
+        with gate_lock:
+            lane = str(request['lane'])
+            if lane not in gates:
+                gates[lane] = MotionGate.from_env()
+            return gates[lane]
+    
+    def detect(request):
+        gate = lane_gate(request)
+        if gate is not None:
+            return detector.detect_license_plates(image_from_request(request), gate)
+        if cascade is not None:
+            return cascade.detect(image_from_request(request))
+        return batcher.submit(image_from_request(request))
+    
+    def detect_batch(request):
+        # Each item is validated on its own, so one bad image or missing path only fails its own entry
+        items = [{'image': image} for image in request.get('images') or []]
+        items += [{'image_path': path} for path in request.get('image_paths') or []]
+        results = [None] * len(items)
+        images, positions = [], []
+        for position, item in enumerate(items):
+            try:
+                images.append(image_from_request(item))
+                positions.append(position)
+            except Exception as e:
+                results[position] = {'success': False, 'error': str(e), 'detections': []}
+        
+        for position, result in zip(positions, detector.detect_license_plates_batch(images)):
+            results[position] = result
+        return {'results': results}
+    
+    def stats(request):
+        return {
+            'result_cache': detector.result_cache.stats(),
+            'motion_gates': {lane: gate.stats() for lane, gate in gates.items()}
+        }
+    
+    worker = LineProtocolWorker(
+        'yolo',
+        {'detect': detect, 'detect_batch': detect_batch, 'stats': stats},
+        info={
+            'model_version': f'{detector.model_type}_license_plate_detector',
+            'profile': detector.profile,
+            'model_load_ms': round(detector.load_time * 1000, 1)
+        }
+    )
+    worker.serve()
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python yolo_detector.py <image_path>", file=sys.stderr)
+        print("Usage: python yolo_detector.py <image_path>   (use - to read the encoded image from stdin)", file=sys.stderr)
+        print("       python yolo_detector.py --serve", file=sys.stderr)
+        print("       python yolo_detector.py --stream <video_file | rtsp_url | camera_index>", file=sys.stderr)
         sys.exit(1)
     
     # Configuration - UPDATE THIS PATH WITH YOUR .pt MODEL
@@ -171,13 +664,25 @@ def main():
     # You can also use environment variables
     MODEL_PATH = os.getenv('YOLO_MODEL_PATH', MODEL_PATH)
     
+    if sys.argv[1] == '--serve':
+        serve(MODEL_PATH)
+        return
+    
+    if sys.argv[1] == '--stream':
+        if len(sys.argv) < 3:
+            print("Usage: python yolo_detector.py --stream <video_file | rtsp_url | camera_index>", file=sys.stderr)
+            sys.exit(1)
+        from plate_stream import stream
+        stream(MODEL_PATH, sys.argv[2])
+        return
+    
     try:
-        # Get image path from command line
-        image_path = sys.argv[1]
-        
-        # Check if image file exists
-        if not Path(image_path).exists():
-            raise FileNotFoundError(f"Image file not found: {image_path}")
+        # Get image path from command line, or the encoded image itself from stdin
+        image = sys.argv[1]
+        if image == '-':
+            image = sys.stdin.buffer.read()
+        elif not Path(image).exists():
+            raise FileNotFoundError(f"Image file not found: {image}")
         
         # Initialize detector
         detector = YOLOLicensePlateDetector(
@@ -187,7 +692,10 @@ def main():
         )
         
         # Detect license plates
-        results = detector.detect_license_plates(image_path)
+        if os.getenv('YOLO_CASCADE', '0') == '1':
+            results = CoarseToFineDetector.from_env(detector).detect(image)
+        else:
+            results = detector.detect_license_plates(image)
         
         # Output ONLY JSON results to stdout (no debug messages)
         print(json.dumps(results))
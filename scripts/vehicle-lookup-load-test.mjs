@@ -0,0 +1,250 @@
+// Load test of the vehicle lookups in lib/vehicles.ts against a local mongod.
+//
+// For each collection size it fills a scratch database with synthetic registrations, creates
+// the same indexes as lib/vehicles.ts, and runs the three queries the API uses (findOne by
+// license, the most recent registration, and a bulk $in lookup) from concurrent clients.
+// It reports latency percentiles per size plus each query's plan and documents examined,
+// which is what shows an indexed lookup stays flat while a collection scan grows.
+//
+//   node scripts/vehicle-lookup-load-test.mjs [--uri mongodb://127.0.0.1:27017] [--sizes 1000,10000,100000]
+//        [--requests 2000] [--concurrency 16] [--bulk 50] [--no-index] [--keep] [--output report.json]
+//
+// Only the scratch database (--db, default tollplaza_loadtest) is written to and dropped.
+
+import { writeFileSync } from "fs"
+import { MongoClient } from "mongodb"
+
+const AREAS = ["ঢাকা", "চট্টগ্রাম", "সিলেট", "রাজশাহী", "বরিশাল", "খুলনা", "রংপুর", "ময়মনসিংহ", "কুমিল্লা"]
+const CLASSES = ["ক", "খ", "গ", "ঘ", "চ", "ছ", "জ", "ঝ", "ট", "ঠ", "ড", "ত", "থ", "দ", "ন", "প", "ভ", "ম", "ল", "শ", "হ"]
+const VEHICLE_TYPES = [["car", 100], ["bus", 250], ["truck", 400], ["motorcycle", 30]]
+const BANGLA_DIGITS = "০১২৩৪৫৬৭৮৯"
+
+// Same projection and indexes as lib/vehicles.ts
+const VEHICLE_PROJECTION = { license: 1, owner: 1, phone: 1, vehicleType: 1, tollAmount: 1, createdAt: 1 }
+const INDEXES = [
+  { key: { license: 1 }, name: "license_1" },
+  { key: { createdAt: -1 }, name: "createdAt_-1" },
+]
+
+function parseArgs(argv) {
+  const args = {
+    uri: process.env.MONGODB_LOADTEST_URI || "mongodb://127.0.0.1:27017",
+    db: "tollplaza_loadtest",
+    sizes: [1_000, 10_000, 100_000],
+    requests: 2_000,
+    concurrency: 16,
+    bulk: 50,
+    index: true,
+    keep: false,
+    output: null,
+    seed: 1,
+  }
+  for (let i = 0; i < argv.length; i++) {
+    const flag = argv[i]
+    const next = () => argv[++i]
+    if (flag === "--uri") args.uri = next()
+    else if (flag === "--db") args.db = next()
+    else if (flag === "--sizes") args.sizes = next().split(",").map(Number)
+    else if (flag === "--requests") args.requests = Number(next())
+    else if (flag === "--concurrency") args.concurrency = Number(next())
+    else if (flag === "--bulk") args.bulk = Number(next())
+    else if (flag === "--seed") args.seed = Number(next())
+    else if (flag === "--no-index") args.index = false
+    else if (flag === "--keep") args.keep = true
+    else if (flag === "--output") args.output = next()
+    else throw new Error(`Unknown option: ${flag}`)
+  }
+  if (args.db === "tollplaza") {
+    throw new Error("Refusing to run against the tollplaza database; pick a scratch --db")
+  }
+  return args
+}
+
+// Small seeded generator (mulberry32) so every run inserts and queries the same plates
+function makeRandom(seed) {
+  let state = seed >>> 0
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0
+    let t = state
+    t = Math.imul(t ^ (t >>> 15), t | 1)
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61)
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296
+  }
+}
+
+const pick = (random, items) => items[Math.floor(random() * items.length)]
+
+// Plate for registration number index, in the format the OCR produces (area-class-dd-dddd).
+// Distinct indexes give distinct plates, so lookups of generated plates always hit.
+function plateFor(index) {
+  const area = AREAS[index % AREAS.length]
+  const vehicleClass = CLASSES[Math.floor(index / AREAS.length) % CLASSES.length]
+  const digits = String(Math.floor(index / (AREAS.length * CLASSES.length))).padStart(6, "0")
+  const number = `${digits.slice(0, 2)}-${digits.slice(2)}`.replace(/\d/g, (d) => BANGLA_DIGITS[d])
+  return `${area}-${vehicleClass}-${number}`
+}
+
+async function fill(collection, size, random) {
+  await collection.drop().catch(() => {})
+  const start = Date.parse("2024-01-01T00:00:00Z")
+  for (let offset = 0; offset < size; offset += 10_000) {
+    const batch = []
+    for (let index = offset; index < Math.min(size, offset + 10_000); index++) {
+      const [vehicleType, tollAmount] = pick(random, VEHICLE_TYPES)
+      batch.push({
+        license: plateFor(index),
+        owner: `Owner ${index}`,
+        phone: `01${String(700000000 + index).slice(-9)}`,
+        vehicleType,
+        tollAmount,
+        // Registrations arrive in random order, so the newest one is not simply the last inserted
+        createdAt: new Date(start + Math.floor(random() * 365 * 24 * 3600 * 1000)),
+        // Unreturned payload, as real documents carry more than the API needs
+        notes: "x".repeat(200),
+      })
+    }
+    await collection.insertMany(batch, { ordered: false })
+  }
+}
+
+function percentile(sorted, fraction) {
+  if (sorted.length === 0) return 0
+  return sorted[Math.min(sorted.length - 1, Math.floor(fraction * sorted.length))]
+}
+
+async function timeQueries(run, requests, concurrency) {
+  const latencies = []
+  let issued = 0
+  const client = async () => {
+    while (issued < requests) {
+      const request = issued++
+      const started = process.hrtime.bigint()
+      await run(request)
+      latencies.push(Number(process.hrtime.bigint() - started) / 1e6)
+    }
+  }
+  const started = Date.now()
+  await Promise.all(Array.from({ length: concurrency }, client))
+  const elapsed = (Date.now() - started) / 1000
+
+  latencies.sort((a, b) => a - b)
+  const round = (value) => Math.round(value * 1000) / 1000
+  return {
+    requests,
+    p50_ms: round(percentile(latencies, 0.5)),
+    p95_ms: round(percentile(latencies, 0.95)),
+    p99_ms: round(percentile(latencies, 0.99)),
+    throughput_per_s: Math.round(requests / elapsed),
+  }
+}
+
+// Winning plan stages and documents examined, from explain("executionStats")
+async function explain(cursor) {
+  const plan = await cursor.explain("executionStats")
+  const stages = []
+  // Servers using the slot-based engine nest the plan one level deeper
+  let stage = plan.queryPlanner.winningPlan.queryPlan || plan.queryPlanner.winningPlan
+  while (stage) {
+    stages.push(stage.stage)
+    stage = stage.inputStage || (stage.inputStages && stage.inputStages[0])
+  }
+  return {
+    plan: stages.join(" <- "),
+    docs_examined: plan.executionStats.totalDocsExamined,
+    keys_examined: plan.executionStats.totalKeysExamined,
+    returned: plan.executionStats.nReturned,
+  }
+}
+
+async function runSize(db, size, args) {
+  const random = makeRandom(args.seed + size)
+  const collection = db.collection("license-plate")
+  process.stderr.write(`Filling ${size} registrations...\n`)
+  await fill(collection, size, random)
+  if (args.index) {
+    await collection.createIndexes(INDEXES)
+  }
+
+  // One lookup in ten asks for an unregistered plate, like a misread or an unknown vehicle
+  const lookupPlate = () => (random() < 0.9 ? plateFor(Math.floor(random() * size)) : plateFor(size + Math.floor(random() * size)))
+  const bulkPlates = () => Array.from({ length: args.bulk }, lookupPlate)
+  const options = { projection: VEHICLE_PROJECTION }
+
+  const queries = {
+    by_license: {
+      run: () => collection.findOne({ license: lookupPlate() }, options),
+      explain: () => collection.find({ license: plateFor(0) }, options).limit(1),
+    },
+    most_recent: {
+      run: () => collection.findOne({}, { ...options, sort: { createdAt: -1 } }),
+      explain: () => collection.find({}, options).sort({ createdAt: -1 }).limit(1),
+    },
+    bulk: {
+      run: () => collection.find({ license: { $in: bulkPlates() } }, options).toArray(),
+      explain: () => collection.find({ license: { $in: bulkPlates() } }, options),
+    },
+  }
+
+  const result = { size }
+  for (const [name, query] of Object.entries(queries)) {
+    // Warm the pool and the server's caches before timing
+    await timeQueries(query.run, Math.min(200, args.requests), args.concurrency)
+    const requests = name === "bulk" ? Math.max(1, Math.floor(args.requests / 10)) : args.requests
+    result[name] = { ...(await timeQueries(query.run, requests, args.concurrency)), ...(await explain(query.explain())) }
+    process.stderr.write(`  ${name}: p50 ${result[name].p50_ms} ms, ${result[name].plan}, ${result[name].docs_examined} docs examined\n`)
+  }
+  return result
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2))
+  const client = new MongoClient(args.uri, {
+    maxPoolSize: args.concurrency,
+    serverSelectionTimeoutMS: 5_000,
+  })
+  await client.connect()
+  const db = client.db(args.db)
+
+  const results = []
+  try {
+    for (const size of args.sizes) {
+      results.push(await runSize(db, size, args))
+    }
+  } finally {
+    if (!args.keep) {
+      await db.dropDatabase().catch(() => {})
+    }
+    await client.close()
+  }
+
+  // Latency of the largest collection relative to the smallest: flat (about 1x) with the
+  // indexes, growing with the size ratio without them (--no-index)
+  const first = results[0]
+  const last = results[results.length - 1]
+  const growth = {}
+  for (const name of ["by_license", "most_recent", "bulk"]) {
+    growth[name] = Math.round((last[name].p50_ms / Math.max(first[name].p50_ms, 0.001)) * 100) / 100
+  }
+  const scans = results.flatMap((result) =>
+    ["by_license", "most_recent", "bulk"]
+      .filter((name) => result[name].plan.includes("COLLSCAN"))
+      .map((name) => `${name}@${result.size}`),
+  )
+
+  const report = { indexed: args.index, concurrency: args.concurrency, bulk: args.bulk, results, p50_growth: growth, collection_scans: scans }
+  const json = JSON.stringify(report, null, 2)
+  console.log(json)
+  if (args.output) {
+    writeFileSync(args.output, json)
+  }
+
+  // An indexed run that still scans the collection means a query lost its index
+  if (args.index && scans.length > 0) {
+    process.exitCode = 1
+  }
+}
+
+main().catch((error) => {
+  console.error(error)
+  process.exit(1)
+})